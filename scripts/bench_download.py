@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Filename:       bench_download.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Peak memory (tracemalloc) and time for downloading and parsing one year page, served from a local HTTP
+                server, with the different ways of handling the response body:
+                    join    - the old way: collect the chunks in a list, b"".join() them, decode to one str, then parse
+                    stream  - requests' iter_content() chunks, decoded and parsed as they arrive
+                    buffer  - readinto() a bytearray preallocated from Content-Length, parsed from memoryviews of it
+
+Notes:          PYTHONPATH=src python scripts/bench_download.py [--page sessions/2025/index.html --source DIR]
+                Without --source a synthetic page is used (see sample_pages.py), --rows sets its size.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import time
+import argparse
+import threading
+import tracemalloc
+
+from http.server    import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing         import Callable, List, Tuple
+
+from ivs_sessions_browser.defs              import Row, HEADERS
+from ivs_sessions_browser.read_data         import ReadData, make_http_session
+from ivs_sessions_browser.ivs_stream_parser import IvsStreamParser
+
+from sample_pages import sample_page
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def serve(_body: bytes) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serves _body, with a Content-Length and no compression, on a free local port.
+
+    :return: The server (call shutdown() when done) and its URL
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(_body)))
+            self.end_headers()
+            self.wfile.write(_body)
+
+        def log_message(self, *_args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/sessions/2025/"
+# --- END OF serve() ---------------------------------------------------------------------------------------------------
+
+
+
+def fetch_join(_reader: ReadData, _url: str) -> List[Row]:
+    """
+    The download path as it used to be: all chunks in a list, joined, decoded, then parsed.
+    """
+
+    with _reader.session.get(_url, stream=True) as r:
+        chunks = [chunk for chunk in r.iter_content(chunk_size=65536) if chunk]
+        text = b"".join(chunks).decode(r.encoding or "utf-8")
+    parser = IvsStreamParser(len(HEADERS), False)
+    parser.feed(text)
+    parser.close()
+    return parser.pop_rows()
+# --- END OF fetch_join() ----------------------------------------------------------------------------------------------
+
+
+
+def measure(_fetch: Callable[[], List[Row]], _repeat: int) -> Tuple[int, float, int, int]:
+    """
+    :return: (rows, best time in seconds, peak traced bytes of one run, traced bytes still held by the rows after it)
+    """
+
+    rows = _fetch()
+    tracemalloc.start()
+    kept = _fetch()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    best = float("inf")
+    for _ in range(_repeat):
+        start = time.perf_counter()
+        _fetch()
+        best = min(best, time.perf_counter() - start)
+    return len(rows), best, peak, held
+# --- END OF measure() -------------------------------------------------------------------------------------------------
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak memory of the download paths for one year page")
+    parser.add_argument("--source", help="Directory with recorded pages (from --save-source)")
+    parser.add_argument("--page", default="sessions/2025/index.html", help="Page in --source to use")
+    parser.add_argument("--rows", type=int, default=2000, help="Sessions in the synthetic page (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per mode, best is reported")
+    args = parser.parse_args()
+
+    if args.source:
+        with open(os.path.join(args.source, *args.page.split("/")), "rb") as f:
+            body = f.read()
+    else:
+        body = sample_page(2025, False, args.rows).encode("utf-8")
+
+    server, url = serve(body)
+    session     = make_http_session(1)
+    modes       = {"join":   (lambda: fetch_join(ReadData([url], 2025, "master", False, _session=session,
+                                                          _rate_limit=0), url)),
+                   "stream": (lambda: ReadData([url], 2025, "master", False, _session=session, _rate_limit=0,
+                                               _buffered=False).fetch_all_urls()),
+                   "buffer": (lambda: ReadData([url], 2025, "master", False, _session=session, _rate_limit=0,
+                                               _buffered=True).fetch_all_urls())}
+
+    print(f"page: {len(body) / 1024:.0f} KiB")
+    print("'rows KiB' is what the parsed rows take; 'body/page' is the rest of the peak, in page sizes")
+    print(f"{'mode':<8} {'rows':>6} {'time ms':>9} {'peak KiB':>10} {'rows KiB':>10} {'body/page':>10}")
+    try:
+        for name, fetch in modes.items():
+            rows, best, peak, held = measure(fetch, args.repeat)
+            print(f"{name:<8} {rows:>6} {best * 1000:>9.1f} {peak / 1024:>10.0f} {held / 1024:>10.0f} "
+                  f"{(peak - held) / len(body):>10.2f}")
+    finally:
+        server.shutdown()
+# --- END OF main() ----------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    main()
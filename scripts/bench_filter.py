@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Filename:       bench_filter.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Filter time per query over multi-year data, with the row predicates against the bitmap index
+                (row_index.py), both over the SessionTable, and a check that the two give the same rows. Queries
+                are compiled once and then kept (filter_query.py); 'compile ms' is that first compile, with the index.
+                Then a drill-down at the prompt, each query narrowing the one before, run without the index over all
+                rows against run over the previous result only (with the index, queries need no per-row tests).
+                Then sorting the rows of a query, comparison sorts on the ranks of the key columns against
+                FilterAndSort.sort_indices(), which picks most rows out of the table's sorted order of all rows. Last,
+                jumping to a date in the view sorted by start: scanning the start and end columns against bisecting
+                the start column (FilterAndSort.index_on_or_after()). With NumPy installed, filtering and sorting
+                are also timed on its arrays (numpy_backend.py), and checked against Python.
+
+Notes:          PYTHONPATH=src python scripts/bench_filter.py [--source DIR] [--years N]
+                Exits with status 1 if the index, the predicates or NumPy disagree on any query or sort.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import sys
+import time
+import argparse
+
+from datetime   import datetime
+from typing     import Callable, List
+
+from ivs_sessions_browser.defs              import Row, HEADERS, FIELD_INDEX
+from ivs_sessions_browser.filter_and_sort   import FilterAndSort
+from ivs_sessions_browser.filter_query      import compile_query
+from ivs_sessions_browser.numpy_backend     import available
+from ivs_sessions_browser.parser_backends   import select_backend
+from ivs_sessions_browser.session_table     import SessionTable, TableView
+
+from sample_pages import sample_page
+from bench_parsers import load_pages
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+QUERIES = ["stations: Nn",
+           "stations: Nn&Ns",
+           "stations: Nn|Ns|Wz",
+           "stations: Nn Ns Wz Ht",
+           "stations_removed: Ft|Ur",
+           "stations_all: Hb&Ht",
+           "status: released",
+           "type: r1|r4; ops: nasa",
+           "corr: bonn; stations: Wz",
+           "stations: Kk; status: cancelled",
+           "code: r25",
+           "stations: nN",
+           "r41",
+           "nasa; 2025-03",
+           "start: 2025-03-01..2025-04-15",
+           "doy: >100; stations: Nn",
+           "dur: >=24:00"]
+
+# --- Each query narrows the one before
+DRILL_DOWN = ["r4",
+              "r4; stations: Nn",
+              "r4; stations: Nn; status: released",
+              "r41; stations: Nn; status: released",
+              "r41; stations: Nn&Ns; status: released"]
+
+# --- Sorts timed, on all rows and on the rows of a query
+SORTS        = [(("start", True),), (("code", False),), (("doy", True),), (("dur", False),), (("status", True),),
+                (("ops", True), ("start", False))]
+SORT_QUERIES = ["", "status: released", "r4"]
+
+# --- Dates to jump to: the first year, mid data, the last day, and after the last session
+JUMPS = ["1990-01-01", "2010-06-15 12:00", "2025-12-31", "2030-01-01"]
+
+
+
+def parse_rows(_pages) -> List[Row]:
+    rows = []
+    for _, text, is_intensive in _pages:
+        parser = select_backend("auto")(len(HEADERS), is_intensive)
+        parser.feed(text)
+        parser.close()
+        rows.extend(parser.pop_rows())
+    return rows
+# --- END OF parse_rows() ----------------------------------------------------------------------------------------------
+
+
+
+def best_of(_repeat: int, _run: Callable[[], List[int]]) -> float:
+    best = float("inf")
+    for _ in range(_repeat):
+        start = time.perf_counter()
+        _run()
+        best = min(best, time.perf_counter() - start)
+    return best
+# --- END OF best_of() -------------------------------------------------------------------------------------------------
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Filter time with row predicates and with the bitmap index")
+    parser.add_argument("--source", help="Directory with recorded pages (from --save-source)")
+    parser.add_argument("--years", type=int, default=40, help="Synthetic years to generate without --source")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query, best is reported")
+    args = parser.parse_args()
+
+    if args.source:
+        pages = load_pages(args.source)
+    else:
+        pages = [(f"sample {year}", sample_page(year, intensive), intensive)
+                 for year in range(2025 - args.years + 1, 2026) for intensive in (False, True)]
+    rows    = parse_rows(pages)
+    start   = time.perf_counter()
+    table   = SessionTable(rows)
+    print(f"{len(rows)} rows, table built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    plain   = FilterAndSort(_use_numpy=False)
+    indexed = FilterAndSort(_use_numpy=False)
+    vectors = FilterAndSort() if available() else None
+    start   = time.perf_counter()
+    indexed.build_index(table)
+    print(f"index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if vectors is None:
+        print("NumPy not installed, its columns are left out")
+
+    print(f"{'query':<34} {'rows':>6} {'compile ms':>10} {'scan ms':>9} {'index ms':>9} {'speedup':>8} "
+          f"{'numpy ms':>9}")
+    ok = True
+    for query in QUERIES:
+        start       = time.perf_counter()
+        compile_query(query, table, indexed.index)
+        compiling   = time.perf_counter() - start
+
+        expected    = plain.apply(table, query)
+        got         = indexed.apply(table, query)
+        scan        = best_of(args.repeat, lambda: plain.compile(table, query).rows())
+        index       = best_of(args.repeat, lambda: indexed.compile(table, query).rows())
+
+        same        = got.indices == expected.indices
+        vectorised  = ""
+        if vectors is not None:
+            same        = same and vectors.apply(table, query).indices == expected.indices
+            vectorised  = f"{best_of(args.repeat, lambda: vectors.compile(table, query).rows()) * 1000:>9.3f}"
+        ok          = ok and same
+        print(f"{query:<34} {len(got):>6} {compiling * 1000:>10.3f} {scan * 1000:>9.2f} {index * 1000:>9.3f} "
+              f"{scan / index:>7.0f}x {vectorised}"
+              f"{'' if same else '  MISMATCH'}")
+
+    print(f"\n{'drill-down':<40} {'rows':>6} {'full ms':>9} {'narrowed ms':>12}")
+    previous = None
+    for query in DRILL_DOWN:
+        compiled    = compile_query(query, table)
+        full        = best_of(args.repeat, lambda: compiled.rows())
+        rows        = compiled.rows()
+        if previous is not None:
+            narrowed = best_of(args.repeat, lambda: compiled.rows(previous))
+            ok       = ok and compiled.rows(previous) == rows
+        else:
+            narrowed = full
+        print(f"{query:<40} {len(rows):>6} {full * 1000:>9.2f} {narrowed * 1000:>12.3f}")
+        previous = rows
+
+    print(f"\n{'sort':<40} {'rows':>6} {'compare ms':>10} {'picked ms':>11} {'numpy ms':>9}")
+    for query in SORT_QUERIES:
+        rows = plain.filter(table, query)
+        for keys in SORTS:
+            def by_rank() -> List[int]:
+                ordered = list(rows)
+                for col, asc in reversed(keys):
+                    ordered.sort(key=table.rank(FIELD_INDEX[col]).__getitem__, reverse=not asc)
+                return ordered
+
+            compare = best_of(args.repeat, by_rank)
+            same    = by_rank() == plain.sort_indices(table, rows, _sort_keys=keys)
+            picked  = best_of(args.repeat, lambda: plain.sort_indices(table, rows, _sort_keys=keys))
+            vectorised = ""
+            if vectors is not None:
+                same        = same and by_rank() == vectors.sort_indices(table, rows, _sort_keys=keys)
+                seconds     = best_of(args.repeat, lambda: vectors.sort_indices(table, rows, _sort_keys=keys))
+                vectorised  = f"{seconds * 1000:>9.2f}"
+            ok      = ok and same
+            label   = f"{query or 'all'}: {', '.join(('' if asc else '-') + col for col, asc in keys)}"
+            print(f"{label:<40} {len(rows):>6} {compare * 1000:>10.2f} {picked * 1000:>11.2f} {vectorised}"
+                  f"{'' if same else '  MISMATCH'}")
+
+    print(f"\n{'jump to':<40} {'row':>6} {'scan ms':>9} {'bisect ms':>12}")
+    view    = plain.apply(table)
+    scanned = TableView(table, view.indices, _sort_keys=())
+    for text in JUMPS:
+        when    = datetime.fromisoformat(text)
+        scan    = best_of(args.repeat, lambda: plain.index_on_or_after(scanned, when))
+        bisect  = best_of(args.repeat, lambda: plain.index_on_or_after(view, when))
+        row     = plain.index_on_or_after(view, when)
+        same    = row == plain.index_on_or_after(scanned, when)
+        ok      = ok and same
+        print(f"{text:<40} {row:>6} {scan * 1000:>9.2f} {bisect * 1000:>12.4f}{'' if same else '  MISMATCH'}")
+
+    sys.exit(0 if ok else 1)
+# --- END OF main() ----------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Filename:       bench_parse_pool.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Time to load 20 schedule pages (10 years, master and intensive) through ReadData, parsing in the
+                download threads (--parse-workers 0) against 1, 2 and 4 parse worker processes, and a check that the
+                rows are the same in every case.
+
+Notes:          PYTHONPATH=src python scripts/bench_parse_pool.py [--source DIR] [--parser NAME]
+                The pages are read with --source, so the numbers are parsing (and moving rows between processes),
+                not the network. Each load starts its own pool, so worker startup is included in the times.
+                Without --source, synthetic pages are written to a temporary directory.
+                Exits with status 1 if the rows differ.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from typing import List
+
+from ivs_sessions_browser.read_data     import ReadData
+from ivs_sessions_browser.local_source  import LocalSource
+
+from sample_pages import write_sample_site
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def load(_urls: List[str], _source: LocalSource, _parser: str, _parse_workers: int) -> tuple:
+    """
+    One full load, the way the browser does it for --years.
+
+    :return:    (seconds, rows)
+    """
+
+    reader = ReadData(_urls, "bench", "both", False,
+                      _workers          = 4,
+                      _rate_limit       = 0,
+                      _source           = _source,
+                      _parser           = _parser,
+                      _parse_workers    = _parse_workers)
+    start   = time.perf_counter()
+    rows    = reader.fetch_all_urls()
+    return time.perf_counter() - start, rows
+# --- END OF load() ----------------------------------------------------------------------------------------------------
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load time with and without parse worker processes")
+    parser.add_argument("--source", help="Directory with recorded pages (from --save-source)")
+    parser.add_argument("--first-year", type=int, default=2016, help="First of the 10 years loaded")
+    parser.add_argument("--rows", type=int, default=0, help="Sessions per synthetic page, 0 for a typical number")
+    parser.add_argument("--parser", default="auto", help="Parser backend (default: auto)")
+    parser.add_argument("--workers", default="0,1,2,4", help="Parse worker counts to compare (default: 0,1,2,4)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per setting, best is reported")
+    args = parser.parse_args()
+
+    years   = range(args.first_year, args.first_year + 10)
+    urls    = [f"https://ivscc.gsfc.nasa.gov/sessions/{kind}{year}/" for year in years for kind in ("", "intensive/")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.source
+        if not directory:
+            write_sample_site(tmp, years[0], years[-1], args.rows)
+            directory = tmp
+        source = LocalSource(directory)
+
+        reference   = None
+        timings     = []
+        identical   = True
+        for count in (int(n) for n in args.workers.split(",")):
+            best = float("inf")
+            for _ in range(args.repeat):
+                seconds, rows = load(urls, source, args.parser, count)
+                best = min(best, seconds)
+            if reference is None:
+                reference = rows
+            same        = rows == reference
+            identical   = identical and same
+            timings.append((count, best, same))
+
+    print(f"{len(urls)} pages, {len(reference)} rows, parser {args.parser}, {os.cpu_count()} CPUs")
+    print(f"{'parse workers':<14} {'time ms':>9} {'speedup':>8}  same rows")
+    for count, best, same in timings:
+        print(f"{count:<14} {best * 1000:>9.1f} {timings[0][1] / best:>7.2f}x  {'yes' if same else 'NO'}")
+
+    sys.exit(0 if identical else 1)
+# --- END OF main() ----------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Filename:       bench_parsers.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Rows per second for each installed parser backend, on recorded year pages, and a check that every
+                backend gives exactly the same rows as the BeautifulSoup reference.
+
+Notes:          PYTHONPATH=src python scripts/bench_parsers.py --source DIR
+                DIR is a directory written by --save-source (or unpacked from an archive). Without it, synthetic
+                pages are used (see sample_pages.py). Exits with status 1 if any backend's rows differ.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import sys
+import time
+import argparse
+
+from typing import List, Optional, Tuple
+
+from ivs_sessions_browser.defs              import Row, HEADERS
+from ivs_sessions_browser.parser_backends   import BACKENDS, available_backends
+
+from sample_pages import sample_page
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def load_pages(_source: str) -> List[Tuple[str, str, bool]]:
+    """
+    :param _source: Directory laid out like the site
+    :return:        (name, text, is_intensive) for every index.html found
+    """
+
+    pages = []
+    for root, _, files in sorted(os.walk(_source)):
+        if "index.html" in files:
+            path = os.path.join(root, "index.html")
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.relpath(path, _source), f.read(), "intensive" in path.split(os.sep)))
+    return pages
+# --- END OF load_pages() ----------------------------------------------------------------------------------------------
+
+
+
+def parse_all(_backend:     str,
+              _pages:       List[Tuple[str, str, bool]],
+              _chunk:       int,
+              _stations:    Optional[str] = None
+              ) -> List[List[Row]]:
+    """
+    Parses every page with one backend, fed in pieces of _chunk characters like a download.
+    """
+
+    results = []
+    for _, text, is_intensive in _pages:
+        parser  = BACKENDS[_backend](len(HEADERS), is_intensive, _stations)
+        rows    = []
+        for i in range(0, len(text), _chunk):
+            parser.feed(text[i:i + _chunk])
+            rows.extend(parser.pop_rows())
+        parser.close()
+        rows.extend(parser.pop_rows())
+        results.append(rows)
+    return results
+# --- END OF parse_all() -----------------------------------------------------------------------------------------------
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the parser backends on year pages")
+    parser.add_argument("--source", help="Directory with recorded pages (from --save-source)")
+    parser.add_argument("--years", type=int, default=10, help="Synthetic years to generate without --source")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per backend, best is reported")
+    parser.add_argument("--chunk", type=int, default=65536, help="Characters fed at a time")
+    parser.add_argument("--stations", help="Stations filter applied while parsing, e.g. 'Nn&Ns'")
+    args = parser.parse_args()
+
+    if args.source:
+        pages = load_pages(args.source)
+    else:
+        pages = [(f"sample {year}{' intensive' if intensive else ''}", sample_page(year, intensive), intensive)
+                 for year in range(2025 - args.years + 1, 2026) for intensive in (False, True)]
+    if not pages:
+        sys.exit(f"no index.html pages found in {args.source}")
+
+    size = sum(len(text) for _, text, _ in pages)
+    stations = f", stations filter '{args.stations}'" if args.stations else ""
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB{stations}")
+
+    reference   = parse_all("bs4", pages, args.chunk, args.stations)
+    total_rows  = sum(len(rows) for rows in reference)
+    identical   = True
+
+    timings = {}
+    for name in available_backends():
+        results = parse_all(name, pages, args.chunk, args.stations)
+        best    = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parse_all(name, pages, args.chunk, args.stations)
+            best = min(best, time.perf_counter() - start)
+
+        same = results == reference
+        identical = identical and same
+        if not same:
+            bad = next(page for page, a, b in zip(pages, results, reference) if a != b)
+            print(f"  {name}: first difference in {bad[0]}")
+        timings[name] = (best, same)
+
+    print(f"{'backend':<12} {'rows':>7} {'time ms':>9} {'rows/s':>10} {'vs bs4':>7}  same rows")
+    for name, (best, same) in sorted(timings.items(), key=lambda item: item[1][0]):
+        print(f"{name:<12} {total_rows:>7} {best * 1000:>9.1f} {total_rows / best:>10.0f} "
+              f"{timings['bs4'][0] / best:>6.1f}x  {'yes' if same else 'NO'}")
+
+    sys.exit(0 if identical else 1)
+# --- END OF main() ----------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Filename:       bench_row_memory.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Memory held by the parsed rows of a 10-year load (master and intensive pages), in bytes per row, as
+                measured by tracemalloc: everything allocated while parsing that is still alive afterwards. Then the
+                same for the SessionTable built from them, once the rows themselves are dropped.
+
+Notes:          PYTHONPATH=src python scripts/bench_row_memory.py [--source DIR] [--parser NAME]
+                Without --source, synthetic pages for 2016-2025 are used (see sample_pages.py).
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import gc
+import sys
+import argparse
+import tracemalloc
+
+from ivs_sessions_browser.defs              import HEADERS
+from ivs_sessions_browser.parser_backends   import select_backend
+from ivs_sessions_browser.session_table     import SessionTable
+
+from sample_pages import sample_page
+from bench_parsers import load_pages
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes per parsed row on a 10-year load")
+    parser.add_argument("--source", help="Directory with recorded pages (from --save-source)")
+    parser.add_argument("--parser", default="auto", help="Parser backend (default: auto)")
+    args = parser.parse_args()
+
+    if args.source:
+        pages = load_pages(args.source)
+    else:
+        pages = [(f"sample {year}", sample_page(year, intensive), intensive)
+                 for year in range(2016, 2026) for intensive in (False, True)]
+    if not pages:
+        sys.exit(f"no index.html pages found in {args.source}")
+
+    backend = select_backend(args.parser)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    rows = []
+    for _, text, is_intensive in pages:
+        page = backend(len(HEADERS), is_intensive)
+        page.feed(text)
+        page.close()
+        rows.extend(page.pop_rows())
+        del page
+
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+
+    table = SessionTable(rows)
+    del rows
+    gc.collect()
+    held_table = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{len(pages)} pages, {len(table)} rows, parser {backend.name}")
+    print(f"rows hold {held / 1024:.0f} KiB, {held / len(table):.0f} bytes per row")
+    print(f"table holds {held_table / 1024:.0f} KiB, {held_table / len(table):.0f} bytes per row")
+# --- END OF main() ----------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    main()
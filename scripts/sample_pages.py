@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Filename:       sample_pages.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Synthetic IVS schedule pages for the benchmark scripts, laid out like the site (and like --source
+                expects): sessions/<year>/index.html and sessions/intensive/<year>/index.html.
+
+Notes:          Run on its own to write a directory of pages:
+                    python scripts/sample_pages.py DIR 2010 2025
+                Recorded pages (--save-source) are better for benchmarking; these are for when there are none.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import sys
+import random
+
+from datetime   import datetime, timedelta
+from typing     import List
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+STATIONS = ["Nn", "Ns", "Wz", "Ht", "Hb", "Ke", "Yg", "Kk", "On", "Ow", "Ft", "Ur", "Ag", "Oe",
+            "Ny", "Ma", "Mc", "Sa", "Ts", "Wn", "Is", "Kv", "Bd", "Sv", "Zc", "Ys", "Ww", "Wf"]
+
+HEADER_CELLS = ["Type", "Code", "Start", "DOY", "Dur", "Stations", "DB Code", "Ops Center", "Correlator", "Status",
+                "Analysis"]
+
+
+
+def sample_page(_year: int, _is_intensive: bool = False, _rows: int = 0) -> str:
+    """
+    One schedule page, in the markup of the IVS site. The same arguments always give the same page.
+
+    :param _year:           The year
+    :param _is_intensive:   Intensive page (short sessions, 2-3 stations) or master page
+    :param _rows:           Number of sessions, 0 for a typical number
+    :return:                The page, as text
+    """
+
+    rnd     = random.Random(_year * 7 + _is_intensive)
+    count   = _rows or (200 if _is_intensive else 160)
+    prefix  = "intensive/" if _is_intensive else ""
+    rows: List[str] = []
+
+    for i in range(count):
+        code    = f"{'I' if _is_intensive else 'R'}{_year % 100:02d}{i:03d}"
+        doy     = 1 + i * 365 // count
+        start   = datetime(_year, 1, 1) + timedelta(days=doy - 1, hours=rnd.choice([7, 17, 18]))
+        ids     = rnd.sample(STATIONS, rnd.randint(2, 3 if _is_intensive else 12))
+        removed = set(rnd.sample(ids, 1)) if len(ids) > 2 and rnd.random() < 0.2 else set()
+        items   = "".join(f'<li class="station-id{" removed" if s in removed else ""}">{s}</li>' for s in ids)
+        kind    = "Intensive" if _is_intensive else rnd.choice(["IVS-R1", "IVS-R4", "IVS-T2", "VGOS-OPS"])
+        status  = rnd.choice(["Released", "Processing session", "Waiting on media", "Cancelled", ""])
+
+        rows.append(f"""<tr>
+  <td>{kind}</td>
+  <td><a href="/sessions/{prefix}{_year}/{code.lower()}/">{code}</a></td>
+  <td>{start:%Y-%m-%d %H:%M}</td>
+  <td>{doy:03d}</td>
+  <td>{'01:00' if _is_intensive else '24:00'}</td>
+  <td><ul class="station-list">{items}</ul></td>
+  <td>{code[:2]}{_year % 100:02d}{i:03d}</td>
+  <td>{rnd.choice(['NASA', 'USNO', 'IAA', 'BKG'])}</td>
+  <td>{rnd.choice(['WASH', 'BONN', 'VIEN', 'HAYS'])}</td>
+  <td>{status}</td>
+  <td>{rnd.choice(['', 'Released', 'Submitted'])}</td>
+</tr>""")
+
+    header = "".join(f"<th>{h}</th>" for h in HEADER_CELLS)
+    body   = "\n".join(rows)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Sessions {_year}</title></head><body>\n'
+            f'<table class="table"><thead><tr>{header}</tr></thead>\n<tbody>\n{body}\n</tbody></table></body></html>')
+# --- END OF sample_page() ---------------------------------------------------------------------------------------------
+
+
+
+def write_sample_site(_dir: str, _first_year: int, _last_year: int, _rows: int = 0) -> List[str]:
+    """
+    Writes master and intensive pages for each year into _dir.
+
+    :param _dir:        Where to write (created if needed)
+    :param _first_year: First year
+    :param _last_year:  Last year, inclusive
+    :param _rows:       Sessions per page, 0 for a typical number
+    :return:            The relative page paths written, master and intensive per year
+    """
+
+    written: List[str] = []
+    for year in range(_first_year, _last_year + 1):
+        for is_intensive in (False, True):
+            rel = f"sessions/{'intensive/' if is_intensive else ''}{year}/index.html"
+            path = os.path.join(_dir, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(sample_page(year, is_intensive, _rows))
+            written.append(rel)
+    return written
+# --- END OF write_sample_site() ---------------------------------------------------------------------------------------
+
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit(f"usage: {sys.argv[0]} DIR FIRST_YEAR LAST_YEAR")
+    write_sample_site(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
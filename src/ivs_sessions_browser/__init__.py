@@ -6,6 +6,10 @@ from .defs import ARGUMENT_EPILOG, ARGUMENT_DESCRIPTION, ARGUMENT_FORMATTER_CLAS
 import argparse
 from datetime           import datetime
 from .sessions_browser  import SessionsBrowser
+from .http_cache        import HttpCache
+from .row_snapshot      import RowSnapshot
+from .local_source      import LocalSource, SourceMirror
+from .parser_backends   import BACKENDS, select_backend
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
@@ -18,6 +22,32 @@ except ImportError:
 
 
 
+def _year_list(_text: str) -> list[int]:
+    """
+    argparse type for --years: a range '2010-2025', a list '2010,2015,2020', or a mix '2010-2012,2020'
+
+    :param _text:   The argument as given
+    :return:        Sorted list of unique years
+    """
+
+    years: set[int] = set()
+    try:
+        for part in filter(None, (p.strip() for p in _text.split(","))):
+            first, _, last = part.partition("-")
+            first_year = int(first)
+            last_year = int(last) if last else first_year
+            if last_year < first_year:
+                raise ValueError(part)
+            years.update(range(first_year, last_year + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid year range: '{_text}' (use e.g. 2010-2025 or 2010,2015)")
+    if not years:
+        raise argparse.ArgumentTypeError("no years given")
+    return sorted(years)
+# --- END OF _year_list() ----------------------------------------------------------------------------------------------
+
+
+
 # --- Main entry point (used by pyproject.toml [project.scripts])
 def main() -> None:
     """
@@ -25,8 +55,19 @@ def main() -> None:
 
     Possible command line arguments:
         * --year        {the year you want to browse: xxxx}
+        * --years       {several years: 2010-2025, 2010,2015 or a mix}, instead of --year
         * --scope       {master, intensive, both}, defaults to both
         * --stations    {[station code: Xx]}, supports |(OR), &(AND), defaults to all stations
+        * --workers     {number of schedule pages fetched in parallel}, defaults to 4
+        * --max-age     {seconds a cached page is used without asking the server}, defaults to 0
+        * --no-cache    don't read or write the on-disk page cache, nor the parsed row snapshots
+        * --refresh     download everything again, ignoring (but updating) the cache
+        * --rate-limit  {max requests per second to the server}, defaults to 5
+        * --refresh-interval {seconds between background refreshes while browsing}, defaults to 0 (off)
+        * --source      {directory or .tar.gz with sessions/<year>/index.html etc.}, read instead of the network
+        * --save-source {directory}, mirror every page fetched, in the layout --source reads
+        * --parser      {auto, html.parser, lxml, selectolax, bs4}, defaults to auto (fastest installed)
+        * --parse-workers {number of processes parsing pages of a multi-page load}, defaults to 0 (parse in threads)
     """
 
     # ARGUMENT_DESCRIPTION = "IVS Sessions TUI Browser"
@@ -45,10 +86,14 @@ def main() -> None:
                                          epilog=ARGUMENT_EPILOG,
                                          formatter_class=ARGUMENT_FORMATTER_CLASS)
 
-    arg_parser.add_argument("--year",
+    year_group = arg_parser.add_mutually_exclusive_group()
+    year_group.add_argument("--year",
                             type=int,
                             default=datetime.now().year,
                             help="Year (default: current year)")
+    year_group.add_argument("--years",
+                            type=_year_list,
+                            help="Several years, merged into one list: 2010-2025, 2010,2015 or 2010-2012,2020")
 
     arg_parser.add_argument("--scope",
                             choices=("master", "intensive", "both"),
@@ -60,6 +105,45 @@ def main() -> None:
     arg_parser.add_argument("--stations-active",
                             type=str,
                             help="Initial stations filter")
+    arg_parser.add_argument("--workers",
+                            type=int,
+                            default=4,
+                            help="Max number of schedule pages fetched in parallel (default: 4, 1 = one at a time)")
+    arg_parser.add_argument("--max-age",
+                            type=float,
+                            default=0,
+                            help="Seconds a cached schedule page is used without asking the server "
+                                 "(default: 0, always revalidate)")
+    arg_parser.add_argument("--no-cache",
+                            action="store_true",
+                            help="Don't read or write the on-disk page cache, nor the parsed row snapshots")
+    arg_parser.add_argument("--refresh",
+                            action="store_true",
+                            help="Download all pages again, ignoring the cache (the cache is still updated)")
+    arg_parser.add_argument("--rate-limit",
+                            type=float,
+                            default=5.0,
+                            help="Max requests per second to the server (default: 5, 0 = no limit)")
+    arg_parser.add_argument("--refresh-interval",
+                            type=float,
+                            default=0,
+                            help="Re-fetch the sessions every N seconds while browsing (default: 0, off)")
+    arg_parser.add_argument("--source",
+                            metavar="DIR|ARCHIVE",
+                            help="Read the schedule pages from a directory or tar archive (sessions/<year>/index.html, "
+                                 "sessions/intensive/<year>/index.html) instead of the network")
+    arg_parser.add_argument("--save-source",
+                            metavar="DIR",
+                            help="Save every schedule page fetched to DIR, in the layout --source reads")
+    arg_parser.add_argument("--parser",
+                            choices=("auto", *BACKENDS),
+                            default="auto",
+                            help="HTML parser for the schedule pages (default: auto, the fastest one installed)")
+    arg_parser.add_argument("--parse-workers",
+                            type=int,
+                            default=0,
+                            help="Processes parsing the schedule pages of a multi-page load "
+                                 "(default: 0, parse in the download threads)")
     # arg_parser.add_argument("--stations",
     #                         choices=("all", "active", "removed"),
     #                         default="all",
@@ -68,9 +152,38 @@ def main() -> None:
 
     args = arg_parser.parse_args()
 
+    try:
+        select_backend(args.parser)
+    except ValueError as e:
+        arg_parser.error(str(e))
+
+    source = None
+    if args.source:
+        try:
+            source = LocalSource(args.source)
+        except ValueError as e:
+            arg_parser.error(str(e))
+
+    save_source = SourceMirror(args.save_source) if args.save_source else None
+
+    # --- Local pages are not cached; they are on disk already
+    use_cache   = not args.no_cache and source is None
+    cache       = HttpCache(_max_age = args.max_age, _refresh = args.refresh) if use_cache else None
+    snapshot    = RowSnapshot() if use_cache else None
+
     sb: SessionsBrowser = SessionsBrowser(_year             = args.year,
                                           _scope            = args.scope,
-                                          _stations_filter  = args.stations)
+                                          _stations_filter  = args.stations,
+                                          _workers          = args.workers,
+                                          _cache            = cache,
+                                          _snapshot         = snapshot,
+                                          _years            = args.years,
+                                          _rate_limit       = args.rate_limit,
+                                          _refresh_interval = args.refresh_interval,
+                                          _source           = source,
+                                          _save_source      = save_source,
+                                          _parser           = args.parser,
+                                          _parse_workers    = args.parse_workers)
     sb.run()
 
     exit(0)
@@ -0,0 +1,102 @@
+"""
+Filename:       auto_refresh.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Re-fetches the session lists on a background thread, so the TUI can pick up status changes without
+                blocking the key loop.
+
+Notes:          The thread runs _fetch, which may also do the heavy work on what it fetched (SessionsBrowser merges the
+                rows and builds the new table and its index there). Results are handed over through a queue, and the
+                main loop, which owns all UI state, only swaps them in.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import queue
+import threading
+
+from datetime   import datetime
+from typing     import Any, Callable, Optional, Tuple, Union
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+class AutoRefresher:
+    """
+    Calls _fetch every _interval seconds on a daemon thread. The main loop collects the outcome with poll().
+    """
+
+    def __init__(self,
+                 _interval: float,
+                 _fetch:    Callable[[], Any]
+                 ) -> None:
+
+        self.interval   = _interval
+        self.fetch      = _fetch
+
+        # --- (finished at, what _fetch returned or the exception raised)
+        self.results: "queue.Queue[Tuple[datetime, Union[Any, Exception]]]" = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def start(self) -> None:
+        """
+        Starts the background thread.
+
+        :return: None
+        """
+
+        self.thread = threading.Thread(target=self._run, name="auto-refresh", daemon=True)
+        self.thread.start()
+    # --- END OF start() -----------------------------------------------------------------------------------------------
+
+
+
+    def stop(self) -> None:
+        """
+        Asks the background thread to stop. A fetch in progress is not interrupted, but its result is dropped.
+
+        :return: None
+        """
+
+        self.stop_event.set()
+    # --- END OF stop() ------------------------------------------------------------------------------------------------
+
+
+
+    def poll(self) -> Optional[Tuple[datetime, Union[Any, Exception]]]:
+        """
+        Non-blocking: the newest finished refresh, if any arrived since the last call. Older ones are superseded.
+
+        :return: (finished at, result or exception), or None
+        """
+
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                return latest
+    # --- END OF poll() ------------------------------------------------------------------------------------------------
+
+
+
+    def _run(self) -> None:
+        """
+        Thread body: wait, fetch, hand over, repeat until stopped.
+
+        :return: None
+        """
+
+        while not self.stop_event.wait(self.interval):
+            try:
+                result: Union[Any, Exception] = self.fetch()
+            except Exception as e:
+                result = e
+            if not self.stop_event.is_set():
+                self.results.put((datetime.now(), result))
+    # --- END OF _run() ------------------------------------------------------------------------------------------------
+# --- END OF class AutoRefresher ---------------------------------------------------------------------------------------
@@ -36,11 +36,18 @@ HELP_TEXT = [
             "  ↑/↓ : Move selection",
             "  PgUp/PgDn : Page up/down",
             "  Home/End : Jump to first/last",
-            "  T : Jump to today's session",
-            "  Enter : Open session in browser",
+            "  T : Jump to the session running now, or the next one",
+            "  J : Jump to a date (YYYY-MM-DD [HH:MM], YYYY-MM, YYYY-DDD, YYYY)",
+            "  Enter : Show/hide session details",
+            "  o : Open session in browser",
+            "",
+            "Sorting:",
+            "  s : Sort on the next column (Start, Code, DOY, Dur, Status, Ops, Corr)",
+            "  S : Reverse the sort order",
+            "  O : Sort on columns typed, e.g. 'status, -start' (- for descending)",
             "",
             "Filtering:",
-            "  / : Enter filter (field:value, supports AND/OR)",
+            "  / : Enter filter (field:value, supports AND/OR), matches shown as you type",
             "  C : Clear filters",
             "  R : Toggle show/hide removed stations",
             "",
@@ -63,6 +70,8 @@ HELP_TEXT = [
 
 ARGUMENT_FORMATTER_CLASS = argparse.RawDescriptionHelpFormatter
 
+# --- (values, session_url, meta). The rows themselves are session_record.SessionRecord's, which unpack and index the
+# --- same way, with the values as a tuple and meta built from their fields.
 Row         = Tuple[List[str], Optional[str], Dict[str, Any]]
 
 BASE_URL    = "https://ivscc.gsfc.nasa.gov/sessions"
@@ -127,9 +136,12 @@ def recompute_header_widths(rows: List[Row]) -> None:
     mins   = [w for _, w in HEADERS]
     num    = len(titles)
 
-    # --- Observed content lengths per column
+    # --- Observed content lengths per column; a TableView works them out from its table's columns
     obs = [0]*num
     any_intensive = False
+    if hasattr(rows, "observed_widths"):
+        obs, any_intensive = rows.observed_widths()
+        rows = ()
     for values, _url, meta in rows:
         any_intensive = any_intensive or bool(meta.get("intensive"))
         for i in range(min(num, len(values))):
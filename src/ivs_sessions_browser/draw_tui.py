@@ -12,13 +12,15 @@ Notes:
 import curses
 import textwrap
 
-from typing import List
+from typing import List, Optional, Union
 
 #from repo.scripts.type_defs import WIDTHS
 # --- Project defined
 #  from .defs      import HEADER_LINE, WIDTHS, FIELD_INDEX, Row, HEADER_DICT, HELP_TEXT
 from . import defs as D
 from .tui_state import UIState, TUITheme
+from .session_details import SessionDetails
+from .filter_and_sort import DEFAULT_SORT, format_sort_keys
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
@@ -40,7 +42,8 @@ class DrawTUI():
         win = curses.newwin(height, width, y, x)
         win.box()
 
-        for i, text in enumerate(D.HELP_TEXT, start=1):
+        # --- Lines that don't fit a short terminal are left out (writing below the box is an error)
+        for i, text in enumerate(D.HELP_TEXT[:height - 2], start=1):
             attr = 0
             if i == 1:  # title
                 attr = curses.A_UNDERLINE | curses.A_BOLD
@@ -80,11 +83,15 @@ class DrawTUI():
 
         max_y, max_x = _stdscr.getmaxyx()
         # help_text = "↑↓-PgUp/PgDn-Home/End:Move Enter:Open /:Filter F:Clear filters ?:Help R:Hide/show removed q/Q:Quit"
-        help_text = "/:Filter C:Clear filters T: Jump to today R:Hide/show removed ?:Help q/Q:Quit"
+        help_text = "Enter:Details o:Open /:Filter C:Clear filters T:Today J:Date s/S/O:Sort R:Hide/show removed ?:Help q/Q:Quit"
 
         # --- Part of recomputing HEADER widths
         # right = f"row {min(_state.selected + 1, len(_view_rows))}/{len(_view_rows)}"
         right = f"row {min(_state.selected + 1, len(_view_rows))}/{len(_view_rows)}"
+        if _state.last_updated:
+            right = f"updated {_state.last_updated}  {right}"
+        if _state.sort_keys != DEFAULT_SORT:
+            right = f"sort {format_sort_keys(_state.sort_keys)}  {right}"
 
         bar = (help_text + (f" Filter: {_current_filter}" if _current_filter else "") + "  " + right)[
             : max_x - 1]
@@ -94,6 +101,66 @@ class DrawTUI():
 
 
 
+    def draw_details(self,
+                     _stdscr,
+                     _top:      int,
+                     _height:   int,
+                     _row:      Optional[D.Row],
+                     _details:  Union[SessionDetails, Exception, None],
+                     _pending:  bool,
+                     _theme:    TUITheme
+                     ) -> None:
+        """
+        Draws the detail pane for the selected row, below the rows: title, dates, stations with names and file links.
+
+        :param _stdscr:     Where to draw
+        :param _top:        First screen line of the pane
+        :param _height:     Lines available, including the separator line on top
+        :param _row:        The selected row, or None if there are no rows
+        :param _details:    What DetailFetcher has for the row: details, an exception, or None if not fetched yet
+        :param _pending:    True while the row's page is being fetched
+        :param _theme:      Colors
+        :return:            None
+        """
+
+        _, max_x    = _stdscr.getmaxyx()
+        width       = max(10, max_x - 1)
+        code        = _row[0][D.FIELD_INDEX["code"]] if _row else ""
+
+        self._addstr_clip(_stdscr, _top, 0, f"--- {code} " + "-" * width, _theme.header)
+
+        lines: List[tuple] = []     # (text, attr)
+        if _row is None:
+            lines.append(("No session selected.", 0))
+        elif not _row[1]:
+            lines.append(("This session has no page.", 0))
+        elif isinstance(_details, Exception):
+            lines.append((f"Could not load {_row[1]}: {_details.__class__.__name__}: {_details}", _theme.cancelled))
+        elif _details is None:
+            lines.append(("Loading…" if _pending else "", 0))
+        else:
+            lines.append((_details.title or code, curses.A_BOLD))
+            if _details.dates:
+                lines.append(("Dates:", _theme.header))
+                text = "   ".join(f"{label}: {value}" for label, value in _details.dates)
+                lines.extend((line, 0) for line in textwrap.wrap(text, width, initial_indent="  ",
+                                                                 subsequent_indent="  "))
+            if _details.stations:
+                lines.append((f"Stations ({len(_details.stations)}):", _theme.header))
+                text = ", ".join(f"{c} {name}" if name else c for c, name in _details.stations)
+                lines.extend((line, 0) for line in textwrap.wrap(text, width, initial_indent="  ",
+                                                                 subsequent_indent="  "))
+            if _details.files:
+                lines.append((f"Files ({len(_details.files)}):", _theme.header))
+                name_w = max(len(name) for name, _ in _details.files)
+                lines.extend((f"  {name:<{name_w}}  {url}", 0) for name, url in _details.files)
+
+        for i, (text, attr) in enumerate(lines[:max(0, _height - 1)]):
+            self._addstr_clip(_stdscr, _top + 1 + i, 0, text, attr)
+    # --- END OF draw_details() ----------------------------------------------------------------------------------------
+
+
+
     def _col_start_x(self, _col_idx: int) -> int:
         """
         Computes the x offset where column _col_idx starts in the printed line.
@@ -10,241 +10,321 @@ Notes:
 
 # --- Import section ---------------------------------------------------------------------------------------------------
 from __future__ import annotations
+from bisect import bisect_left
 from datetime import datetime
-from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 from .defs import Row, FIELD_INDEX  # row = (values: List[str], url: Optional[str], meta: Dict[str, Any])
 
-import re
-
 # --- Project defined
-from .defs import DATEFORMAT
+from . import numpy_backend
+from .numpy_backend import VectorTable
+from .row_index import RowIndex
+from .filter_query import CompiledQuery, Query, compile_query, narrows, parse_query, parse_date, FIELD_ALIASES
+from .session_table import SessionTable, TableView, epoch_of
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
 
+# --- Columns the s key cycles through, and the most sort keys kept
+SORT_COLUMNS    = ("start", "code", "doy", "dur", "status", "ops", "corr")
+MAX_SORT_KEYS   = 3
+
+# --- (column name, ascending) pairs, the first the primary key
+SortKeys        = Tuple[Tuple[str, bool], ...]
+DEFAULT_SORT    = (("start", True),)
+
+
+
+def parse_sort_keys(_text: str) -> Optional[SortKeys]:
+    """
+    :param _text:   Sort keys as typed, e.g. 'status, -start': column names, '-' in front for descending
+    :return:        The sort keys, or None if a name isn't a column
+    """
+
+    keys = []
+    for token in _text.replace(",", " ").split():
+        name = token.lstrip("+-").lower()
+        name = FIELD_ALIASES.get(name, name)
+        if name not in FIELD_INDEX:
+            return None
+        if all(name != key for key, _ in keys):
+            keys.append((name, not token.startswith("-")))
+    return tuple(keys) or None
+# --- END OF parse_sort_keys() -----------------------------------------------------------------------------------------
+
+
+
+def format_sort_keys(_keys: SortKeys) -> str:
+    """
+    :param _keys:   Sort keys
+    :return:        The text parse_sort_keys() reads back, e.g. 'status, -start'
+    """
+
+    return ", ".join(("" if ascending else "-") + key for key, ascending in _keys)
+# --- END OF format_sort_keys() ----------------------------------------------------------------------------------------
+
+
+
+def cycle_sort_keys(_keys: SortKeys) -> SortKeys:
+    """
+    :param _keys:   Sort keys
+    :return:        The next column of SORT_COLUMNS as the primary key, ascending, the keys after it kept
+    """
+
+    primary = _keys[0][0] if _keys else None
+    column  = SORT_COLUMNS[(SORT_COLUMNS.index(primary) + 1) % len(SORT_COLUMNS) if primary in SORT_COLUMNS else 0]
+    return ((column, True),) + tuple(key for key in _keys[1:] if key[0] != column)[:MAX_SORT_KEYS - 1]
+# --- END OF cycle_sort_keys() -----------------------------------------------------------------------------------------
+
+
+
 class FilterAndSort:
     """
     Single place for:
-      - parsing a user query into predicates
-      - applying those predicates to rows
-      - common sorts (e.g., by 'start')
-      - helpers like 'index_on_or_after_today'
+      - compiling a user query (filter_query.py) for a SessionTable, and keeping the compiled queries
+      - running them, giving a TableView
+      - sorting on one or more columns
+      - helpers like 'index_on_or_after_today' and 'index_on_or_after'
+    Station, value and range clauses and sorting run on NumPy arrays when it is installed (numpy_backend.py), with
+    the same results as in Python.
     """
 
+    # --- Compiled queries kept, by query text
+    MAX_COMPILED = 64
+
+    def __init__(self, _use_numpy: bool = True) -> None:
+        """
+        :param _use_numpy:  False keeps to Python even when NumPy is installed (to compare the two)
+        """
+
+        # --- Bitmap index of the table last passed to build_index(); apply() uses it for that table
+        self.index: Optional[RowIndex] = None
+
+        # --- Arrays of the table last filtered or sorted, if NumPy is used
+        self.use_numpy                      = _use_numpy and numpy_backend.available()
+        self.vector: Optional[VectorTable]  = None
+
+        # --- LRU of compiled queries, most recently used last. They belong to one table, and are dropped when
+        # --- another one is filtered or indexed.
+        self.compiled: "OrderedDict[str, CompiledQuery]" = OrderedDict()
+
+        # --- The last filter run: table, query and matching row numbers (table order). A query that narrows it is
+        # --- run on those rows only.
+        self.last_filter: Optional[Tuple[SessionTable, Query, List[int]]] = None
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def build_index(self, _table: SessionTable) -> None:
+        """
+        Indexes _table (see row_index.py), so filtering it is mostly bitwise operations. Call it whenever the table
+        of all rows is replaced, e.g. after a fetch.
+
+        :param _table:  The table to index
+        :return:        None
+        """
+
+        self.use_index(RowIndex(_table))
+    # --- END OF build_index() -----------------------------------------------------------------------------------------
+
+
+
+    def use_index(self, _index: RowIndex) -> None:
+        """
+        Takes an index built elsewhere, e.g. on the refresh thread, as build_index() would have made it.
+
+        :param _index:  The index of the table about to be filtered
+        :return:        None
+        """
+
+        self.index = _index
+        self.compiled.clear()
+    # --- END OF use_index() -------------------------------------------------------------------------------------------
+
 
 
     def apply(self,
-              _rows: List[Row],
+              _table: SessionTable,
               _query: str           = "",
               *,
               _show_removed: bool   = True,
-              _sort_key: str        = "start",
-              _ascending: bool      = True,
-              ) -> List[Row]:
-
-        preds       = self._predicates_from_query(_query)
-        filtered    = [r for r in _rows if all(p(r) for p in preds)]
+              _sort_keys: SortKeys  = DEFAULT_SORT,
+              ) -> TableView:
+        """
+        :param _table:          All rows
+        :param _query:          The filter (see FILTER_SYNTAX.md)
+        :param _show_removed:   False shows only the active stations in the stations column (done when drawing)
+        :param _sort_keys:      Columns to sort on, and the order of each
+        :return:                The matching rows, sorted, as row numbers into _table
+        """
 
-        # --- optional post-filter projection when hiding removed stations
-        if not _show_removed:
-            filtered = [self._with_active_only(r) for r in filtered]
-        return self.sort(filtered, _sort_key = _sort_key, _ascending = _ascending)
+        filtered = self.filter(_table, _query)
+        return TableView(_table,
+                         self.sort_indices(_table, filtered, _sort_keys = _sort_keys),
+                         _show_removed,
+                         _sort_keys)
     # --- END OF apply() -----------------------------------------------------------------------------------------------
 
 
 
-    def sort(self, _rows: List[Row], *, _sort_key: str = "start", _ascending: bool = True) -> List[Row]:
-        keyfunc = self._keyfunc(_sort_key)
-        return sorted(_rows, key = keyfunc, reverse = not _ascending)
-    # --- END OF sort() ------------------------------------------------------------------------------------------------
+    def filter(self, _table: SessionTable, _query: str) -> List[int]:
+        """
+            Runs _query on _table. If it narrows the query run last on the same table (filter_query.narrows(): a
+        clause added, an OR alternative dropped, ...), only the rows that one matched are looked at; else all rows.
+        A query answered from the index alone has nothing to test per row, and always takes its rows from the index.
 
+        :param _table:  The table
+        :param _query:  The filter as typed
+        :return:        The matching row numbers, in table order
+        """
 
+        compiled    = self.compile(_table, _query)
+        last        = self.last_filter
+        if last is not None and last[0] is _table and compiled.query == last[1]:
+            filtered = last[2]
+        elif last is not None and last[0] is _table and compiled.steps and narrows(compiled.query, last[1]):
+            filtered = compiled.rows(last[2])
+        else:
+            filtered = compiled.rows()
+        self.last_filter = (_table, compiled.query, filtered)
+        return filtered
+    # --- END OF filter() ----------------------------------------------------------------------------------------------
 
-    def index_on_or_after_today(self, _rows: List[Row], _now: Optional[datetime] = None) -> int:
-        _now = _now or datetime.now()
-        for i, r in enumerate(_rows):
-            dt = self._parse_start(r)
-            if dt and dt >= _now:
-                return i
-        return max(0, len(_rows) - 1)
-    # --- END OF index_on_or_after_today() -----------------------------------------------------------------------------
 
 
+    def compile(self, _table: SessionTable, _query: str) -> CompiledQuery:
+        """
+        :param _table:  The table to filter
+        :param _query:  The filter as typed
+        :return:        The query compiled for _table, from the LRU if it was compiled before
+        """
 
-    def extract_station_tokens(self, _query: str) -> List[str]:
-        """Return station tokens for highlighting (dedup, longer-first)."""
-        if not _query:
-            return []
-        tokens: List[str] = []
-        for clause in self._split_clauses(_query):
-            if ":" not in clause:
-                continue
-            field, value = [p.strip() for p in clause.split(":", 1)]
-            fld = field.lower()
-            if fld in ("stations", "stations_active", "stations-active",
-                       "stations_removed", "stations-removed",
-                       "stations_all", "stations-all"):
-                parts = re.split(r"[ ,+|&]+", value)
-                tokens.extend([p for p in parts if p])
-        return sorted(set(tokens), key=lambda s: (-len(s), s))
-    # --- END OF extract_station_tokens() ------------------------------------------------------------------------------
+        key         = (_query or "").strip()
+        compiled    = self.compiled.get(key)
+        if compiled is not None and compiled.table is _table:
+            self.compiled.move_to_end(key)
+            return compiled
+
+        if any(c.table is not _table for c in self.compiled.values()):
+            self.compiled.clear()
+        index       = self.index if self.index is not None and self.index.is_for(_table) else None
+        compiled    = self.compiled[key] = compile_query(key, _table, index, self.vector_for(_table))
+        if len(self.compiled) > self.MAX_COMPILED:
+            self.compiled.popitem(last=False)
+        return compiled
+    # --- END OF compile() ---------------------------------------------------------------------------------------------
 
 
 
-    def _predicates_from_query(self, _query: str) -> List[Callable[[Row], bool]]:
+    def vector_for(self, _table: SessionTable) -> Optional[VectorTable]:
         """
-        Grammar (from ARGUMENT_EPILOG):
-          - Clauses separated by ';' are AND across the whole query
-          - Non-stations fields: tokens split by space/comma/plus/pipe are OR
-          - Stations active (default): stations: Nn&Ns  or  stations: Nn|Ns
-          - Stations removed/any: stations_removed: Ft|Ur   stations_all: Hb|Ht
+        :param _table:  A table
+        :return:        Its VectorTable, made when another table was used last; None without NumPy
         """
-        _query = (_query or "").strip()
-        if not _query:
-            return [lambda _r: True]
 
-        preds: List[Callable[[Row], bool]] = []
-        for clause in self._split_clauses(_query):
-            if ":" not in clause:
-                # Free-text (fallback OR over all columns)
-                val = clause
-                preds.append(self._predicate_any_field_contains(val))
-                continue
+        if not self.use_numpy:
+            return None
+        if self.vector is None or not self.vector.is_for(_table):
+            self.vector = VectorTable(_table)
+        return self.vector
+    # --- END OF vector_for() ------------------------------------------------------------------------------------------
 
-            field, value = [p.strip() for p in clause.split(":", 1)]
-            fld = field.lower()
 
-            if fld in ("stations", "stations_active", "stations-active"):
-                preds.append(self._predicate_stations_active(value))
-            elif fld in ("stations_removed", "stations-removed"):
-                preds.append(self._predicate_stations_removed(value))
-            elif fld in ("stations_all", "stations-all"):
-                preds.append(self._predicate_stations_all(value))
-            else:
-                preds.append(self._predicate_field_tokens_or(fld, value))
-        return preds
-    # --- END OF _predicates_from_query() ------------------------------------------------------------------------------
 
+    def sort_indices(self,
+                     _table: SessionTable,
+                     _indices: List[int],
+                     *,
+                     _sort_keys: SortKeys = DEFAULT_SORT
+                     ) -> List[int]:
+        """
+            Sorts row numbers of _table on one or more columns: the parsed start, DOY and duration, the text of the
+        others (SessionTable.rank()). Rows equal on all keys keep their order. The last key is taken from the
+        table's precomputed order of all rows, keeping the rows in _indices (a pass over the table, no comparisons);
+        each key before it is then a stable sort on its rank, last to first. Less than a third of the rows are sorted
+        on the rank of the last key instead, which is cheaper than passing over all of them. With NumPy, the same is
+        done on arrays (VectorTable.sort()).
+
+        :param _table:      The table
+        :param _indices:    Row numbers, in table order
+        :param _sort_keys:  (column name, ascending) pairs, the first the primary key; unknown names are skipped
+        :return:            The row numbers, sorted
+        """
+
+        keys = [(FIELD_INDEX[key.lower()], ascending) for key, ascending in _sort_keys
+                if (key or "").lower() in FIELD_INDEX]
+        if not keys:
+            return list(_indices)
 
+        vector = self.vector_for(_table)
+        if vector is not None:
+            return vector.sort(_indices, keys)
 
-    def _split_clauses(self, _query: str) -> List[str]:
-        return [c.strip() for c in _query.split(";") if c.strip()]
-    # --- END OF _split_clauses() --------------------------------------------------------------------------------------
+        col, ascending = keys[-1]
+        if len(_indices) == _table.size:
+            rows = list(_table.order(col, ascending))
+        elif len(_indices) * 3 < _table.size:
+            rows = sorted(_indices, key = _table.rank(col).__getitem__, reverse = not ascending)
+        else:
+            keep = bytearray(_table.size)
+            for i in _indices:
+                keep[i] = 1
+            rows = [i for i in _table.order(col, ascending) if keep[i]]
 
+        for col, ascending in reversed(keys[:-1]):
+            rows.sort(key = _table.rank(col).__getitem__, reverse = not ascending)
+        return rows
+    # --- END OF sort_indices() ----------------------------------------------------------------------------------------
 
-    
-    def _predicate_any_field_contains(self, _needle: str) -> Callable[[Row], bool]:
-        n = _needle.lower()
-        return lambda r: any(n in v.lower() for v in r[0])
-    # --- END OF _predicate_any_field_contains() -----------------------------------------------------------------------
 
 
+    def index_on_or_after_today(self, _rows: TableView, _now: Optional[datetime] = None) -> int:
+        """
+        :param _rows:   The rows shown
+        :param _now:    The time to jump to, default now
+        :return:        Position of the session running at _now, else of the first one starting after it
+        """
 
-    def _predicate_field_tokens_or(self, _fld: str, _value: str) -> Callable[[Row], bool]:
-        idx = FIELD_INDEX.get(_fld, None)
-        if idx is None or idx < 0:
-            # unknown field: match nothing (alternatively: any_field_contains)
-            return lambda _r: False
-        # tokens separated by space/comma/plus/pipe are OR
-        tokens = [t.lower() for t in re.split(r"[ ,+|]+", _value) if t]
-        return lambda r: any(tok in r[0][idx].lower() for tok in tokens)
-    # --- END OF _predicate_field_tokens_or() --------------------------------------------------------------------------
-
-
-
-    def _predicate_stations_active(self, _expr: str) -> Callable[[Row], bool]:
-
-        def match_and_or(_hay: str, _text: str) -> bool:
-            has_or = '|' in _text
-            has_and = '&' in _text
-            if has_or or has_and:
-                or_parts = [p.strip() for p in re.split(r"\s*\|{1,2}\s*", _text) if p.strip()]
-                for part in or_parts:
-                    and_chunks = [c.strip() for c in re.split(r"\s*&{1,2}\s*", part) if c.strip()]
-                    and_tokens: List[str] = []
-                    for chunk in and_chunks:
-                        and_tokens.extend([t for t in re.split(r"[ ,+]+", chunk) if t])
-                    if and_tokens and all(tok in _hay for tok in and_tokens):
-                        return True
-                    if not and_tokens and part and part in _hay:
-                        return True
-                return False
-            tokens = [t for t in re.split(r"[ ,+]+", _text) if t]
-            return all(tok in _hay for tok in tokens)
-        # --- END OF match_and_or() ------------------------------------------------------------------------------------
-        return lambda r: match_and_or(r[2].get("active", ""), _expr)
-    # --- END OF _predicate_stations_active() --------------------------------------------------------------------------
-
-
-
-    def _predicate_stations_removed(self, _expr: str) -> Callable[[Row], bool]:
-        return self._predicate_stations_side(_expr, _side = "removed")
-    # --- END OF _predicate_stations_removed() -------------------------------------------------------------------------
-
-
-
-    def _predicate_stations_all(self, _expr: str) -> Callable[[Row], bool]:
-        return self._predicate_stations_side(_expr, _side = "all")
-    # --- END OF _predicate_stations_all() -----------------------------------------------------------------------------
-
-
-    def _predicate_stations_side(self, _expr: str, *, _side: str) -> Callable[[Row], bool]:
-
-        def normalize(meta: Dict[str, Any]) -> str:
-            active = meta.get("active", "")
-            removed = meta.get("removed", "")
-            if _side == "removed":
-                return removed
-            if _side == "all":
-                return active + removed
-            return active
-        # --- END OF normalize() ---------------------------------------------------------------------------------------
-
-        # reuse active predicate logic on chosen haystack
-        def pred(_r: Row) -> bool:
-            hay = normalize(_r[2])
-            # return self._predicate_stations_active(_expr)(([_r[0], _r[1], {"active": hay, "removed": ""}]))
-            dummy_row: Row = (_r[0], _r[1], {"active": hay, "removed": ""})
-            return self._predicate_stations_active(_expr)(dummy_row)  # correct
-
-        # --- END OF pred() --------------------------------------------------------------------------------------------
-        return pred
-    # --- END OF _predicate_stations_side() ----------------------------------------------------------------------------
+        return self.index_on_or_after(_rows, _now or datetime.now())
+    # --- END OF index_on_or_after_today() -----------------------------------------------------------------------------
 
 
 
-    def _with_active_only(self, _r: Row) -> Row:
-        values, url, meta = _r
-        idx = FIELD_INDEX.get("stations", -1)
-        if idx >= 0 and meta.get("active"):
-            new_vals = list(values)
-            # left-justify to keep column alignment consistent with your renderer
-            new_vals[idx] = meta["active"].ljust(len(values[idx]))
-            return (new_vals, url, meta)
-        return _r
-    # --- END OF _with_active_only() -----------------------------------------------------------------------------------
+    def index_on_or_after(self, _rows: TableView, _when: datetime) -> int:
+        """
+            Finds the session running at _when, or else the first one starting after it (the last row if none does).
+        A TableView sorted ascending by start has its start values in order, so the first start at or after _when is
+        bisected, and the sessions running at _when are among the ones before it that started at most the longest
+        duration of the table earlier; any other order is scanned.
+
+        :param _rows:   The rows shown
+        :param _when:   The time to jump to
+        :return:        The position in _rows
+        """
 
+        last            = max(0, len(_rows) - 1)
+        when            = epoch_of(_when)
+        table, indices  = _rows.table, _rows.indices
+        if _rows.sort_key != "start" or not _rows.ascending:
+            start, end = table.start, table.end
+            return next((p for p, i in enumerate(indices) if start[i] >= when or end[i] > when), last)
 
+        key     = table.start.__getitem__
+        after   = bisect_left(indices, when, key=key)
+        first   = bisect_left(indices, when - table.longest, 0, after, key=key)
+        end     = table.end
+        return next((p for p in range(first, after) if end[indices[p]] > when), min(after, last))
+    # --- END OF index_on_or_after() -----------------------------------------------------------------------------------
 
-    def _keyfunc(self, _sort_key: str) -> Callable[[Row], Any]:
-        sk = (_sort_key or "").lower()
-        if sk == "start":
-            return self._parse_start
-        # fallback: column name in FIELD_INDEX or no-op
-        idx = FIELD_INDEX.get(sk, None)
-        if idx is None:
-            return lambda r: 0
-        return lambda r: r[0][idx]
-    # --- END OF _keyfunc() --------------------------------------------------------------------------------------------
 
 
-
-    def _parse_start(self, _r: Row):
-        start_str = _r[0][FIELD_INDEX["start"]]
-        try:
-            return datetime.strptime(start_str, DATEFORMAT)
-        except Exception:
-            return datetime.min
-    # --- END OF _parse_start() ----------------------------------------------------------------------------------------
+    def extract_station_tokens(self, _query: str) -> List[str]:
+        """Return station tokens for highlighting (dedup, longer-first)."""
+        if not _query:
+            return []
+        tokens = parse_query(_query.strip()).station_codes()
+        return sorted(set(tokens), key=lambda s: (-len(s), s))
+    # --- END OF extract_station_tokens() ------------------------------------------------------------------------------
 
 # --- END OF class FilterAndSort ---------------------------------------------------------------------------------------
\ No newline at end of file
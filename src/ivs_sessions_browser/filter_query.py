@@ -0,0 +1,600 @@
+"""
+Filename:       filter_query.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    The filter language of the TUI (docs/FILTER_SYNTAX.md). parse_query() turns the text typed after '/'
+                into a Query, a small AST:
+
+                    query       := clause (';' clause)*                         all clauses (AND)
+                    clause      := text | field ':' value | number ':' range
+                    value       := token ([ ,+|] token)*                        any token (OR), case-insensitive
+                    range       := ('>' | '>=' | '<' | '<=' | '=') bound | [bound] '..' [bound]
+                    stations    := group ('|' group)*                           any group (OR), case-sensitive
+                    group       := code ('&' code)* | code ([ ,+] code)*        all codes (AND)
+
+                compile_query() turns a Query into a CompiledQuery for one SessionTable: every token lower cased,
+                every value and station code looked up in the table's dictionaries. With a RowIndex, every clause is
+                answered from it (substring clauses through its trigram indexes) and folded into one bitset; without
+                one, the clauses become row tests, cheapest first. Ranges on the number columns (start, doy, dur) are
+                bisected in the column's sorted order either way (SessionTable.rows_between()). With a VectorTable
+                (NumPy installed, numpy_backend.py), station, value and range clauses are bool masks over all rows
+                instead, ANDed, and the other clauses are answered as above. Parsing is cached by query text;
+                FilterAndSort keeps the compiled queries of the current table in an LRU.
+
+Notes:          A clause that can never match (an unknown field, a station code not in the table) makes the whole
+                query match nothing; one that always matches ('stations:' without codes) is left out.
+
+                narrows() tells whether every row matching one query also matches another, from the two ASTs, so a
+                query refined at the prompt (a clause added, a token or an OR alternative dropped, a needle made
+                longer) only has to be run on the rows of the one before.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import re
+
+from dataclasses    import dataclass
+from datetime       import datetime, timedelta
+from functools      import lru_cache, reduce
+from typing         import Callable, Iterable, List, Optional, Tuple, Union
+
+# --- Project defined
+from .defs                  import FIELD_INDEX, DATEFORMAT
+from .ivs_session_parser    import split_stations_expr
+from .numpy_backend         import VectorTable
+from .row_index             import RowIndex, bitset, rows_of
+from .session_table         import SessionTable, NUMERIC_COLUMNS, START, DUR, epoch_of
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Spellings of the three stations fields, and the side of the stations column each one searches
+STATION_FIELDS = {"stations": "active", "stations_active": "active", "stations-active": "active",
+                  "stations_removed": "removed", "stations-removed": "removed",
+                  "stations_all": "all", "stations-all": "all"}
+
+# --- Field names FILTER_SYNTAX.md lists that aren't column names in FIELD_INDEX
+FIELD_ALIASES = {"correlator": "corr"}
+
+# --- Separators of the tokens in a non-stations value
+TOKEN_SEPARATORS = re.compile(r"[ ,+|]+")
+
+# --- A comparison on a number column, e.g. '>= 24:00'; a range is two bounds around '..'
+COMPARISON = re.compile(r"^(>=|<=|>|<|=)\s*(.+)$")
+RANGE_DOTS = ".."
+
+# --- Dates the J prompt and start ranges take, most precise first, with the period each one stands for
+DATE_FORMATS = ((DATEFORMAT, "minute"), ("%Y-%m-%d", "day"), ("%Y-%m", "month"), ("%Y-%j", "day"), ("%Y", "year"))
+
+# --- Durations: 'HH:MM', or hours or minutes with a unit; a bare number is hours
+DURATION = re.compile(r"^(?:(\d+):(\d\d)|(\d+)\s*(h|m|min)?)$")
+
+
+
+@dataclass(frozen=True)
+class TextClause:
+    """ Plain text: any column contains the needle, case-insensitive """
+    needle: str                                 # lower case
+# --- END OF class TextClause ------------------------------------------------------------------------------------------
+
+
+
+@dataclass(frozen=True)
+class FieldClause:
+    """ field: value - the column contains any of the tokens, case-insensitive """
+    column: Optional[int]                       # None for a field that doesn't exist: matches nothing
+    tokens: Tuple[str, ...]                     # lower case
+# --- END OF class FieldClause -----------------------------------------------------------------------------------------
+
+
+
+@dataclass(frozen=True)
+class StationsClause:
+    """ stations: expr - any group has all of its station codes, on one side of the stations column """
+    side: str                                   # 'active', 'removed' or 'all'
+    groups: Tuple[Tuple[str, ...], ...]         # OR of AND groups; no groups matches nothing
+# --- END OF class StationsClause --------------------------------------------------------------------------------------
+
+
+
+@dataclass(frozen=True)
+class RangeClause:
+    """ number: range - the start (epoch seconds), DOY or duration (minutes) is in [low, high) """
+    column: int
+    low: Optional[int]                          # None: no lower bound
+    high: Optional[int]                         # None: no upper bound
+# --- END OF class RangeClause -----------------------------------------------------------------------------------------
+
+
+
+Clause = Union[TextClause, FieldClause, StationsClause, RangeClause]
+
+
+
+@dataclass(frozen=True)
+class Query:
+    """ All clauses must match (AND); no clauses matches every row """
+    clauses: Tuple[Clause, ...]
+
+    def station_codes(self) -> List[str]:
+        """
+        :return:    Every station code in the query, for highlighting
+        """
+
+        return [code for c in self.clauses if isinstance(c, StationsClause) for group in c.groups for code in group]
+    # --- END OF station_codes() ---------------------------------------------------------------------------------------
+# --- END OF class Query -----------------------------------------------------------------------------------------------
+
+
+
+def _parse_stations(_side: str, _expr: str) -> Optional[StationsClause]:
+    """
+    :return:    The clause, or None if it lets every row through
+    """
+
+    split = split_stations_expr(_expr)
+    if split is None:
+        return None
+
+    groups: List[Tuple[str, ...]] = []
+    for and_tokens, part in split:
+        # --- A group of bare separators in the no-operator form ('stations: ,') matches everything; one of just
+        # --- operators ('stations: &&') is matched on its literal text, so never, since that is no station code
+        codes = and_tokens or ((part,) if part else ())
+        if not codes:
+            return None
+        groups.append(codes)
+    return StationsClause(_side, tuple(groups))
+# --- END OF _parse_stations() -----------------------------------------------------------------------------------------
+
+
+
+def parse_date(_text: str) -> Optional[datetime]:
+    """
+    :param _text:   A date as typed: '2025-03-01 12:00', '2025-03-01', '2025-03', '2025-060' (day of year) or '2025'
+    :return:        The datetime (the start of the day, month or year if no time is given), or None if it isn't a date
+    """
+
+    period = date_period(_text)
+    return period[0] if period else None
+# --- END OF parse_date() ----------------------------------------------------------------------------------------------
+
+
+
+def date_period(_text: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    :param _text:   A date as typed, see parse_date()
+    :return:        The start of the minute, day, month or year it names, and the start of the next one; or None,
+                    also for the last one datetime can hold ('9999', '9999-12-31'), which has no next one
+    """
+
+    text = (_text or "").strip()
+    for fmt, unit in DATE_FORMATS:
+        try:
+            first = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        try:
+            match unit:
+                case "minute":
+                    return first, first + timedelta(minutes=1)
+                case "day":
+                    return first, first + timedelta(days=1)
+                case "month":
+                    return first, first.replace(year=first.year + first.month // 12, month=first.month % 12 + 1)
+                case _:
+                    return first, first.replace(year=first.year + 1)
+        except (OverflowError, ValueError):
+            return None
+    return None
+# --- END OF date_period() ---------------------------------------------------------------------------------------------
+
+
+
+def _period(_col: int, _text: str) -> Optional[Tuple[int, int]]:
+    """
+    :param _col:    START, DOY or DUR
+    :param _text:   A bound as typed: a date (date_period()), a day of year, or a duration ('24:00', '24h', '90m')
+    :return:        The values it stands for, as [first, after) in the column's numbers, or None if it isn't one
+    """
+
+    text = _text.strip()
+    if _col == START:
+        period = date_period(text)
+        return (epoch_of(period[0]), epoch_of(period[1])) if period else None
+    if _col == DUR:
+        found = DURATION.match(text.lower())
+        if found is None:
+            return None
+        hours, minutes, number, unit = found.groups()
+        value = int(hours) * 60 + int(minutes) if hours else int(number) * (1 if unit in ("m", "min") else 60)
+        return value, value + 1
+    # --- isdecimal(), not isdigit(): '²' is a digit int() can't read
+    return (int(text), int(text) + 1) if text.isdecimal() else None
+# --- END OF _period() -------------------------------------------------------------------------------------------------
+
+
+
+def _parse_range(_col: int, _value: str) -> Optional[Clause]:
+    """
+    :param _col:    START, DOY or DUR
+    :param _value:  The value of the clause
+    :return:        The RangeClause, a FieldClause matching nothing if a bound can't be read, or None if _value is not
+                    a comparison or range (it is then a substring search, as on the other columns)
+    """
+
+    comparison = COMPARISON.match(_value)
+    if comparison is not None:
+        operator, bound = comparison.groups()
+        period = _period(_col, bound)
+        if period is None:
+            return FieldClause(None, ())
+        first, after = period
+        low, high = {">": (after, None), ">=": (first, None), "<": (None, first), "<=": (None, after),
+                     "=": (first, after)}[operator]
+        return RangeClause(_col, low, high)
+
+    if RANGE_DOTS not in _value:
+        return None
+    lower, upper    = (bound.strip() for bound in _value.split(RANGE_DOTS, 1))
+    low_period      = _period(_col, lower) if lower else (None, None)
+    high_period     = _period(_col, upper) if upper else (None, None)
+    if low_period is None or high_period is None:
+        return FieldClause(None, ())
+    return RangeClause(_col, low_period[0], high_period[1])
+# --- END OF _parse_range() --------------------------------------------------------------------------------------------
+
+
+
+@lru_cache(maxsize=256)
+def parse_query(_text: str) -> Query:
+    """
+    :param _text:   The filter as typed, e.g. 'code: r1|r4; stations: Nn&Ns'
+    :return:        The Query
+    """
+
+    clauses: List[Clause] = []
+    for raw in (_text or "").split(";"):
+        clause = raw.strip()
+        if not clause:
+            continue
+        if ":" not in clause:
+            clauses.append(TextClause(clause.lower()))
+            continue
+
+        field, value    = [p.strip() for p in clause.split(":", 1)]
+        fld             = field.lower()
+        col             = FIELD_INDEX.get(FIELD_ALIASES.get(fld, fld), None)
+        if fld in STATION_FIELDS:
+            stations = _parse_stations(STATION_FIELDS[fld], value)
+            if stations is not None:
+                clauses.append(stations)
+        elif col in NUMERIC_COLUMNS and (numbers := _parse_range(col, value)) is not None:
+            clauses.append(numbers)
+        else:
+            clauses.append(FieldClause(col, tuple(t.lower() for t in TOKEN_SEPARATORS.split(value) if t)))
+    return Query(tuple(clauses))
+# --- END OF parse_query() ---------------------------------------------------------------------------------------------
+
+
+
+class Step:
+    """
+        One compiled clause: test() answers it for a single row, select() for many at once, as a comprehension with
+    everything it needs in local variables.
+    """
+
+    def __init__(self, _cost: int, _test: Callable[[int], bool], _select: Callable[[Iterable[int]], List[int]]):
+        self.cost   = _cost
+        self.test   = _test
+        self.select = _select
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+# --- END OF class Step ------------------------------------------------------------------------------------------------
+
+
+
+# --- Evaluation order of the steps: set lookups first, text searches last
+COST_VALUE, COST_STATIONS, COST_FIELD_TEXT, COST_ANY_TEXT = range(4)
+
+
+
+class NoMatch(Exception):
+    """ Raised while compiling a clause no row can match """
+# --- END OF class NoMatch ---------------------------------------------------------------------------------------------
+
+
+
+class CompiledQuery:
+    """
+    A Query ready to run on one SessionTable.
+    """
+
+    def __init__(self,
+                 _query: Query,
+                 _table: SessionTable,
+                 _index: Optional[RowIndex]     = None,
+                 _vector: Optional[VectorTable] = None
+                 ) -> None:
+
+        self.query          = _query
+        self.table          = _table
+        self.index          = _index
+        self.vector         = _vector
+
+        # --- Rows left by the clauses the index (or a sorted column) answered (None: all rows), by the ones answered
+        # --- with masks (vector only; None: all rows), and the steps for the other clauses
+        self.bits: Optional[int]    = None
+        self.mask                   = None
+        self.steps: List[Step]      = []
+        self.never                  = False
+
+        try:
+            for clause in _query.clauses:
+                self._compile(clause)
+        except NoMatch:
+            self.never, self.bits, self.mask, self.steps = True, 0, None, []
+        self.steps.sort(key=lambda s: s.cost)
+
+        # --- The index bits, the mask and all steps as one short-circuiting test
+        bits, mask      = self.bits, self.mask
+        tests           = [s.test for s in self.steps]
+        if mask is not None:
+            tests.insert(0, lambda i: bool(mask[i]))
+        if bits is not None:
+            tests.insert(0, lambda i: (bits >> i) & 1 == 1)
+        self.matches: Callable[[int], bool] = reduce(_both, tests) if tests else (lambda _i: not self.never)
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def _compile(self, _clause: Clause) -> None:
+        """
+        Adds _clause to self.mask, self.bits or self.steps.
+
+        :param _clause: The clause
+        :return:        None
+        """
+
+        table, index, vector = self.table, self.index, self.vector
+        match _clause:
+            case StationsClause(side=side, groups=groups) if vector is not None:
+                self._and_mask(vector.station_mask(_station_numbers(table, groups), side))
+
+            case StationsClause(side=side, groups=groups):
+                if index is not None:
+                    self._and_bits(index.station_bits(groups, side))
+                else:
+                    self.steps.append(_stations_step(table, side, groups))
+
+            case FieldClause(column=None):
+                raise NoMatch
+
+            case RangeClause(column=col, low=low, high=high) if vector is not None:
+                self._and_mask(vector.range_mask(col, low, high))
+
+            case RangeClause(column=col, low=low, high=high):
+                rows = table.rows_between(col, low, high)
+                if isinstance(rows, range):
+                    self._and_bits(((1 << rows.stop) - 1) ^ ((1 << rows.start) - 1) if rows else 0)
+                else:
+                    self._and_bits(bitset(rows, len(table)))
+
+            case FieldClause(column=col, tokens=tokens) if vector is not None and col in table.categorical:
+                allowed = table.values_matching(col, list(tokens))
+                if not allowed:
+                    raise NoMatch
+                if len(allowed) < len(table.categorical[col][0].values):
+                    self._and_mask(vector.value_mask(col, allowed))
+
+            case FieldClause(column=col, tokens=tokens) if index is not None:
+                if index.has_field(col):
+                    self._and_bits(index.field_bits(col, list(tokens)))
+                else:
+                    self._and_bits(index.text_bits(col, tokens))
+
+            case TextClause(needle=needle) if index is not None:
+                self._and_bits(index.any_text_bits(needle))
+
+            case FieldClause(column=col, tokens=tokens) if col in table.categorical:
+                allowed = table.values_matching(col, list(tokens))
+                if not allowed:
+                    raise NoMatch
+                if len(allowed) < len(table.categorical[col][0].values):
+                    self.steps.append(_value_step(table.categorical[col][1], allowed))
+
+            case FieldClause(column=col, tokens=tokens):
+                if not tokens:
+                    raise NoMatch
+                self.steps.append(_text_step(COST_FIELD_TEXT, table.column_text(col), tokens))
+
+            case TextClause(needle=needle):
+                self.steps.append(_text_step(COST_ANY_TEXT, table.row_text(), (needle,)))
+    # --- END OF _compile() --------------------------------------------------------------------------------------------
+
+
+
+    def _and_bits(self, _bits: int) -> None:
+        self.bits = _bits if self.bits is None else self.bits & _bits
+        if not self.bits:
+            raise NoMatch
+    # --- END OF _and_bits() -------------------------------------------------------------------------------------------
+
+
+
+    def _and_mask(self, _mask) -> None:
+        self.mask = _mask if self.mask is None else self.mask & _mask
+        if not self.mask.any():
+            raise NoMatch
+    # --- END OF _and_mask() -------------------------------------------------------------------------------------------
+
+
+
+    def rows(self, _candidates: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        :param _candidates: Row numbers to run on, in table order; None for the whole table
+        :return:            The row numbers matching the query, in the order given
+        """
+
+        if self.never:
+            return []
+
+        rows = _candidates
+        if self.mask is not None:
+            mask = self.mask
+            if self.bits is not None:
+                mask = mask & self.vector.bits_mask(self.bits)
+            if rows is not None:
+                mask = mask & self.vector.rows_mask(rows)
+            rows = self.vector.rows(mask)
+        elif self.bits is not None:
+            bits = self.bits if rows is None else self.bits & bitset(rows, len(self.table))
+            rows = self.index.rows_for(bits) if self.index is not None else rows_of(bits)
+        if rows is None:
+            rows = range(len(self.table))
+
+        for step in self.steps:
+            rows = step.select(rows)
+            if not rows:
+                return []
+        return list(rows)
+    # --- END OF rows() ------------------------------------------------------------------------------------------------
+# --- END OF class CompiledQuery ---------------------------------------------------------------------------------------
+
+
+
+def _both(_a: Callable[[int], bool], _b: Callable[[int], bool]) -> Callable[[int], bool]:
+    return lambda i: _a(i) and _b(i)
+# --- END OF _both() ---------------------------------------------------------------------------------------------------
+
+
+
+def _value_step(_numbers, _allowed) -> Step:
+    return Step(COST_VALUE,
+                lambda i: _numbers[i] in _allowed,
+                lambda rows: [i for i in rows if _numbers[i] in _allowed])
+# --- END OF _value_step() ---------------------------------------------------------------------------------------------
+
+
+
+def _text_step(_cost: int, _texts: List[str], _tokens: Tuple[str, ...]) -> Step:
+    if len(_tokens) == 1:
+        token = _tokens[0]
+        return Step(_cost,
+                    lambda i: token in _texts[i],
+                    lambda rows: [i for i in rows if token in _texts[i]])
+    return Step(_cost,
+                lambda i: any(t in _texts[i] for t in _tokens),
+                lambda rows: [i for i in rows if any(t in _texts[i] for t in _tokens)])
+# --- END OF _text_step() ----------------------------------------------------------------------------------------------
+
+
+
+def _station_numbers(_table: SessionTable, _groups: Tuple[Tuple[str, ...], ...]) -> List[Tuple[int, ...]]:
+    """
+    Station codes turned into the table's station numbers; a group with a code no row has is dropped.
+    """
+
+    numbers = _table.stations.numbers
+    wanted  = [tuple(numbers[c] for c in group) for group in _groups if all(c in numbers for c in group)]
+    if not wanted:
+        raise NoMatch
+    return wanted
+# --- END OF _station_numbers() ----------------------------------------------------------------------------------------
+
+
+
+def _stations_step(_table: SessionTable, _side: str, _groups: Tuple[Tuple[str, ...], ...]) -> Step:
+    wanted      = _station_numbers(_table, _groups)
+    station_ids = _table.station_ids
+    if len(wanted) == 1 and len(wanted[0]) == 1:
+        n = wanted[0][0]
+        return Step(COST_STATIONS,
+                    lambda i: n in station_ids(i, _side),
+                    lambda rows: [i for i in rows if n in station_ids(i, _side)])
+
+    def test(_i: int) -> bool:
+        ids = station_ids(_i, _side)
+        return any(all(n in ids for n in group) for group in wanted)
+    return Step(COST_STATIONS, test, lambda rows: [i for i in rows if test(i)])
+# --- END OF _stations_step() ------------------------------------------------------------------------------------------
+
+
+
+def _needles_imply(_new: Iterable[str], _old: Iterable[str]) -> bool:
+    """
+    :return:    True if text containing any of _new contains one of _old: every new needle has an old one in it
+    """
+
+    return all(any(o in n for o in _old) for n in _new)
+# --- END OF _needles_imply() ------------------------------------------------------------------------------------------
+
+
+
+def _groups_imply(_new: Iterable[Tuple[str, ...]], _old: Iterable[Tuple[str, ...]]) -> bool:
+    """
+    :return:    True if a row with all codes of any new group has all codes of an old group
+    """
+
+    return all(any(set(o) <= set(n) for o in _old) for n in _new)
+# --- END OF _groups_imply() -------------------------------------------------------------------------------------------
+
+
+
+def implies(_new: Clause, _old: Clause) -> bool:
+    """
+    :param _new:    A clause
+    :param _old:    Another clause
+    :return:        True if every row matching _new matches _old. False when that can't be told from the clauses.
+    """
+
+    if _new == _old:
+        return True
+    match _new, _old:
+        case TextClause(needle=new), TextClause(needle=old):
+            return old in new
+        case FieldClause(column=col, tokens=new), TextClause(needle=old) if col is not None and new:
+            # --- A column is part of the row text; a token holding the needle finds it there too
+            return _needles_imply(new, (old,))
+        case FieldClause(column=new_col, tokens=new), FieldClause(column=old_col, tokens=old):
+            return new_col == old_col and new_col is not None and _needles_imply(new, old)
+        case StationsClause(side=new_side, groups=new), StationsClause(side=old_side, groups=old):
+            # --- Active or removed stations are also in 'all'
+            return (new_side == old_side or old_side == "all") and _groups_imply(new, old)
+        case RangeClause(column=new_col, low=new_low, high=new_high), RangeClause(column=old_col, low=old_low,
+                                                                                  high=old_high):
+            # --- The new range lies within the old one (no bound: no limit)
+            return (new_col == old_col
+                    and (old_low is None or (new_low is not None and new_low >= old_low))
+                    and (old_high is None or (new_high is not None and new_high <= old_high)))
+    return False
+# --- END OF implies() -------------------------------------------------------------------------------------------------
+
+
+
+def narrows(_new: Query, _old: Query) -> bool:
+    """
+    :param _new:    A query
+    :param _old:    The query before it
+    :return:        True if _new matches a subset of the rows _old matches, so it can run on _old's result
+    """
+
+    return all(any(implies(n, o) for n in _new.clauses) for o in _old.clauses)
+# --- END OF narrows() -------------------------------------------------------------------------------------------------
+
+
+
+def compile_query(_text: str,
+                  _table: SessionTable,
+                  _index: Optional[RowIndex]        = None,
+                  _vector: Optional[VectorTable]    = None
+                  ) -> CompiledQuery:
+    """
+    :param _text:   The filter as typed
+    :param _table:  The table to run it on
+    :param _index:  The RowIndex of that table, if there is one
+    :param _vector: The VectorTable of that table, if NumPy is used
+    :return:        The CompiledQuery
+    """
+
+    return CompiledQuery(parse_query((_text or "").strip()), _table, _index, _vector)
+# --- END OF compile_query() -------------------------------------------------------------------------------------------
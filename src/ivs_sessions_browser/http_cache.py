@@ -0,0 +1,353 @@
+"""
+Filename:       http_cache.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Persistent on-disk cache for the schedule pages, so a restart does not have to download the whole
+                year page again when nothing has changed on ivscc.gsfc.nasa.gov.
+
+Notes:          Each URL is stored as two files in the cache directory, the raw body and a small JSON file with the
+                validators (ETag / Last-Modified) the server sent along with it.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+
+from dataclasses    import dataclass, asdict
+from typing         import Optional, Dict, Mapping, Iterator
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def default_cache_dir() -> str:
+    """
+    Where we keep the cache, following the XDG convention: $XDG_CACHE_HOME/ivs_sessions_browser, falling back to
+    ~/.cache/ivs_sessions_browser
+
+    :return:    The directory path (not created here)
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ivs_sessions_browser")
+# --- END OF default_cache_dir() ---------------------------------------------------------------------------------------
+
+
+
+@dataclass
+class CacheEntry:
+    """
+    What we know about one cached response.
+    """
+    url:            str
+    etag:           Optional[str]   = None
+    last_modified:  Optional[str]   = None
+    encoding:       Optional[str]   = None
+    fetched_at:     float           = 0.0   # time.time() of the last download or successful revalidation
+    size:           int             = 0
+    sha256:         str             = ""    # digest of the body, as stored
+# --- END OF class CacheEntry ------------------------------------------------------------------------------------------
+
+
+
+class HttpCache:
+    """
+    Response cache keyed by URL.
+
+        - max_age:  seconds an entry is used as-is, without asking the server at all. 0 means always revalidate.
+        - refresh:  ignore what is cached (no freshness window, no conditional request), but store the new response.
+    """
+
+    def __init__(self,
+                 _cache_dir:    Optional[str] = None,
+                 _max_age:      float = 0.0,
+                 _refresh:      bool = False
+                 ) -> None:
+
+        self.cache_dir  = os.path.join(_cache_dir or default_cache_dir(), "http")
+        self.max_age    = max(0.0, _max_age)
+        self.refresh    = _refresh
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def revalidating(self) -> "HttpCache":
+        """
+        :return:    A cache on the same directory that always asks the server (no freshness window, no forced refresh).
+                    Used for background refreshes, which are pointless if they just return the cached copy.
+        """
+
+        clone           = copy.copy(self)
+        clone.max_age   = 0.0
+        clone.refresh   = False
+        return clone
+    # --- END OF revalidating() ----------------------------------------------------------------------------------------
+
+
+
+    def lookup(self, _url: str) -> Optional[CacheEntry]:
+        """
+        Finds the cache entry for _url.
+
+        :param _url:    The URL
+        :return:        The entry, or None if nothing usable is cached (or we've been told to refresh)
+        """
+
+        if self.refresh:
+            return None
+
+        meta_path, body_path = self._paths(_url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        # --- A body that went missing, or got truncated, is no use to us
+        try:
+            if os.path.getsize(body_path) != entry.size:
+                return None
+        except OSError:
+            return None
+
+        return entry if entry.url == _url else None
+    # --- END OF lookup() ----------------------------------------------------------------------------------------------
+
+
+
+    def age(self, _entry: CacheEntry) -> float:
+        """
+        :param _entry:  The cache entry
+        :return:        Seconds since the entry was downloaded or last revalidated
+        """
+
+        return max(0.0, time.time() - _entry.fetched_at)
+    # --- END OF age() -------------------------------------------------------------------------------------------------
+
+
+
+    def is_fresh(self, _entry: CacheEntry) -> bool:
+        """
+        :param _entry:  The cache entry
+        :return:        True if the entry is young enough to be used without touching the network
+        """
+
+        return self.max_age > 0 and self.age(_entry) <= self.max_age
+    # --- END OF is_fresh() --------------------------------------------------------------------------------------------
+
+
+
+    def conditional_headers(self, _entry: CacheEntry) -> Dict[str, str]:
+        """
+        Request headers asking the server to answer 304 Not Modified if our copy is still current.
+
+        :param _entry:  The cache entry
+        :return:        Dict with If-None-Match and/or If-Modified-Since, possibly empty
+        """
+
+        headers: Dict[str, str] = {}
+        if _entry.etag:
+            headers["If-None-Match"] = _entry.etag
+        if _entry.last_modified:
+            headers["If-Modified-Since"] = _entry.last_modified
+        return headers
+    # --- END OF conditional_headers() ---------------------------------------------------------------------------------
+
+
+
+    def iter_body(self, _entry: CacheEntry, _chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Reads the cached body back in chunks, so it never has to be in memory as a whole.
+
+        :param _entry:      The cache entry
+        :param _chunk_size: Bytes per chunk
+        :return:            Iterator over the body chunks
+        """
+
+        _, body_path = self._paths(_entry.url)
+        with open(body_path, "rb") as f:
+            while chunk := f.read(_chunk_size):
+                yield chunk
+    # --- END OF iter_body() -------------------------------------------------------------------------------------------
+
+
+
+    def touch(self, _entry: CacheEntry) -> None:
+        """
+        Marks _entry as just revalidated (after a 304), restarting its freshness window.
+
+        :param _entry:  The cache entry
+        :return:        None
+        """
+
+        _entry.fetched_at = time.time()
+        self.write_meta(_entry)
+    # --- END OF touch() -----------------------------------------------------------------------------------------------
+
+
+
+    def writer(self,
+               _url:        str,
+               _headers:    Mapping[str, str],
+               _encoding:   Optional[str]
+               ) -> "CacheWriter":
+        """
+        Starts storing a response that is being downloaded. Write the body chunks to the returned CacheWriter as they
+        arrive, then commit() it once the download is complete.
+
+        :param _url:        The URL
+        :param _headers:    The response headers, for the validators
+        :param _encoding:   The text encoding of the body
+        :return:            The writer
+        """
+
+        entry = CacheEntry(url              = _url,
+                           etag             = _headers.get("ETag"),
+                           last_modified    = _headers.get("Last-Modified"),
+                           encoding         = _encoding)
+        return CacheWriter(self, entry, self._paths(_url)[1])
+    # --- END OF writer() ----------------------------------------------------------------------------------------------
+
+
+
+    def write_meta(self, _entry: CacheEntry) -> None:
+        """
+        Writes the JSON side file for _entry.
+
+        :param _entry:  The cache entry
+        :return:        None
+        """
+
+        meta_path, _ = self._paths(_entry.url)
+        try:
+            self._write_atomic(meta_path, json.dumps(asdict(_entry)).encode("utf-8"))
+        except OSError:
+            pass
+    # --- END OF write_meta() ------------------------------------------------------------------------------------------
+
+
+
+    def _write_atomic(self, _path: str, _data: bytes) -> None:
+        """
+        Writes to a temporary file and renames it into place, so concurrent fetches and interrupted runs never leave a
+        half written file behind. The temporary file is removed again if writing or renaming it fails.
+
+        :param _path:   Destination path
+        :param _data:   What to write
+        :return:        None
+        :raises OSError:    If the write failed
+        """
+
+        tmp = f"{_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_data)
+            os.replace(tmp, _path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+    # --- END OF _write_atomic() ---------------------------------------------------------------------------------------
+
+
+
+    def _paths(self, _url: str) -> tuple[str, str]:
+        """
+        :param _url:    The URL
+        :return:        (meta path, body path) for _url
+        """
+
+        key = hashlib.sha1(_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+    # --- END OF _paths() ----------------------------------------------------------------------------------------------
+# --- END OF class HttpCache -------------------------------------------------------------------------------------------
+
+
+
+class CacheWriter:
+    """
+        Writes one response body into the cache while it downloads. The body goes to a temporary file that is only
+    renamed into place by commit(), so an interrupted download never replaces a good cached copy.
+
+        Failing to write the cache is not an error; the writer just stops writing and commit() does nothing.
+    """
+
+    def __init__(self, _cache: HttpCache, _entry: CacheEntry, _body_path: str) -> None:
+        self.cache      = _cache
+        self.entry      = _entry
+        self.body_path  = _body_path
+        self.tmp_path   = f"{_body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.hasher     = hashlib.sha256()
+        try:
+            os.makedirs(_cache.cache_dir, exist_ok=True)
+            self.file = open(self.tmp_path, "wb")
+        except OSError:
+            self.file = None
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def write(self, _chunk: bytes) -> None:
+        """
+        :param _chunk:  Next piece of the body
+        :return:        None
+        """
+
+        if self.file is None:
+            return
+        try:
+            self.file.write(_chunk)
+        except OSError:
+            self.discard()
+            return
+        self.hasher.update(_chunk)
+        self.entry.size += len(_chunk)
+    # --- END OF write() -----------------------------------------------------------------------------------------------
+
+
+
+    def commit(self) -> None:
+        """
+        The body is complete: move it into place and write its metadata.
+
+        :return: None
+        """
+
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.body_path)
+        except OSError:
+            self.discard()
+            return
+        self.entry.sha256       = self.hasher.hexdigest()
+        self.entry.fetched_at   = time.time()
+        self.cache.write_meta(self.entry)
+    # --- END OF commit() ----------------------------------------------------------------------------------------------
+
+
+
+    def discard(self) -> None:
+        """
+        Drops whatever was written, unless commit() already moved it into place. Safe to call more than once.
+
+        :return: None
+        """
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+    # --- END OF discard() ---------------------------------------------------------------------------------------------
+# --- END OF class CacheWriter -----------------------------------------------------------------------------------------
@@ -6,23 +6,93 @@ Created:        15.09.2025
 Description:        This class parses the soup object read from web. It's tailored to organize the information
                 within the ivs sessions web pages.
 
-Notes:
+Notes:          parse() walks a BeautifulSoup tree; it is the reference implementation, used by the 'bs4' backend and as
+                the fallback of the html.parser fast path. make_row() builds the rows for every backend.
 """
 
 # --- Import section ---------------------------------------------------------------------------------------------------
 import re
-from typing     import List, Optional
+from typing     import Callable, List, Optional, Tuple
 from bs4        import BeautifulSoup
 
 # --- Project defined
-from .defs      import Row, FIELD_INDEX, HEADERS
+from .defs              import Row, FIELD_INDEX, HEADERS
+from .session_record    import SessionRecord
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
+
+# --- Bump whenever a change here alters the rows produced from the same page, so stored row snapshots are re-parsed.
+PARSER_VERSION = 1
+
+
+
+def split_stations_expr(_expr: Optional[str]) -> Optional[List[Tuple[Tuple[str, ...], str]]]:
+    """
+        Splits a stations expression into OR groups of AND tokens: 'Nn&Ns|Wz' gives [(('Nn', 'Ns'), 'Nn&Ns'),
+    (('Wz',), 'Wz')]. Without '|' or '&', the codes separated by space, comma or plus form one AND group. A group
+    without tokens (just '&'s) keeps its literal text, the second item, to match on instead.
+
+    :param _expr:   The expression
+    :return:        The groups, or None for an empty expression (no filter). [] matches nothing.
+    """
+
+    text = (_expr or "").strip()
+    if not text:
+        return None
+
+    if '|' not in text and '&' not in text:
+        return [(tuple(t for t in re.split(r"[ ,+]+", text) if t), "")]
+
+    groups: List[Tuple[Tuple[str, ...], str]] = []
+    for part in (p.strip() for p in re.split(r"\s*\|{1,2}\s*", text)):
+        if not part:
+            continue
+        and_tokens = tuple(t for chunk in re.split(r"\s*&{1,2}\s*", part) if chunk.strip()
+                           for t in re.split(r"[ ,+]+", chunk.strip()) if t)
+        groups.append((and_tokens, part))
+    return groups
+# --- END OF split_stations_expr() -------------------------------------------------------------------------------------
+
+
+
+def compile_stations_filter(_expr: Optional[str]) -> Optional[Callable[[str], bool]]:
+    """
+        Turns a stations expression into a test on the active stations string of a row, so the expression is split up
+    once per parse rather than once per row. 'Nn Ns' and 'Nn&Ns' need all codes, 'Nn|Ns' any of the groups, and '&'
+    binds tighter than '|'.
+
+    :param _expr:   The expression, e.g. 'Nn&Ns|Wz'
+    :return:        A function taking the active stations string, or None if the expression lets every row through
+    """
+
+    groups = split_stations_expr(_expr)
+    if groups is None:
+        return None
+
+    if len(groups) == 1 and groups[0][0]:
+        tokens = groups[0][0]
+        return lambda _hay: all(tok in _hay for tok in tokens)
+
+    def match(_hay: str) -> bool:
+        for and_tokens, part in groups:
+            if and_tokens:
+                if all(tok in _hay for tok in and_tokens):
+                    return True
+            elif part in _hay:
+                return True
+        return False
+    # --- END OF match() -----------------------------------------------------------------------------------------------
+
+    return match
+# --- END OF compile_stations_filter() ---------------------------------------------------------------------------------
+
+
+
 class IvsSessionParser:
 
     def __init__(self,
-                 _soup:             BeautifulSoup,
+                 _soup:             Optional[BeautifulSoup],
                  _num_of_headers:   int,
                  _is_intensive:     bool,
                  _stations_filter:  Optional[str] = None,
@@ -35,6 +105,9 @@ class IvsSessionParser:
         self.is_intensive       = _is_intensive
         self.stations_filter    = _stations_filter
 
+        # --- The stations filter, compiled once (None: no filter)
+        self.stations_matcher   = compile_stations_filter(_stations_filter)
+
         # --- declare an empty list to be populated and returned
         self.parsed: List[Row]  = []
     # --- END OF __init__() --------------------------------------------------------------------------------------------
@@ -54,18 +127,18 @@ class IvsSessionParser:
         parsed: List[Row] = []
         session_rows = self.soup.select("table tr")
 
+        # --- Stations: differentiate between active and removed. Render as "Active [Removed]".
+        # --- Find the current index of 'stations', and assign an attribute.
+        index = FIELD_INDEX.get("stations", -1)
+        if index == -1:
+            print("Index error on 'stations', exiting...")
+            exit(-1)
+
         for r in session_rows:
             tds = r.find_all("td")
             if len(tds) < self.num_of_headers:
                 continue
 
-            # --- Stations: differentiate between active and removed. Render as "Active [Removed]".
-            # --- Find the current index of 'stations', and assign an attribute.
-            index = FIELD_INDEX.get("stations", -1)
-            if index == -1:
-                print("Index error on 'stations', exiting...")
-                exit(-1)
-
             # --- This is the cell, or column, containing all the stations, and we want to separate the
             # --- active from the removed.
             stations_cell = tds[index]
@@ -81,106 +154,109 @@ class IvsSessionParser:
                 code = li.get_text(strip=True)
                 removed_ids.append(code) if "removed" in classes else active_ids.append(code)
 
-            # --- And putting them into separate lists
-            active_str = "".join(active_ids)
-            removed_str = "".join(removed_ids)
-
-            # --- And now we're rendering the stations string, with the active and removed sessions
-            # -- separated. They will be written as "active [removed]", with the removed in square brackets.
-            if active_str and removed_str:
-                stations_str = f"{active_str} [{removed_str}]"
-            elif removed_str:
-                stations_str = f"[{removed_str}]"
-            else:
-                stations_str = f"{active_str}"
-
-            # --- The various columns for each piece of info
-            values = [
-                tds[0].get_text(strip=True),    # Type
-                tds[1].get_text(strip=True),    # Code
-                tds[2].get_text(strip=True),    # Start
-                tds[3].get_text(strip=True),    # DOY
-                tds[4].get_text(strip=True),    # Dur
-                # stations_str.ljust(44),  # Stations (fixed width for alignment)
-                stations_str,                   # Stations (no padding; renderer will align)
-                tds[6].get_text(strip=True),    # DB Code
-                tds[7].get_text(strip=True),    # Ops Center
-                tds[8].get_text(strip=True),    # Correlator
-                tds[9].get_text(strip=True),    # Status
-                tds[10].get_text(strip=True),   # Analysis
-            ]
-
-        ### FOLLOWING LINES REMOVED DUE TO RE-STRUCTURE HEADERS ###
-            # # Column width for Type (class attribute, so prefix with the class)
-            # TYPE_WIDTH = next(w for title, w in HEADERS if title == "Type")
-            #
-            # # Tag intensives directly in Type column (right-align "[I]" in the Type field)
-            # if self.is_intensive:
-            #     base_width = max(0, TYPE_WIDTH - 3)  # room for "[I]"
-            #     values[0] = f"{values[0]:<{base_width}}[I]"
-            # else:
-            #     values[0] = f"{values[0]:<{TYPE_WIDTH}}"
-            # Keep raw type text; tag intensive in meta so UI can render "[I]" at the right edge
-            # values[0] stays unchanged here
-        ### THEY ARE REPLACED BY THE FOLLOWING ###
-            # Tag intensives directly (no padding here; alignment happens in the renderer)
-            if self.is_intensive:
-                # values[0] = f"{values[0]}[I]"
-                values[0] = f"{values[0]}"
+            # --- Rows the stations filter drops are skipped before we touch any other cell
+            if not self.matches_stations(active_ids):
+                continue
+
+            # --- The text of each column; the stations column is rendered from the ids by make_row()
+            cells = [td.get_text(strip=True) if i != index else "" for i, td in enumerate(tds[:self.num_of_headers])]
 
             # Session detail URL from Code column if present
             code_link = tds[1].find("a")
-            session_url = (f"https://ivscc.gsfc.nasa.gov{code_link['href']}"
-                           if code_link and code_link.has_attr("href")
-                           else None)
+            href = code_link["href"] if code_link and code_link.has_attr("href") else None
 
-            # if stations_filter is set,and there is NO match between the active_str and the stations_filter,
-            # continue the 'for r in session_rows loop'; e.g. we have no match
-            if self.stations_filter and not self._match_stations(active_str, self.stations_filter):
-                continue
+            parsed.append(self.make_row(cells, active_ids, removed_ids, href, _filtered=True))
 
-            # # if sessions_filter is set,and there is NO match between the values[1] and the sessions_filter,
-            # # continue the 'for r in session_rows loop'; e.g. we have no match
-            # # values[1] is the column for session name, e.g. R41223, and so on
-            # if self.sessions_filter and self.sessions_filter not in values[1]:
-            #     continue
+        return parsed
+    # --- END OF parse() -----------------------------------------------------------------------------------------------
 
-            # ---
-            # meta = {"active": active_str, "removed": removed_str}
-            meta = {"active": active_str, "removed": removed_str, "intensive": bool(self.is_intensive)}
 
-            # --- Append the three separate strings into one new row item
-            parsed.append((values, session_url, meta))
 
-        return parsed
-    # --- END OF parse() -----------------------------------------------------------------------------------------------
+    def make_row(self,
+                 _cells:        List[str],
+                 _active_ids:   List[str],
+                 _removed_ids:  List[str],
+                 _href:         Optional[str],
+                 _filtered:     bool = False
+                 ) -> Optional[Row]:
+        """
+            Builds one row from the text of a table row's cells. Shared by parse() and the streaming parser, so both
+        produce exactly the same rows.
+
+        :param _cells:          Stripped text of the first num_of_headers cells. The stations cell is not used.
+        :param _active_ids:     Active station codes, in page order
+        :param _removed_ids:    Removed station codes, in page order
+        :param _href:           href of the link in the Code column, if any
+        :param _filtered:       True if the caller already checked matches_stations()
+        :return:                The row, or None if it doesn't pass the stations filter
+        """
+
+        # --- And putting them into separate lists
+        active_str = "".join(_active_ids)
+        removed_str = "".join(_removed_ids)
+
+        # if stations_filter is set,and there is NO match between the active_str and the stations_filter,
+        # skip the row; e.g. we have no match
+        if not _filtered and self.stations_matcher and not self.stations_matcher(active_str):
+            return None
+
+        # --- And now we're rendering the stations string, with the active and removed sessions
+        # -- separated. They will be written as "active [removed]", with the removed in square brackets.
+        if active_str and removed_str:
+            stations_str = f"{active_str} [{removed_str}]"
+        elif removed_str:
+            stations_str = f"[{removed_str}]"
+        else:
+            stations_str = f"{active_str}"
+
+        # --- The various columns for each piece of info
+        values = [
+            _cells[0],      # Type
+            _cells[1],      # Code
+            _cells[2],      # Start
+            _cells[3],      # DOY
+            _cells[4],      # Dur
+            stations_str,   # Stations (no padding; renderer will align)
+            _cells[6],      # DB Code
+            _cells[7],      # Ops Center
+            _cells[8],      # Correlator
+            _cells[9],      # Status
+            _cells[10],     # Analysis
+        ]
+
+        # Keep raw type text; tag intensive in meta so UI can render "[I]" at the right edge
+
+        # Session detail URL from Code column if present
+        session_url = f"https://ivscc.gsfc.nasa.gov{_href}" if _href is not None else None
+
+        # --- The row, with the meta data (active, removed, their station codes, intensive) as fields of a compact
+        # --- record
+        return SessionRecord(values, session_url, _active_ids, _removed_ids, self.is_intensive)
+    # --- END OF make_row() --------------------------------------------------------------------------------------------
+
+
+
+    def matches_stations(self, _active_ids: List[str]) -> bool:
+        """
+            The stations filter on its own, for parsers that find the stations before the other cells of a row: a row
+        that fails doesn't need its other cells extracted at all.
+
+        :param _active_ids: Active station codes of the row, in page order
+        :return:            True if the row passes (always, without a filter)
+        """
+
+        return self.stations_matcher is None or self.stations_matcher("".join(_active_ids))
+    # --- END OF matches_stations() ------------------------------------------------------------------------------------
 
 
 
     def _match_stations(self, _hay: str, _expr: str) -> bool:
         """
-
+        One-off match of _expr against _hay. The parsers use the compiled self.stations_matcher.
         """
 
-        text = _expr.strip()
-        if not text:
-            return True
-        has_or = '|' in text
-        has_and = '&' in text
-        if has_or or has_and:
-            or_parts = [p.strip() for p in re.split(r"\s*\|{1,2}\s*", text) if p.strip()]
-            for part in or_parts:
-                and_chunks = [c.strip() for c in re.split(r"\s*&{1,2}\s*", part) if c.strip()]
-                and_tokens: List[str] = []
-                for chunk in and_chunks:
-                    and_tokens.extend([t for t in re.split(r"[ ,+]+", chunk) if t])
-                if and_tokens and all(tok in _hay for tok in and_tokens):
-                    return True
-                if not and_tokens and part and part in _hay:
-                    return True
-            return False
-        tokens = [t for t in re.split(r"[ ,+]+", text) if t]
-        return all(tok in _hay for tok in tokens)
+        matcher = compile_stations_filter(_expr)
+        return matcher is None or matcher(_hay)
     # --- END OF _match_stations() -------------------------------------------------------------------------------------
 
 
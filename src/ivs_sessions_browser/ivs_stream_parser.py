@@ -0,0 +1,235 @@
+"""
+Filename:       ivs_stream_parser.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Push-style parser for the IVS sessions table. Text is fed in pieces as it arrives from the network (or
+                disk), and each row is ready as soon as its </tr> has been seen. No DOM is built, and the page never has
+                to be held in memory as a whole.
+
+Notes:          Produces the same rows as IvsSessionParser on a BeautifulSoup tree: rows are the <tr>'s inside a
+                <table> with at least num_of_headers <td>'s, cell text is the stripped text pieces joined together,
+                and the rows themselves are built by IvsSessionParser.make_row(). With a stations filter, a row is
+                checked as soon as its stations cell is done, and the text of the cells after it is not collected
+                for rows that fail.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+from html.parser    import HTMLParser
+from typing         import List, Optional, Tuple
+
+# --- Project defined
+from .defs                  import Row, FIELD_INDEX
+from .ivs_session_parser    import IvsSessionParser
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+class IvsStreamParser(HTMLParser):
+    """
+    Feed it text with feed(), collect finished rows with pop_rows(), and call close() at the end of the document.
+    """
+
+    def __init__(self,
+                 _num_of_headers:   int,
+                 _is_intensive:     bool,
+                 _stations_filter:  Optional[str] = None,
+                 ) -> None:
+
+        super().__init__(convert_charrefs=True)
+
+        # --- Builds the actual rows, so we match IvsSessionParser exactly
+        self.row_builder    = IvsSessionParser(None, _num_of_headers, _is_intensive, _stations_filter)
+        self.num_of_headers = _num_of_headers
+        self.stations_index = FIELD_INDEX.get("stations", -1)
+
+        # --- Finished rows not yet handed out by pop_rows()
+        self.rows: List[Row] = []
+
+        # --- Table rows with <td>'s, but not num_of_headers of them. The page layout is not what we expect, and the
+        # --- caller may want a second opinion (see parser_backends.HtmlParserBackend).
+        self.unexpected_rows: int = 0
+
+        # --- Where we are in the document
+        self.table_depth: int   = 0
+        self.in_row: bool       = False
+        self.in_cell: bool      = False
+
+        # --- State of the row currently being read
+        self.cells: List[str]                   = []    # stripped text of each finished cell
+        self.cell_pieces: List[str]             = []    # stripped text pieces of the current cell
+        self.code_href: Optional[str]           = None  # href of the first <a> in the Code column
+        self.code_link_seen: bool               = False
+        self.stations: List[Tuple[str, bool]]   = []    # (code, removed) for each station <li>
+        self.li_pieces: Optional[List[str]]     = None  # text pieces of the current station <li>, if inside one
+        self.li_removed: bool                   = False
+        self.skip_row: bool                     = False # failed the stations filter, the rest of its text is ignored
+
+        # --- Text between two tags. HTMLParser may hand it over in several pieces, and it must be stripped as a whole.
+        self.text: List[str]    = []
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def pop_rows(self) -> List[Row]:
+        """
+        :return:    The rows finished since the last call
+        """
+
+        rows, self.rows = self.rows, []
+        return rows
+    # --- END OF pop_rows() --------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        """
+        Ends the document, finishing a last row left open by sloppy markup.
+
+        :return: None
+        """
+
+        super().close()
+        self._flush_text()
+        self._end_row()
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def handle_starttag(self, _tag: str, _attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush_text()
+
+        if _tag == "table":
+            self.table_depth += 1
+        elif not self.table_depth:
+            return
+        elif _tag == "tr":
+            self._end_row()
+            self.in_row = True
+        elif _tag == "td" and self.in_row:
+            self._end_cell()
+            self.in_cell = True
+        elif _tag == "a" and self.in_cell and len(self.cells) == 1 and not self.code_link_seen:
+            self.code_link_seen = True
+            self.code_href      = dict(_attrs).get("href")
+        elif _tag == "li" and self.in_cell and len(self.cells) == self.stations_index:
+            classes = (dict(_attrs).get("class") or "").split()
+            if "station-id" in classes:
+                self.li_pieces  = []
+                self.li_removed = "removed" in classes
+    # --- END OF handle_starttag() -------------------------------------------------------------------------------------
+
+
+
+    def handle_endtag(self, _tag: str) -> None:
+        self._flush_text()
+
+        if _tag == "table" and self.table_depth:
+            self._end_row()
+            self.table_depth -= 1
+        elif _tag == "tr":
+            self._end_row()
+        elif _tag == "td":
+            self._end_cell()
+        elif _tag == "li" and self.li_pieces is not None:
+            self.stations.append(("".join(self.li_pieces), self.li_removed))
+            self.li_pieces = None
+    # --- END OF handle_endtag() ---------------------------------------------------------------------------------------
+
+
+
+    def handle_startendtag(self, _tag: str, _attrs: List[Tuple[str, Optional[str]]]) -> None:
+        # --- <td/>, <a/> and friends: open and close right away
+        self.handle_starttag(_tag, _attrs)
+        if _tag in ("td", "li", "tr"):
+            self.handle_endtag(_tag)
+    # --- END OF handle_startendtag() ----------------------------------------------------------------------------------
+
+
+
+    def handle_data(self, _data: str) -> None:
+        if self.in_cell and not self.skip_row:
+            self.text.append(_data)
+    # --- END OF handle_data() -----------------------------------------------------------------------------------------
+
+
+
+    def handle_comment(self, _data: str) -> None:
+        # --- Comments aren't text, but they do end the text before them
+        self._flush_text()
+    # --- END OF handle_comment() --------------------------------------------------------------------------------------
+
+
+
+    def _flush_text(self) -> None:
+        """
+        Hands the text collected since the last tag to the current cell (and station <li>), stripped.
+
+        :return: None
+        """
+
+        if not self.text:
+            return
+        piece = "".join(self.text).strip()
+        self.text = []
+        if not piece:
+            return
+        self.cell_pieces.append(piece)
+        if self.li_pieces is not None:
+            self.li_pieces.append(piece)
+    # --- END OF _flush_text() -----------------------------------------------------------------------------------------
+
+
+
+    def _end_cell(self) -> None:
+        """
+        Closes the current cell, if one is open.
+
+        :return: None
+        """
+
+        if not self.in_cell:
+            return
+        if self.li_pieces is not None:
+            self.stations.append(("".join(self.li_pieces), self.li_removed))
+            self.li_pieces = None
+        self.cells.append("".join(self.cell_pieces))
+        self.cell_pieces    = []
+        self.in_cell        = False
+
+        # --- The stations cell is done: the stations filter decides whether the remaining cells are worth reading
+        if len(self.cells) == self.stations_index + 1:
+            self.skip_row = not self.row_builder.matches_stations([code for code, removed in self.stations
+                                                                   if not removed])
+    # --- END OF _end_cell() -------------------------------------------------------------------------------------------
+
+
+
+    def _end_row(self) -> None:
+        """
+        Closes the current row, if one is open, and turns it into a Row if it has enough cells.
+
+        :return: None
+        """
+
+        if not self.in_row:
+            return
+        self._end_cell()
+
+        if self.cells and len(self.cells) != self.num_of_headers:
+            self.unexpected_rows += 1
+
+        if len(self.cells) >= self.num_of_headers and not self.skip_row:
+            active_ids  = [code for code, removed in self.stations if not removed]
+            removed_ids = [code for code, removed in self.stations if removed]
+            self.rows.append(self.row_builder.make_row(self.cells, active_ids, removed_ids, self.code_href,
+                                                       _filtered=True))
+
+        self.in_row         = False
+        self.cells          = []
+        self.code_href      = None
+        self.code_link_seen = False
+        self.stations       = []
+        self.skip_row       = False
+    # --- END OF _end_row() --------------------------------------------------------------------------------------------
+# --- END OF class IvsStreamParser -------------------------------------------------------------------------------------
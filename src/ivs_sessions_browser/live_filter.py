@@ -0,0 +1,143 @@
+"""
+Filename:       live_filter.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Filter-as-you-type: LiveFilter evaluates the filter typed so far on a background thread, a moment
+                after the last keystroke, so the prompt can show the number of matching sessions and the first of
+                them while the query is still being written, without the typing ever waiting for a filter to run.
+
+Notes:          Evaluating is cooperative about being cancelled: the evaluate callable gets a check() to call between
+                its steps, which raises Cancelled once a newer text has been typed. A step in progress (e.g. building
+                a trigram index on the first free text search) is not interrupted, only its result dropped.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import queue
+import threading
+
+from typing     import Any, Callable, Optional, Tuple, Union
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+class Cancelled(Exception):
+    """
+    Raised by the check() LiveFilter hands to the evaluate callable, when the text it evaluates has been replaced.
+    """
+# --- END OF class Cancelled -------------------------------------------------------------------------------------------
+
+
+
+class LiveFilter:
+    """
+        Calls _evaluate(text, check) on a daemon thread for the newest text passed to submit(), once it has not
+    changed for _debounce seconds. The main loop collects the outcome with poll().
+    """
+
+    def __init__(self,
+                 _evaluate: Callable[[str, Callable[[], None]], Any],
+                 _debounce: float = 0.15
+                 ) -> None:
+
+        self.evaluate   = _evaluate
+        self.debounce   = _debounce
+
+        # --- The text waiting to be evaluated, and a counter of submit() calls: an evaluation is stale once the
+        # --- counter has moved on from the value it started with
+        self.condition                  = threading.Condition()
+        self.pending: Optional[str]     = None
+        self.generation: int            = 0
+        self.stopped: bool              = False
+
+        # --- (text, result or the exception raised)
+        self.results: "queue.Queue[Tuple[str, Union[Any, Exception]]]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="live-filter", daemon=True)
+        self.thread.start()
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def submit(self, _text: str) -> None:
+        """
+        Non-blocking: asks for _text to be evaluated, replacing (and cancelling) whatever was asked for before.
+
+        :param _text:   The text typed so far
+        :return:        None
+        """
+
+        with self.condition:
+            self.pending     = _text
+            self.generation += 1
+            self.condition.notify()
+    # --- END OF submit() ----------------------------------------------------------------------------------------------
+
+
+
+    def poll(self) -> Optional[Tuple[str, Union[Any, Exception]]]:
+        """
+        Non-blocking: the newest finished evaluation, if any arrived since the last call. Older ones are superseded.
+
+        :return: (text, result or exception), or None
+        """
+
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                return latest
+    # --- END OF poll() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        """
+        Stops the thread, and waits for it, so whatever _evaluate uses is free again when this returns. An evaluation
+        in progress stops at its next check().
+
+        :return: None
+        """
+
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _run(self) -> None:
+        """
+        Thread body: wait for a text, wait until it stays the same for the debounce time, evaluate, hand over.
+
+        :return: None
+        """
+
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                while not self.stopped:
+                    generation = self.generation
+                    self.condition.wait(self.debounce)
+                    if generation == self.generation:
+                        break
+                if self.stopped:
+                    return
+                text, self.pending = self.pending, None
+
+            def check() -> None:
+                if self.stopped or self.generation != generation:
+                    raise Cancelled
+
+            try:
+                result: Union[Any, Exception] = self.evaluate(text, check)
+                check()
+            except Cancelled:
+                continue
+            except Exception as e:
+                result = e
+            self.results.put((text, result))
+    # --- END OF _run() ------------------------------------------------------------------------------------------------
+# --- END OF class LiveFilter ------------------------------------------------------------------------------------------
@@ -0,0 +1,270 @@
+"""
+Filename:       local_source.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Schedule pages from disk instead of the live site: a directory or a tar archive laid out like the site,
+                i.e. sessions/<year>/index.html and sessions/intensive/<year>/index.html. Used for offline browsing
+                (air-gapped machines) and for benchmarking the parser without the network. SourceMirror writes that
+                same layout, from whatever a normal run fetched.
+
+Notes:          Pages are never read into one string: files in a directory are memory-mapped, archive members are
+                streamed, and both are handed out in chunks for ReadData.iter_rows(), like a download.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import mmap
+import tarfile
+import threading
+
+from typing         import Dict, Iterable, Iterator
+from urllib.parse   import urlsplit
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def source_path_for_url(_url: str) -> str:
+    """
+    Where a schedule page lives in a local source, e.g. 'sessions/intensive/2025/index.html' for
+    https://ivscc.gsfc.nasa.gov/sessions/intensive/2025/
+
+    :param _url:    The page URL
+    :return:        Relative path, with '/' separators
+    """
+
+    path = urlsplit(_url).path.strip("/")
+    return f"{path}/index.html" if path else "index.html"
+# --- END OF source_path_for_url() -------------------------------------------------------------------------------------
+
+
+
+class LocalSource:
+    """
+    Reads schedule pages from a directory or a (compressed) tar archive.
+    """
+
+    def __init__(self, _path: str) -> None:
+        """
+        :param _path:       Directory, or tar archive (.tar, .tar.gz, .tgz, ...)
+        :raises ValueError: If _path is neither
+        """
+
+        self.path       = _path
+        self.is_dir     = os.path.isdir(_path)
+
+        # --- Archive members by their path relative to the site root. The archive may have the pages at its root, or
+        # --- inside one top level directory (tar czf site.tar.gz site/).
+        self.members: Dict[str, tarfile.TarInfo] = {}
+
+        if not self.is_dir:
+            try:
+                with tarfile.open(_path, "r:*") as tf:
+                    for member in tf:
+                        if member.isfile():
+                            self.members[self._relative_member_name(member.name)] = member
+            except (OSError, tarfile.TarError) as e:
+                raise ValueError(f"{_path} is neither a directory nor a readable tar archive ({e})") from e
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def iter_body(self, _url: str, _chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        The page for _url, in chunks.
+
+        :param _url:                The page URL
+        :param _chunk_size:         Bytes per chunk
+        :return:                    Iterator over the chunks
+        :raises FileNotFoundError:  If the source has no page for _url (checked right away, not on the first chunk)
+        """
+
+        rel = source_path_for_url(_url)
+        if self.is_dir:
+            path = os.path.join(self.path, *rel.split("/"))
+            if not os.path.isfile(path):
+                raise FileNotFoundError(path)
+            return self._iter_file(path, _chunk_size)
+
+        member = self.members.get(rel)
+        if member is None:
+            raise FileNotFoundError(f"{self.path}:{rel}")
+        return self._iter_member(member, _chunk_size)
+    # --- END OF iter_body() -------------------------------------------------------------------------------------------
+
+
+
+    def _iter_file(self, _path: str, _chunk_size: int) -> Iterator[bytes]:
+        """
+        Memory-maps _path and yields it in chunks, so only one chunk at a time is copied out of the page cache.
+
+        :param _path:       The file
+        :param _chunk_size: Bytes per chunk
+        :return:            Iterator over the chunks
+        """
+
+        with open(_path, "rb") as f:
+            # --- An empty file can't be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), _chunk_size):
+                    yield mm[start:start + _chunk_size]
+    # --- END OF _iter_file() ------------------------------------------------------------------------------------------
+
+
+
+    def _iter_member(self, _member: tarfile.TarInfo, _chunk_size: int) -> Iterator[bytes]:
+        """
+        Streams one archive member. Each call opens the archive on its own, so pages can be read from several threads.
+
+        :param _member:     The member, as found when the archive was indexed
+        :param _chunk_size: Bytes per chunk
+        :return:            Iterator over the chunks
+        """
+
+        with tarfile.open(self.path, "r:*") as tf:
+            f = tf.extractfile(_member)
+            if f is None:
+                return
+            with f:
+                while True:
+                    chunk = f.read(_chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+    # --- END OF _iter_member() ----------------------------------------------------------------------------------------
+
+
+
+    def _relative_member_name(self, _name: str) -> str:
+        """
+        :param _name:   Member name in the archive, e.g. './site/sessions/2025/index.html'
+        :return:        The name from 'sessions/' onwards, or the name itself if there is no 'sessions' directory
+        """
+
+        parts = [p for p in _name.split("/") if p not in ("", ".")]
+        if "sessions" in parts:
+            parts = parts[parts.index("sessions"):]
+        return "/".join(parts)
+    # --- END OF _relative_member_name() -------------------------------------------------------------------------------
+# --- END OF class LocalSource -----------------------------------------------------------------------------------------
+
+
+
+class SourceMirror:
+    """
+    Writes fetched pages to a directory in the layout LocalSource reads, so a normal run can be replayed offline with
+    --source.
+    """
+
+    def __init__(self, _dir: str) -> None:
+        self.dir = _dir
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def writer(self, _url: str) -> "SourceWriter":
+        """
+        :param _url:    The page URL
+        :return:        A writer for the page body, to be fed while downloading
+        """
+
+        return SourceWriter(os.path.join(self.dir, *source_path_for_url(_url).split("/")))
+    # --- END OF writer() ----------------------------------------------------------------------------------------------
+
+
+
+    def save(self, _url: str, _chunks: Iterable[bytes]) -> None:
+        """
+        Writes a whole page at once, e.g. a page that came from the HTTP cache.
+
+        :param _url:    The page URL
+        :param _chunks: The page body
+        :return:        None
+        """
+
+        writer = self.writer(_url)
+        try:
+            for chunk in _chunks:
+                writer.write(chunk)
+            writer.commit()
+        finally:
+            writer.discard()
+    # --- END OF save() ------------------------------------------------------------------------------------------------
+# --- END OF class SourceMirror ----------------------------------------------------------------------------------------
+
+
+
+class SourceWriter:
+    """
+    Writes one mirrored page to a temporary file, renamed into place on commit(). Like the cache, failing to write is
+    not an error: the mirror just won't have the page.
+    """
+
+    def __init__(self, _path: str) -> None:
+        self.path       = _path
+        self.tmp_path   = f"{_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(_path), exist_ok=True)
+            self.file = open(self.tmp_path, "wb")
+        except OSError:
+            self.file = None
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def write(self, _chunk: bytes) -> None:
+        """
+        :param _chunk:  Next piece of the page
+        :return:        None
+        """
+
+        if self.file is None:
+            return
+        try:
+            self.file.write(_chunk)
+        except OSError:
+            self.discard()
+    # --- END OF write() -----------------------------------------------------------------------------------------------
+
+
+
+    def commit(self) -> None:
+        """
+        Moves the finished page into place.
+
+        :return: None
+        """
+
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.path)
+        except OSError:
+            self.discard()
+    # --- END OF commit() ----------------------------------------------------------------------------------------------
+
+
+
+    def discard(self) -> None:
+        """
+        Drops an unfinished page. Safe to call after commit().
+
+        :return: None
+        """
+
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+    # --- END OF discard() ---------------------------------------------------------------------------------------------
+# --- END OF class SourceWriter ----------------------------------------------------------------------------------------
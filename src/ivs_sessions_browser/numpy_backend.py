@@ -0,0 +1,259 @@
+"""
+Filename:       numpy_backend.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Filtering and sorting a SessionTable with NumPy, when it is installed. VectorTable holds the columns of
+                one table as arrays, each made on first use:
+
+                    start, doy, dur     int64 copies of the typed columns
+                    categorical         the value number of each row
+                    stations            a bool matrix per side, one row per station and one column per table row:
+                                        matrix[n] says which rows have station n
+                    ranks               SessionTable.rank() of a column, for sorting
+
+                A clause becomes a bool mask over all rows (station groups are ANDs and ORs of matrix rows, values a
+                lookup in a table of the allowed value numbers, ranges two comparisons), the masks of a query are
+                ANDed, and the matching rows are the nonzero places of the result. Sorting picks the rows out of the
+                table's order of the last key, then sorts on the ranks of the keys before it with np.lexsort().
+
+Notes:          Optional: available() is False without NumPy, and filter_query.py / FilterAndSort then do everything in
+                Python, with the same results. Substring clauses stay with the trigram index or the per-row test,
+                since NumPy has no faster way to look into Python strings.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Project defined
+from .session_table import SessionTable, START, DOY, DUR, MISSING, MISSING_START
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+def available() -> bool:
+    """
+    :return:    True if NumPy is installed
+    """
+
+    return np is not None
+# --- END OF available() -----------------------------------------------------------------------------------------------
+
+
+
+class VectorTable:
+    """
+    The arrays of one SessionTable. Only made when available() is True.
+    """
+
+    def __init__(self, _table: SessionTable) -> None:
+        self.table  = _table
+        self.size   = len(_table)
+
+        # --- Made on first use: column index or side -> array
+        self._numbers: Dict[int, "np.ndarray"]     = {}
+        self._matrix: Dict[str, "np.ndarray"]      = {}
+        self._ranks: Dict[int, "np.ndarray"]       = {}
+        self._orders: Dict[Tuple[int, bool], "np.ndarray"] = {}
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def is_for(self, _table: SessionTable) -> bool:
+        return self.table is _table
+    # --- END OF is_for() ----------------------------------------------------------------------------------------------
+
+
+
+    def numbers(self, _col: int) -> "np.ndarray":
+        """
+        :param _col:    START, DOY, DUR or a dictionary encoded column
+        :return:        The values of the column (value numbers for a dictionary encoded one)
+        """
+
+        numbers = self._numbers.get(_col)
+        if numbers is None:
+            table = self.table
+            match _col:
+                case c if c == START:
+                    numbers = np.array(table.start, dtype=np.int64)
+                case c if c in (DOY, DUR):
+                    numbers = np.array(table.doy if c == DOY else table.dur, dtype=np.int64)
+                case c:
+                    numbers = np.array(table.categorical[c][1], dtype=np.intp)
+            self._numbers[_col] = numbers
+        return numbers
+    # --- END OF numbers() ---------------------------------------------------------------------------------------------
+
+
+
+    def matrix(self, _side: str) -> "np.ndarray":
+        """
+        :param _side:   'active', 'removed' or 'all'
+        :return:        Station number x row: True where the row has the station on that side
+        """
+
+        matrix = self._matrix.get(_side)
+        if matrix is None:
+            table = self.table
+            if _side == "all":
+                matrix = self.matrix("active") | self.matrix("removed")
+            else:
+                ids, pos    = (table.active_ids, table.active_pos) if _side == "active" else \
+                              (table.removed_ids, table.removed_pos)
+                rows        = np.repeat(np.arange(self.size), np.diff(np.array(pos, dtype=np.intp)))
+                matrix      = np.zeros((len(table.stations.values), self.size), dtype=bool)
+                matrix[np.array(ids, dtype=np.intp), rows] = True
+            self._matrix[_side] = matrix
+        return matrix
+    # --- END OF matrix() ----------------------------------------------------------------------------------------------
+
+
+
+    def rank(self, _col: int) -> "np.ndarray":
+        """
+        :param _col:    Column index
+        :return:        SessionTable.rank() of the column, as int64 so it can be negated
+        """
+
+        rank = self._ranks.get(_col)
+        if rank is None:
+            rank = self._ranks[_col] = np.array(self.table.rank(_col), dtype=np.int64)
+        return rank
+    # --- END OF rank() ------------------------------------------------------------------------------------------------
+
+
+
+    def order(self, _col: int, _ascending: bool) -> "np.ndarray":
+        """
+        :param _col:        Column index
+        :param _ascending:  Sort order
+        :return:            SessionTable.order() of the column
+        """
+
+        key     = (_col, _ascending)
+        order   = self._orders.get(key)
+        if order is None:
+            order = self._orders[key] = np.array(self.table.order(_col, _ascending), dtype=np.intp)
+        return order
+    # --- END OF order() -----------------------------------------------------------------------------------------------
+
+
+
+    def station_mask(self, _groups: Sequence[Tuple[int, ...]], _side: str) -> "np.ndarray":
+        """
+        :param _groups: Groups of station numbers
+        :param _side:   'active', 'removed' or 'all'
+        :return:        Rows having all stations of any group on that side
+        """
+
+        matrix = self.matrix(_side)
+        result = np.zeros(self.size, dtype=bool)
+        for group in _groups:
+            rows = matrix[group[0]].copy()
+            for n in group[1:]:
+                rows &= matrix[n]
+            result |= rows
+        return result
+    # --- END OF station_mask() ----------------------------------------------------------------------------------------
+
+
+
+    def value_mask(self, _col: int, _allowed: Set[int]) -> "np.ndarray":
+        """
+        :param _col:        A dictionary encoded column
+        :param _allowed:    Value numbers
+        :return:            Rows whose value is one of them
+        """
+
+        wanted = np.zeros(len(self.table.categorical[_col][0].values), dtype=bool)
+        wanted[list(_allowed)] = True
+        return wanted[self.numbers(_col)]
+    # --- END OF value_mask() ------------------------------------------------------------------------------------------
+
+
+
+    def range_mask(self, _col: int, _low: Optional[int], _high: Optional[int]) -> "np.ndarray":
+        """
+        :param _col:    START, DOY or DUR
+        :param _low:    Lowest value included, or None
+        :param _high:   Lowest value above the ones included, or None
+        :return:        The rows SessionTable.rows_between() gives: no row without a value (MISSING)
+        """
+
+        # --- Bounds outside int64 (a typo like 'dur: <99999999999999999999') are moved to its ends, which no value
+        # --- reaches: MISSING_START is the lowest int64
+        limits  = np.iinfo(np.int64)
+        values  = self.numbers(_col)
+        mask    = values > (MISSING_START if _col == START else MISSING)
+        if _low is not None:
+            mask &= values >= min(max(_low, limits.min), limits.max)
+        if _high is not None:
+            mask &= values < min(max(_high, limits.min), limits.max)
+        return mask
+    # --- END OF range_mask() ------------------------------------------------------------------------------------------
+
+
+
+    def bits_mask(self, _bits: int) -> "np.ndarray":
+        """
+        :param _bits:   A bitset of rows (row_index.py)
+        :return:        The same rows as a mask
+        """
+
+        packed = np.frombuffer(_bits.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, count=self.size, bitorder="little").astype(bool)
+    # --- END OF bits_mask() -------------------------------------------------------------------------------------------
+
+
+
+    def rows_mask(self, _rows: Iterable[int]) -> "np.ndarray":
+        """
+        :param _rows:   Row numbers
+        :return:        The same rows as a mask
+        """
+
+        mask = np.zeros(self.size, dtype=bool)
+        mask[np.fromiter(_rows, dtype=np.intp)] = True
+        return mask
+    # --- END OF rows_mask() -------------------------------------------------------------------------------------------
+
+
+
+    @staticmethod
+    def rows(_mask: "np.ndarray") -> List[int]:
+        """
+        :param _mask:   A mask
+        :return:        Its rows, in table order
+        """
+
+        return np.flatnonzero(_mask).tolist()
+    # --- END OF rows() ------------------------------------------------------------------------------------------------
+
+
+
+    def sort(self, _indices: Sequence[int], _keys: Sequence[Tuple[int, bool]]) -> List[int]:
+        """
+            The rows of _indices sorted as FilterAndSort.sort_indices() does in Python: picked in the order of the last
+        key (a mask over its precomputed order), then a stable sort on the ranks of the keys before it, the first one
+        deciding. A descending key is sorted on its negated rank, which keeps equal rows in order as reverse=True does.
+
+        :param _indices:    Row numbers, in table order
+        :param _keys:       (column index, ascending) pairs, the first the primary key
+        :return:            The row numbers, sorted
+        """
+
+        col, ascending  = _keys[-1]
+        order           = self.order(col, ascending)
+        rows            = order if len(_indices) == self.size else order[self.rows_mask(_indices)[order]]
+        if len(_keys) > 1:
+            rows = rows[np.lexsort([self.rank(col)[rows] if ascending else -self.rank(col)[rows]
+                                    for col, ascending in _keys[:-1]][::-1])]
+        return rows.tolist()
+    # --- END OF sort() ------------------------------------------------------------------------------------------------
+# --- END OF class VectorTable -----------------------------------------------------------------------------------------
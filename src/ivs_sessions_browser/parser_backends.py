@@ -0,0 +1,498 @@
+"""
+Filename:       parser_backends.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    The HTML engines that can turn a schedule page into rows, behind one push interface: feed() text as it
+                arrives, collect finished rows with pop_rows(), and close() at the end of the page.
+
+                    html.parser - IvsStreamParser, on the standard library's HTMLParser: single pass, no DOM, parsing
+                                  while the page is still downloading. Falls back to bs4 on unexpected column counts.
+                    lxml        - lxml's libxml2 HTML parser, fed incrementally, each <tr> read and freed as soon
+                                  as it ends (HTMLPullParser)
+                    selectolax  - selectolax (lexbor), on slices of the page ending with a </tr>, each parsed as
+                                  soon as it has arrived
+                    bs4         - BeautifulSoup with html.parser and IvsSessionParser.parse(), the reference
+
+Notes:          Every backend hands the same cell texts, station ids and href to IvsSessionParser.make_row(), so the
+                rows are identical whatever the engine (scripts/bench_parsers.py checks that on real pages). All of
+                them read the stations cell first and skip the rest of rows the stations filter drops. lxml and
+                selectolax are optional; 'auto' picks the fastest one installed.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import re
+
+from typing import Dict, List, Optional, Tuple, Type
+
+from bs4    import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# --- Project defined
+from .defs                  import Row, FIELD_INDEX
+from .ivs_session_parser    import IvsSessionParser
+from .ivs_stream_parser     import IvsStreamParser
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- The end tag of a table row, where a page can be cut into slices parsed on their own, and the tags opening and
+# --- closing a table, to know how many tables are open where a slice starts
+ROW_END     = re.compile(r"</tr\s*>", re.IGNORECASE)
+TABLE_TAG   = re.compile(r"<(/?)table[\s>]", re.IGNORECASE)
+
+
+
+class ParserBackend:
+    """
+    Base class. A backend is made for one page, fed its text, and closed.
+    """
+
+    name: str = ""
+
+    def __init__(self,
+                 _num_of_headers:   int,
+                 _is_intensive:     bool,
+                 _stations_filter:  Optional[str] = None
+                 ) -> None:
+
+        self.num_of_headers = _num_of_headers
+        self.row_builder    = IvsSessionParser(None, _num_of_headers, _is_intensive, _stations_filter)
+        self.stations_index = FIELD_INDEX.get("stations", -1)
+        self.rows: List[Row] = []
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        :return:    True if the engine behind this backend is installed
+        """
+
+        return True
+    # --- END OF available() -------------------------------------------------------------------------------------------
+
+
+
+    def feed(self, _text: str) -> None:
+        raise NotImplementedError
+    # --- END OF feed() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        raise NotImplementedError
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def pop_rows(self) -> List[Row]:
+        """
+        :return:    The rows finished since the last call
+        """
+
+        rows, self.rows = self.rows, []
+        return rows
+    # --- END OF pop_rows() --------------------------------------------------------------------------------------------
+
+
+
+    def _wanted(self, _stations: List[Tuple[str, bool]]) -> bool:
+        """
+        The stations filter, checked before the rest of the row is extracted.
+
+        :param _stations:   (code, removed) for each station <li> in the stations cell, in page order
+        :return:            True if the row passes the filter
+        """
+
+        return self.row_builder.matches_stations([code for code, removed in _stations if not removed])
+    # --- END OF _wanted() ---------------------------------------------------------------------------------------------
+
+
+
+    def _add_row(self, _cells: List[str], _stations: List[Tuple[str, bool]], _href: Optional[str]) -> None:
+        """
+        Builds a row from what a backend found in one <tr>, the same way for all backends. The row must have passed
+        _wanted().
+
+        :param _cells:      Stripped text of the row's first num_of_headers cells
+        :param _stations:   (code, removed) for each station <li> in the stations cell, in page order
+        :param _href:       href of the first link in the Code column, if any
+        :return:            None
+        """
+
+        active_ids  = [code for code, removed in _stations if not removed]
+        removed_ids = [code for code, removed in _stations if removed]
+        self.rows.append(self.row_builder.make_row(_cells, active_ids, removed_ids, _href, _filtered=True))
+    # --- END OF _add_row() --------------------------------------------------------------------------------------------
+# --- END OF class ParserBackend ---------------------------------------------------------------------------------------
+
+
+
+class _WholePageBackend(ParserBackend):
+    """
+    For engines that want the whole page: feed() only collects the text, close() parses it.
+    """
+
+    def __init__(self, *_args, **_kwargs) -> None:
+        super().__init__(*_args, **_kwargs)
+        self.pieces: List[str] = []
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def feed(self, _text: str) -> None:
+        self.pieces.append(_text)
+    # --- END OF feed() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        text, self.pieces = "".join(self.pieces), []
+        self._parse_page(text)
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _parse_page(self, _text: str) -> None:
+        raise NotImplementedError
+    # --- END OF _parse_page() -----------------------------------------------------------------------------------------
+# --- END OF class _WholePageBackend -----------------------------------------------------------------------------------
+
+
+
+class HtmlParserBackend(ParserBackend):
+    """
+        The fast path without dependencies: the standard library's HTMLParser, through IvsStreamParser, builds each row
+    straight from the tag events while the page downloads.
+
+        IvsStreamParser assumes the fixed layout of the sessions table. If it finds a table row with an unexpected
+    number of columns, the rest of the page is parsed with BeautifulSoup (SoupBackend) instead. So the text is kept
+    from the last </tr> the parser passed outside a row: the rows finished since then are held back until the next
+    one, and the ones before it are handed out. After an unexpected row all text from there on is kept, and parsed at
+    close(), inside the <table>'s open where it starts.
+    """
+
+    name = "html.parser"
+
+    def __init__(self, *_args, **_kwargs) -> None:
+        super().__init__(*_args, **_kwargs)
+        self.parser = IvsStreamParser(self.num_of_headers,
+                                      self.row_builder.is_intensive,
+                                      self.row_builder.stations_filter)
+
+        # --- Text since the last row boundary, the rows finished in it, and the tables open at the boundary
+        self.tail: List[str]    = []
+        self.held: List[Row]    = []
+        self.depth: int         = 0
+
+        # --- True once a row was unexpected: the text is only kept from then on, for the BeautifulSoup fallback
+        self.fell_back: bool = False
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def feed(self, _text: str) -> None:
+        if self.fell_back:
+            self.tail.append(_text)
+            return
+
+        # --- Cut after the last </tr> of the new text (which may have begun in the piece before), to try for a
+        # --- boundary there
+        head    = "".join(self.tail[-16:])[-16:]
+        cut     = 0
+        for end in ROW_END.finditer(head + _text):
+            cut = max(cut, end.end() - len(head))
+
+        for piece, at_row_end in ((_text[:cut], True), (_text[cut:], False)):
+            if not piece:
+                continue
+            self.tail.append(piece)
+            if self.fell_back:
+                continue
+            self.parser.feed(piece)
+            self.held.extend(self.parser.pop_rows())
+            if self.parser.unexpected_rows:
+                self._fall_back()
+            elif at_row_end and not self.parser.in_row and not self.parser.rawdata:
+                self.rows.extend(self.held)
+                self.held, self.tail, self.depth = [], [], self.parser.table_depth
+    # --- END OF feed() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        if not self.fell_back:
+            self.parser.close()
+            self.held.extend(self.parser.pop_rows())
+            if self.parser.unexpected_rows:
+                self._fall_back()
+
+        if self.fell_back:
+            soup = SoupBackend(self.num_of_headers, self.row_builder.is_intensive, self.row_builder.stations_filter)
+            soup.feed("<table>" * self.depth + "".join(self.tail))
+            soup.close()
+            self.held = soup.pop_rows()
+
+        self.rows.extend(self.held)
+        self.held, self.tail = [], []
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _fall_back(self) -> None:
+        """
+        Drops the rows since the last boundary, which BeautifulSoup reads again from the text kept since then.
+
+        :return: None
+        """
+
+        self.fell_back  = True
+        self.held       = []
+    # --- END OF _fall_back() ------------------------------------------------------------------------------------------
+# --- END OF class HtmlParserBackend -----------------------------------------------------------------------------------
+
+
+
+class LxmlBackend(ParserBackend):
+    """
+        lxml: the text is fed to libxml2's push parser as it arrives, and a pull parser hands over each <tr> as soon as
+    its end tag is read. The row is built from it, and it is then dropped from the tree with everything before it,
+    so rows come out while the page downloads and only the unfinished part of the tree is kept.
+    """
+
+    name = "lxml"
+
+    def __init__(self, *_args, **_kwargs) -> None:
+        super().__init__(*_args, **_kwargs)
+        self.parser = etree.HTMLPullParser(events=("end",), tag="tr")
+        self.fed    = False
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    @classmethod
+    def available(cls) -> bool:
+        return etree is not None
+    # --- END OF available() -------------------------------------------------------------------------------------------
+
+
+
+    def feed(self, _text: str) -> None:
+        if _text:
+            self.parser.feed(_text)
+            self.fed = True
+            self._read_rows()
+    # --- END OF feed() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        # --- libxml2 refuses to close a document it was never given
+        if not self.fed:
+            return
+        self.parser.close()
+        self._read_rows()
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _read_rows(self) -> None:
+        """
+        Builds the rows of the <tr>'s finished since the last call, and frees them.
+
+        :return: None
+        """
+
+        for _, tr in self.parser.read_events():
+            self._read_row(tr)
+
+            # --- A row inside another row's table is freed with the outer one, which still needs its cells
+            if next(tr.iterancestors("tr"), None) is None:
+                tr.clear()
+                parent = tr.getparent()
+                if parent is not None:
+                    while tr.getprevious() is not None:
+                        del parent[0]
+    # --- END OF _read_rows() ------------------------------------------------------------------------------------------
+
+
+
+    def _read_row(self, _tr) -> None:
+        """
+        :param _tr: A finished <tr> element
+        :return:    None
+        """
+
+        if next(_tr.iterancestors("table"), None) is None:
+            return
+        tds = list(_tr.iter("td"))
+        if len(tds) < self.num_of_headers:
+            return
+
+        stations = []
+        for li in tds[self.stations_index].iter("li"):
+            classes = (li.get("class") or "").split()
+            if "station-id" in classes:
+                stations.append(("".join(s.strip() for s in li.itertext()), "removed" in classes))
+        if not self._wanted(stations):
+            return
+
+        cells = ["".join(s.strip() for s in td.itertext()) if i != self.stations_index else ""
+                 for i, td in enumerate(tds[:self.num_of_headers])]
+
+        link = next(tds[1].iter("a"), None)
+        self._add_row(cells, stations, link.get("href") if link is not None else None)
+    # --- END OF _read_row() -------------------------------------------------------------------------------------------
+# --- END OF class LxmlBackend -----------------------------------------------------------------------------------------
+
+
+
+class SelectolaxBackend(ParserBackend):
+    """
+        selectolax, on the lexbor engine. lexbor parses a whole document at once, so the page is parsed in slices
+    ending with a </tr>, each one as soon as it is complete: rows come out while the page downloads, and only the
+    text after the last </tr> is kept. A slice is put inside as many <table>'s as are open where it starts, so its rows
+    are table rows as they are in the page.
+    """
+
+    name = "selectolax"
+
+    def __init__(self, *_args, **_kwargs) -> None:
+        super().__init__(*_args, **_kwargs)
+        self.pending: List[str] = []
+        self.depth: int         = 0     # tables open at the end of the text parsed so far
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    @classmethod
+    def available(cls) -> bool:
+        return LexborHTMLParser is not None
+    # --- END OF available() -------------------------------------------------------------------------------------------
+
+
+
+    def feed(self, _text: str) -> None:
+        self.pending.append(_text)
+        if "<" not in _text:
+            return
+
+        # --- An end tag can be split over two pieces, so the text kept is searched again with the new piece
+        text = "".join(self.pending)
+        last = None
+        for last in ROW_END.finditer(text):
+            pass
+        if last is None:
+            self.pending = [text]
+            return
+        self.pending = [text[last.end():]]
+        self._parse_slice(text[:last.end()])
+    # --- END OF feed() ------------------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        text, self.pending = "".join(self.pending), []
+        if text.strip():
+            self._parse_slice(text)
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _parse_slice(self, _text: str) -> None:
+        """
+        :param _text:   The text after the last slice, up to and including a </tr>
+        :return:        None
+        """
+
+        tree = LexborHTMLParser("<table>" * self.depth + _text)
+        for tag in TABLE_TAG.finditer(_text):
+            self.depth = max(0, self.depth + (-1 if tag.group(1) else 1))
+
+        for tr in tree.css("table tr"):
+            tds = tr.css("td")
+            if len(tds) < self.num_of_headers:
+                continue
+
+            stations = []
+            for li in tds[self.stations_index].css("li.station-id"):
+                classes = (li.attributes.get("class") or "").split()
+                stations.append((li.text(deep=True, separator="", strip=True), "removed" in classes))
+            if not self._wanted(stations):
+                continue
+
+            cells = [td.text(deep=True, separator="", strip=True) if i != self.stations_index else ""
+                     for i, td in enumerate(tds[:self.num_of_headers])]
+
+            link = tds[1].css_first("a")
+            self._add_row(cells, stations, link.attributes.get("href") if link is not None else None)
+    # --- END OF _parse_slice() ----------------------------------------------------------------------------------------
+# --- END OF class SelectolaxBackend -----------------------------------------------------------------------------------
+
+
+
+class SoupBackend(_WholePageBackend):
+    """
+    BeautifulSoup with html.parser, through IvsSessionParser.parse(): the original implementation, kept as the
+    reference the other backends are checked against.
+    """
+
+    name = "bs4"
+
+    def _parse_page(self, _text: str) -> None:
+        self.row_builder.soup = BeautifulSoup(_text, "html.parser")
+        self.rows.extend(self.row_builder.parse())
+        self.row_builder.soup = None
+    # --- END OF _parse_page() -----------------------------------------------------------------------------------------
+# --- END OF class SoupBackend -----------------------------------------------------------------------------------------
+
+
+
+BACKENDS: Dict[str, Type[ParserBackend]] = {backend.name: backend for backend in (HtmlParserBackend,
+                                                                                 LxmlBackend,
+                                                                                 SelectolaxBackend,
+                                                                                 SoupBackend)}
+
+# --- What 'auto' picks, fastest first (see scripts/bench_parsers.py)
+AUTO_ORDER = ("selectolax", "lxml", "html.parser")
+
+
+
+def available_backends() -> List[str]:
+    """
+    :return:    Names of the backends whose engine is installed
+    """
+
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+# --- END OF available_backends() --------------------------------------------------------------------------------------
+
+
+
+def select_backend(_name: str = "auto") -> Type[ParserBackend]:
+    """
+    :param _name:       A backend name, or 'auto' for the fastest one installed
+    :return:            The backend class
+    :raises ValueError: For an unknown backend, or one whose engine isn't installed
+    """
+
+    if _name == "auto":
+        return next(BACKENDS[name] for name in AUTO_ORDER if BACKENDS[name].available())
+
+    backend = BACKENDS.get(_name)
+    if backend is None:
+        raise ValueError(f"unknown parser '{_name}' (choose from auto, {', '.join(BACKENDS)})")
+    if not backend.available():
+        raise ValueError(f"parser '{_name}' is not installed (available: {', '.join(available_backends())})")
+    return backend
+# --- END OF select_backend() ------------------------------------------------------------------------------------------
@@ -9,19 +9,137 @@ Notes:
 """
 
 # --- Import section ---------------------------------------------------------------------------------------------------
+import sys
 import time
+import shutil
+import codecs
+import hashlib
+import threading
 import requests
 
-from bs4    import BeautifulSoup
-from typing import Callable, Optional, List #, Tuple, Dict, Any
+import multiprocessing
+
+from typing             import Callable, Optional, List, Dict, Iterable, Iterator, Type, Union, Tuple #, Any
+from urllib.parse       import urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from requests.adapters  import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
 
 # --- Project defined
 from .defs                      import Row, HEADERS
-from .ivs_session_parser import IvsSessionParser
+from .parser_backends           import ParserBackend, BACKENDS, select_backend
+from .http_cache                import HttpCache, CacheEntry
+from .row_snapshot              import RowSnapshot, content_digest
+from .local_source              import LocalSource, SourceMirror
+from .session_record            import SessionRecord, CODE_SEPARATOR
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
 
+USER_AGENT = "Mozilla/5.0 (compatible; IVSBrowser/1.0)"
+
+
+
+def make_http_session(_pool_size: int = 4, _user_agent: str = USER_AGENT) -> requests.Session:
+    """
+    Creates the requests.Session shared by all downloads: keep-alive connection pooling sized to the number of
+    concurrent fetches, and compressed transfer. requests/urllib3 decompress gzip/deflate bodies transparently.
+
+    :param _pool_size:  Max number of connections kept open per host (match it to the number of workers)
+    :param _user_agent: User-Agent header sent with every request
+    :return:            The session
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(1, _pool_size), pool_maxsize=max(1, _pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent":       _user_agent,
+                            "Accept-Encoding":  "gzip, deflate"})
+    return session
+# --- END OF make_http_session() ---------------------------------------------------------------------------------------
+
+
+
+def iter_page_rows(_chunks:            Iterable[bytes],
+                   _backend:           Type[ParserBackend],
+                   _is_intensive:      bool,
+                   _stations_filter:   Optional[str] = None,
+                   _encoding:          Optional[str] = "utf-8"
+                   ) -> Iterator[Row]:
+    """
+    The streaming pipeline: decodes the chunks as they come and feeds them to the parser backend, yielding the rows as
+    soon as the backend has them (as soon as each </tr> has been seen, with every backend but bs4).
+
+    :param _chunks:             The page body, in chunks of bytes (or memoryviews)
+    :param _backend:            The parser backend class
+    :param _is_intensive:       True for the intensive schedule pages
+    :param _stations_filter:    Stations expression rows must match, or None
+    :param _encoding:           Codec of the body. Unknown or missing codec names fall back to utf-8.
+    :return:                    Iterator over the rows
+    """
+
+    parser  = _backend(len(HEADERS), _is_intensive, _stations_filter)
+    try:
+        decoder = codecs.getincrementaldecoder(_encoding or "utf-8")(errors="replace")
+    except LookupError:
+        # --- Unknown codec name – fall back to utf-8
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    for chunk in _chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_rows()
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_rows()
+# --- END OF iter_page_rows() ------------------------------------------------------------------------------------------
+
+
+
+def parse_page_compact(_body:              bytes,
+                       _backend_name:      str,
+                       _is_intensive:      bool,
+                       _stations_filter:   Optional[str] = None,
+                       _encoding:          Optional[str] = "utf-8",
+                       _chunk_size:        int = 65536
+                       ) -> List[Tuple[Optional[str], ...]]:
+    """
+        Worker side of the parse pool (ReadData._parse_chunks()): parses one page body in a worker process. The rows
+    go back as flat tuples of strings, (*values, session_url, active codes, removed codes), which pickle smaller
+    and faster than the records; expand_compact_rows() turns them back into rows.
+
+    :param _body:               The page body
+    :param _backend_name:       Name of the parser backend, see parser_backends.BACKENDS
+    :param _is_intensive:       True for the intensive schedule pages
+    :param _stations_filter:    Stations expression rows must match, or None
+    :param _encoding:           Codec of the body
+    :param _chunk_size:         Bytes decoded at a time
+    :return:                    The rows, compacted
+    """
+
+    view    = memoryview(_body)
+    chunks  = (view[i:i + _chunk_size] for i in range(0, len(view), _chunk_size))
+    return [(*r.cells, r.url, r.active_codes, r.removed_codes)
+            for r in iter_page_rows(chunks, BACKENDS[_backend_name], _is_intensive, _stations_filter, _encoding)]
+# --- END OF parse_page_compact() --------------------------------------------------------------------------------------
+
+
+
+def expand_compact_rows(_rows: List[Tuple[Optional[str], ...]], _is_intensive: bool) -> List[Row]:
+    """
+    :param _rows:           Rows from parse_page_compact()
+    :param _is_intensive:   True for the intensive schedule pages
+    :return:                The rows, as the parser backends make them
+    """
+
+    n       = len(HEADERS)
+    codes   = lambda text: text.split(CODE_SEPARATOR) if text else []
+    return [SessionRecord(t[:n], t[n], codes(t[n + 1]), codes(t[n + 2]), _is_intensive) for t in _rows]
+# --- END OF expand_compact_rows() -------------------------------------------------------------------------------------
+
+
+
 class SessionNotFoundError(Exception):
     """Raised when a requested session URL does not exist (HTTP 404)."""
     pass
@@ -30,7 +148,7 @@ class SessionNotFoundError(Exception):
 
 
 class NoSessionsForYearError(Exception):
-    def __init__(self, year: int, scope: str, urls: list[str]):
+    def __init__(self, year: Union[int, str], scope: str, urls: list[str]):
         super().__init__(f"No sessions found for year {year} (scope: {scope}).")
         self.year = year
         self.scope = scope
@@ -40,7 +158,7 @@ class NoSessionsForYearError(Exception):
 
 
 class DataFetchFailedError(Exception):
-    def __init__(self, year: int, scope: str, errors: list[str]):
+    def __init__(self, year: Union[int, str], scope: str, errors: list[str]):
         super().__init__(f"Failed to fetch any data for year {year} (scope: {scope}).")
         self.year = year
         self.scope = scope
@@ -49,6 +167,133 @@ class DataFetchFailedError(Exception):
 
 
 
+class HostRateLimiter:
+    """
+        Spaces out the requests to each host, so a multi-year load with several workers doesn't hammer the server.
+    Thread safe; each caller reserves the next free slot for its host and sleeps until then.
+    """
+
+    def __init__(self, _per_second: float) -> None:
+        self.interval                   = 1.0 / _per_second if _per_second > 0 else 0.0
+        self.lock                       = threading.Lock()
+        self.next_slot: Dict[str, float] = {}
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def wait(self, _url: str) -> None:
+        """
+        Blocks until a request to the host of _url is allowed.
+
+        :param _url:    The URL about to be requested
+        :return:        None
+        """
+
+        if not self.interval:
+            return
+
+        host = urlsplit(_url).netloc
+        with self.lock:
+            now     = time.monotonic()
+            slot    = max(now, self.next_slot.get(host, 0.0))
+            self.next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+    # --- END OF wait() ------------------------------------------------------------------------------------------------
+# --- END OF class HostRateLimiter -------------------------------------------------------------------------------------
+
+
+
+class ProgressBoard:
+    """
+        Keeps one status line per URL while several downloads run at the same time.
+
+        On a terminal the whole block is redrawn in place (cursor up + clear line), so each URL keeps its own line.
+    When stdout is not a terminal only the final message of each URL is printed, to keep logs readable.
+    """
+
+    def __init__(self, _labels: List[str]) -> None:
+        self.labels                 = list(_labels)
+        self.lines: Dict[str, str]  = {label: "waiting…" for label in self.labels}
+        self.lock                   = threading.Lock()
+        self.drawn                  = False
+
+        # --- Redrawing in place only works while the whole board fits on the screen
+        self.is_tty                 = sys.stdout.isatty() and len(self.labels) < shutil.get_terminal_size().lines
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def status_cb(self, _label: str) -> Callable[[str], None]:
+        """
+        Returns a status callback bound to one label, suitable for ReadData._get_rows_with_progress()
+
+        :param _label:  The line to update
+        :return:        Callback taking the message to show
+        """
+
+        return lambda _msg: self.update(_label, _msg)
+    # --- END OF status_cb() -------------------------------------------------------------------------------------------
+
+
+
+    def update(self, _label: str, _msg: str) -> None:
+        """
+        Updates the line for _label and redraws the board.
+
+        :param _label:  Which line to update
+        :param _msg:    The new message
+        :return:        None
+        """
+
+        with self.lock:
+            self.lines[_label] = _msg
+            if self.is_tty:
+                self._redraw()
+    # --- END OF update() ----------------------------------------------------------------------------------------------
+
+
+
+    def finish(self, _label: str, _msg: str) -> None:
+        """
+        Sets the final message for _label. Without a terminal this is the only line printed for that URL.
+
+        :param _label:  Which line to finish
+        :param _msg:    The final message
+        :return:        None
+        """
+
+        with self.lock:
+            self.lines[_label] = _msg
+            if self.is_tty:
+                self._redraw()
+            else:
+                print(f"{_label}: {_msg}", flush=True)
+    # --- END OF finish() ----------------------------------------------------------------------------------------------
+
+
+
+    def _redraw(self) -> None:
+        """
+        Moves the cursor back to the top of the board and rewrites all lines. Caller must hold self.lock.
+
+        :return: None
+        """
+
+        width = max(len(label) for label in self.labels)
+        out = []
+        if self.drawn:
+            out.append(f"\x1b[{len(self.labels)}F")
+        for label in self.labels:
+            out.append(f"\x1b[2K{label:<{width}}  {self.lines[label]}\n")
+        print("".join(out), end="", flush=True)
+        self.drawn = True
+    # --- END OF _redraw() ---------------------------------------------------------------------------------------------
+# --- END OF class ProgressBoard ---------------------------------------------------------------------------------------
+
+
+
 class ReadData:
 
     """
@@ -61,17 +306,64 @@ class ReadData:
 
     def __init__(self,
                  _urls:     List[str],
-                 _year:     int,
+                 _year:     Union[int, str],
                  _scope:    str,
                  _feedback: bool = True,
-                 _stations_filter: Optional[str] = None
+                 _stations_filter: Optional[str] = None,
+                 _workers:  int = 4,
+                 _cache:    Optional[HttpCache] = None,
+                 _session:  Optional[requests.Session] = None,
+                 _snapshot: Optional[RowSnapshot] = None,
+                 _rate_limit: float = 5.0,
+                 _source:   Optional[LocalSource] = None,
+                 _save_source: Optional[SourceMirror] = None,
+                 _buffered: bool = True,
+                 _parser:   str = "auto",
+                 _parse_workers: int = 0
                  ) -> None:
 
         self.urls               = _urls
-        self.year               = _year
+        self.year               = _year     # only used in messages; a year range like '2010-2025' is fine too
         self.scope              = _scope
         self.feedback           = _feedback
         self.stations_filter    = _stations_filter
+
+        # --- Max number of URL's downloaded and parsed at the same time. 1 gives the old, sequential behaviour.
+        self.workers            = max(1, _workers)
+
+        # --- On-disk response cache. None means always download the full page.
+        self.cache              = _cache
+
+        # --- Parsed rows from earlier runs. Used when a page is unchanged, so it doesn't have to be parsed again.
+        self.snapshot           = _snapshot
+
+        # --- One pooled HTTP session for every request we make, also meant for code downloading session detail pages.
+        # --- Pass one in to share it, or to configure it (proxies, headers, adapters) differently.
+        self.session            = _session or make_http_session(self.workers)
+
+        # --- Max requests per second to any one host, 0 for no limit
+        self.rate_limiter       = HostRateLimiter(_rate_limit)
+
+        # --- Read the pages from disk (a directory or archive laid out like the site) instead of the network
+        self.source             = _source
+
+        # --- Copy every page we get (downloaded, cached or local) to this directory, in the layout self.source reads
+        self.save_source        = _save_source
+
+        # --- Read uncompressed bodies of known length into one preallocated buffer (see _iter_into_buffer()), instead
+        # --- of letting requests allocate a new bytes object for every chunk
+        self.buffered           = _buffered
+
+        # --- The HTML engine turning pages into rows (see parser_backends.py); all give the same rows
+        self.parser_backend: Type[ParserBackend] = select_backend(_parser)
+
+        # --- Worker processes parsing the pages of a multi-page load, so parsing isn't serialized by the GIL. 0 parses
+        # --- in the download threads. The pool only lives while _fetch_results() runs.
+        self.parse_workers      = max(0, _parse_workers)
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+
+        # --- Set while a concurrent fetch is running, so the download code knows not to print its own newlines.
+        self.board: Optional[ProgressBoard] = None
     # --- END OF __init__() method, or constructor if you like ---------------------------------------------------------
 
 
@@ -82,9 +374,12 @@ class ReadData:
         to the caller. The URL's to check, are in self.urls. This means the caller has the responsibility to setup
         the URL's.
 
-        Calls on BeautifulSoup to create the html object (to return)
+        Each page is parsed into rows while it downloads (see iter_rows())
+
+            With more than one URL and self.workers > 1, the URL's are downloaded and parsed concurrently on a thread
+        pool. Rows are still returned in the order of self.urls, and errors are aggregated the same way in both modes.
 
-        :return str:    List containing the downloaded data (BeautifulSoup html)
+        :return str:    List containing the downloaded and parsed rows
         """
 
         html: List[Row]             = []
@@ -92,15 +387,15 @@ class ReadData:
         not_found_count             = 0
         error_messages: list[str]   = []
 
-        for url in self.urls:
-            try:
-                html.extend(self._fetch_one_url(url))
-            except SessionNotFoundError as e:
+        for url, result in zip(self.urls, self._fetch_results()):
+            if isinstance(result, SessionNotFoundError):
                 not_found_count += 1
                 # Optional: logger.info("No data at %s (404): %s", url, e)
-            except requests.RequestException as e:
-                error_messages.append(f"{url}: {e.__class__.__name__}: {e}")
+            elif isinstance(result, requests.RequestException):
+                error_messages.append(f"{url}: {result.__class__.__name__}: {result}")
                 # Optional: logger.warning("Error fetching %s: %s", url, e)
+            else:
+                html.extend(result)
 
         total = len(self.urls)
         if html:
@@ -125,6 +420,112 @@ class ReadData:
 
 
 
+    def _fetch_results(self) -> List[object]:
+        """
+        Fetches every URL in self.urls, sequentially or on a thread pool depending on self.workers.
+
+        :return:    One entry per URL, in the order of self.urls. Either the parsed rows, or the SessionNotFoundError /
+                    requests.RequestException raised while fetching that URL.
+        """
+
+        if self.workers == 1 or len(self.urls) < 2:
+            return [self._fetch_one_result(url) for url in self.urls]
+
+        labels      = [self._label_for_url(url) for url in self.urls]
+        self.board  = ProgressBoard(labels) if self.feedback else None
+        if self.parse_workers:
+            self.parse_pool = self._make_parse_pool()
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(self.urls)),
+                                    thread_name_prefix="fetch") as pool:
+                return list(pool.map(self._fetch_one_result, self.urls))
+        finally:
+            self.board = None
+            if self.parse_pool:
+                self.parse_pool.shutdown(cancel_futures=True)
+                self.parse_pool = None
+    # --- END OF _fetch_results() --------------------------------------------------------------------------------------
+
+
+
+    def _make_parse_pool(self) -> ProcessPoolExecutor:
+        """
+        The process pool for parse_page_compact(). Started with forkserver where there is one: forking a process that
+        is running download threads (and later curses) is asking for trouble.
+
+        :return:    The pool
+        """
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        return ProcessPoolExecutor(max_workers=min(self.parse_workers, len(self.urls)), mp_context=context)
+    # --- END OF _make_parse_pool() ------------------------------------------------------------------------------------
+
+
+
+    def _fetch_one_result(self, _url: str) -> object:
+        """
+        Wraps _fetch_one_url(), returning the expected fetch errors instead of raising them, so one failing URL does
+        not cancel the others when running on the thread pool.
+
+        :param _url:    The URL to fetch
+        :return:        List of rows, or the exception raised
+        """
+
+        label = self._label_for_url(_url)
+        try:
+            rows = self._fetch_one_url(_url)
+        except SessionNotFoundError as e:
+            if self.board:
+                self.board.finish(label, "not found (404)")
+            return e
+        except requests.RequestException as e:
+            if self.board:
+                self.board.finish(label, f"failed: {e.__class__.__name__}")
+            return e
+
+        if self.board:
+            self.board.finish(label, f"done, {len(rows)} sessions")
+        return rows
+    # --- END OF _fetch_one_result() -----------------------------------------------------------------------------------
+
+
+
+    def _label_for_url(self, _url: str) -> str:
+        """
+        Short, human friendly name for a schedule URL, e.g. '2025 intensive' for .../sessions/intensive/2025/, so the
+        progress lines read per year.
+
+        :param _url:    The URL
+        :return:        The label
+        """
+
+        path = _url.rstrip("/").rsplit("/sessions/", 1)[-1]
+        if path.startswith("intensive/"):
+            return f"{path.split('/', 1)[1]} intensive"
+        return f"{path} master"
+    # --- END OF _label_for_url() --------------------------------------------------------------------------------------
+
+
+
+    def _status_cb_for(self, _url: str) -> Optional[Callable[[str], None]]:
+        """
+        Picks the progress callback for _url: a line on the progress board when fetching concurrently, the single
+        inline status line otherwise.
+
+        :param _url:    The URL being downloaded
+        :return:        The callback, or None if feedback is turned off
+        """
+
+        if not self.feedback:
+            return None
+        if self.board:
+            return self.board.status_cb(self._label_for_url(_url))
+        return self._status_inline
+    # --- END OF _status_cb_for() --------------------------------------------------------------------------------------
+
+
+
     def _fetch_one_url(self,
                        _url: str
                        ) -> List[Row]:
@@ -141,13 +542,16 @@ class ReadData:
         try:
             is_intensive = "/intensive/" in _url
 
-            html        = self._get_text_with_progress_retry(_url, _status_cb = self._status_inline)
-
-            parsed_html = IvsSessionParser(BeautifulSoup(html, "html.parser"),
-                                           len(HEADERS),
-                                           is_intensive,
-                                           self.stations_filter).parse()
+            # --- Offline: the page is on disk, no network involved
+            if self.source:
+                return self._get_rows_from_source(_url,
+                                                  _is_intensive = is_intensive,
+                                                  _status_cb    = self._status_cb_for(_url))
 
+            # --- Rows are parsed while the page is downloading, see _get_rows_with_progress()
+            parsed_html  = self._get_rows_with_progress_retry(_url,
+                                                              _is_intensive = is_intensive,
+                                                              _status_cb    = self._status_cb_for(_url))
 
             return parsed_html
 
@@ -169,7 +573,7 @@ class ReadData:
 
     def _status_inline(self, msg: str) -> None:
         """
-        URLHelper._status_inline() - Used as callback function in URLHelper._get_text_with_progress_retry(), which is
+        URLHelper._status_inline() - Used as callback function in URLHelper._get_rows_with_progress_retry(), which is
                                      called from URLHelper._fetch_one_url(). It prints the download progress to stdout.
 
         :param msg: The message to print to stdout
@@ -181,33 +585,52 @@ class ReadData:
 #
 #
 #
-    def _get_text_with_progress(self,
+    def _get_rows_with_progress(self,
                                 _url: str,
-                                *, _timeout=(5, 20),
+                                *, _is_intensive: bool,
+                                _timeout=(5, 20),
                                 _status_cb: Optional[Callable[[str], None]] = None,
                                 _chunk_size: int = 65536,
                                 _min_update_interval: float = 0.10
-                                ) -> str:
+                                ) -> List[Row]:
         """
-            Download text content from a URL with progress reporting.
+            Download a schedule page from a URL with progress reporting, parsing it while it downloads.
 
-            This method streams the response in chunks, periodically invoking a
-            callback with download status messages. Returns the entire response
-            body decoded as text.
+            This method streams the response in chunks, periodically invoking a callback with download status
+            messages. Each chunk is decoded and fed to the push parser right away (and written to the cache, if we
+            have one), so parsing overlaps the download and the page is never held in memory as a whole.
 
             :param _url:                    The URL to fetch.
+            :param _is_intensive:           True for the intensive schedule pages.
             :param _timeout:                (connect_timeout, read_timeout) in seconds.
             :param _status_cb:              Optional callback taking a str; called with progress updates.
             :param _chunk_size:             Number of bytes to read per chunk (default 64 KB).
             :param _min_update_interval:    Minimum seconds between status callbacks (default 0.1).
-            :return:                        The full response body as decoded text (usually HTML).
+            :return:                        The rows parsed from the page.
             :raises RuntimeError:           If the server responds with an HTTP error.
         """
 
-        UA = "Mozilla/5.0 (compatible; IVSBrowser/1.0)"
         cb = _status_cb or (lambda _msg: None)
+        headers: Dict[str, str] = {}
+
+        # --- With a cached copy, either use it right away (still fresh), or ask the server if it has changed
+        entry = self.cache.lookup(_url) if self.cache else None
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                cb(f"Using cached copy ({entry.size} bytes, {self.cache.age(entry):.0f}s old).")
+                self._end_status(_status_cb)
+                return self._rows_from_cache(entry, _is_intensive)
+            headers.update(self.cache.conditional_headers(entry))
+
+        self.rate_limiter.wait(_url)
+        with self.session.get(_url, stream=True, timeout=_timeout, headers=headers) as r:
+            # --- 304: our copy is still current, the server sent no body
+            if r.status_code == 304 and entry is not None:
+                self.cache.touch(entry)
+                cb(f"Not modified, using cached copy ({entry.size} bytes).")
+                self._end_status(_status_cb)
+                return self._rows_from_cache(entry, _is_intensive)
 
-        with requests.get(_url, stream=True, timeout=_timeout, headers={"User-Agent": UA}) as r:
             # --- Raise for 4xx/5xx; map 404 to domain-specific exception, preserve others.
             try:
                 r.raise_for_status()
@@ -223,50 +646,315 @@ class ReadData:
             except ValueError:
                 total = None
 
-            got = 0
-            chunks = []
-            last_emit = 0.0
+            # --- With compressed transfer, Content-Length (and our progress) counts bytes on the wire, while the chunks
+            # --- we get are already decoded.
+            compressed  = r.headers.get("Content-Encoding", "identity") != "identity"
+            got         = 0
+            last_emit   = 0.0
+
+            # --- Header charset, or utf-8. Sniffing the charset (apparent_encoding) would need the whole body first.
+            enc     = r.encoding or "utf-8"
+            digest  = hashlib.sha256()
+            writer  = self.cache.writer(_url, r.headers, enc) if self.cache else None
+            mirror  = self.save_source.writer(_url) if self.save_source else None
+
+            # --- The size is only known up front for an uncompressed body
+            if self.buffered and total and not compressed:
+                body = self._iter_into_buffer(r, total, _chunk_size)
+            else:
+                body = r.iter_content(chunk_size=_chunk_size)
+
+            def chunks() -> Iterator[bytes]:
+                """
+                The body chunks as they arrive, hashed, copied to the cache and reported on along the way.
+                """
+
+                nonlocal got, last_emit
+                for chunk in body:
+                    if not chunk:
+                        continue
+                    got += len(chunk)
+                    digest.update(chunk)
+                    if writer:
+                        writer.write(chunk)
+                    if mirror:
+                        mirror.write(chunk)
+
+                    now = time.monotonic()
+                    if now - last_emit >= _min_update_interval:
+                        cb(f"Downloading… {self._progress_text(r, got, total, compressed)}")
+                        last_emit = now
+
+                    yield chunk
+            # --- END OF chunks() --------------------------------------------------------------------------------------
 
-            for chunk in r.iter_content(chunk_size=_chunk_size):
-                if not chunk:
-                    continue
-                chunks.append(chunk)
-                got += len(chunk)
+            try:
+                rows = self._parse_chunks(chunks(), _is_intensive, enc)
+                if writer:
+                    writer.commit()
+                if mirror:
+                    mirror.commit()
+            finally:
+                if writer:
+                    writer.discard()
+                if mirror:
+                    mirror.discard()
 
-                now = time.monotonic()
-                if now - last_emit >= _min_update_interval:
-                    if total:
-                        cb(f"Downloading… {got}/{total} bytes ({got / total * 100:.1f}%)")
-                    else:
-                        cb(f"Downloading… {got} bytes")
-                    last_emit = now
-
-            if total:
-                cb(f"Download complete: {got}/{total} bytes.")
-                print()
-            else:
-                cb(f"Download complete: {got} bytes.")
-                print()
+            cb(f"Download complete: {self._progress_text(r, got, total, compressed)}.")
+
+            self._end_status(_status_cb)
+
+            if self.snapshot:
+                self.snapshot.save(_url, digest.hexdigest(), self.stations_filter, rows)
+            return rows
+    # --- END OF _get_rows_with_progress() -----------------------------------------------------------------------------
+
+
+
+    def _iter_into_buffer(self,
+                          _response:    requests.Response,
+                          _length:      int,
+                          _chunk_size:  int
+                          ) -> Iterator[memoryview]:
+        """
+            Reads the body into one bytearray, preallocated from Content-Length, with readinto() on memoryview slices
+        of it. Each piece read is handed on as a memoryview of the buffer, so hashing, caching, decoding and parsing
+        all work on the buffer itself: no per-chunk bytes objects, no joining, and no full-size str of the page.
+
+            Only for bodies sent without a Content-Encoding; with one, Content-Length is not the size of what we read.
+
+            Reading from raw bypasses the error mapping of iter_content(): urllib3's errors (a dropped connection, a
+        read timeout) are raised as requests.ConnectionError here, so the caller retries them. So is a body that ends
+        before Content-Length, which would otherwise be parsed, cached and snapshotted as if it were the whole page.
+
+        :param _response:   The streaming response
+        :param _length:     Content-Length
+        :param _chunk_size: Max bytes per read
+        :return:            Iterator over the pieces read, as views into the buffer
+        :raises requests.ConnectionError: If the connection fails or closes before _length bytes
+        """
 
-            # --- Pick a sensible encoding
-            enc = r.encoding or r.apparent_encoding or "utf-8"
+        buffer  = bytearray(_length)
+        view    = memoryview(buffer)
+        pos     = 0
+        while pos < _length:
             try:
-                return b"".join(chunks).decode(enc, errors="replace")
-            except LookupError:
-                # --- Unknown codec name – fall back to utf-8
-                return b"".join(chunks).decode("utf-8", errors="replace")
-    # --- END OF _get_text_with_progress() -----------------------------------------------------------------------------
+                n = _response.raw.readinto(view[pos:pos + _chunk_size])
+            except Urllib3Error as e:
+                raise requests.ConnectionError(e, response=_response) from e
+            if not n:
+                raise requests.ConnectionError(f"Connection closed after {pos} of {_length} bytes",
+                                               response=_response)
+            yield view[pos:pos + n]
+            pos += n
+    # --- END OF _iter_into_buffer() -----------------------------------------------------------------------------------
+
+
+
+    def rows_from_bytes(self,
+                        _data:          Union[bytes, bytearray, memoryview],
+                        _is_intensive:  bool,
+                        _encoding:      Optional[str] = "utf-8",
+                        _chunk_size:    int = 65536
+                        ) -> List[Row]:
+        """
+        Parses a page that is already in memory, as bytes. It is decoded and parsed a slice at a time, so no copy of
+        the whole page (bytes or str) is made.
+
+        :param _data:           The page body
+        :param _is_intensive:   True for the intensive schedule pages
+        :param _encoding:       Codec of the body
+        :param _chunk_size:     Bytes decoded at a time
+        :return:                The rows
+        """
+
+        view = memoryview(_data)
+        return list(self.iter_rows((view[i:i + _chunk_size] for i in range(0, len(view), _chunk_size)),
+                                   _is_intensive,
+                                   _encoding))
+    # --- END OF rows_from_bytes() -------------------------------------------------------------------------------------
+
+
+
+    def iter_rows(self,
+                  _chunks:          Iterable[bytes],
+                  _is_intensive:    bool,
+                  _encoding:        Optional[str] = "utf-8"
+                  ) -> Iterator[Row]:
+        """
+        iter_page_rows() with our parser backend and stations filter.
+
+        :param _chunks:         The page body, in chunks of bytes (or memoryviews)
+        :param _is_intensive:   True for the intensive schedule pages
+        :param _encoding:       Codec of the body. Unknown or missing codec names fall back to utf-8.
+        :return:                Iterator over the rows
+        """
+
+        return iter_page_rows(_chunks, self.parser_backend, _is_intensive, self.stations_filter, _encoding)
+    # --- END OF iter_rows() -------------------------------------------------------------------------------------------
+
+
+
+    def _parse_chunks(self,
+                      _chunks:          Iterable[bytes],
+                      _is_intensive:    bool,
+                      _encoding:        Optional[str] = "utf-8"
+                      ) -> List[Row]:
+        """
+            All the rows of one page. Without a parse pool the page is parsed while the chunks arrive (iter_rows()).
+        With one, the chunks are collected and the page is parsed in a worker process, leaving this thread free to
+        get on with the next download.
+
+        :param _chunks:         The page body, in chunks of bytes (or memoryviews)
+        :param _is_intensive:   True for the intensive schedule pages
+        :param _encoding:       Codec of the body
+        :return:                The rows
+        """
+
+        if self.parse_pool is None:
+            return list(self.iter_rows(_chunks, _is_intensive, _encoding))
+
+        body    = b"".join(_chunks)
+        future  = self.parse_pool.submit(parse_page_compact,
+                                         body,
+                                         self.parser_backend.name,
+                                         _is_intensive,
+                                         self.stations_filter,
+                                         _encoding)
+        return expand_compact_rows(future.result(), _is_intensive)
+    # --- END OF _parse_chunks() ---------------------------------------------------------------------------------------
+
+
+
+    def _rows_from_cache(self, _entry: CacheEntry, _is_intensive: bool) -> List[Row]:
+        """
+        Rows for a page we have a current copy of: straight from the row snapshot if it was made from the same page,
+        otherwise parsed from the cached body (streamed from disk) and snapshotted for next time.
+
+        :param _entry:          The cache entry
+        :param _is_intensive:   True for the intensive schedule pages
+        :return:                The rows
+        """
+
+        if self.save_source:
+            self.save_source.save(_entry.url, self.cache.iter_body(_entry))
+
+        digest = _entry.sha256 or content_digest(self.cache.iter_body(_entry))
+        if self.snapshot:
+            rows = self.snapshot.load(_entry.url, digest, self.stations_filter)
+            if rows is not None:
+                return rows
+
+        rows = self._parse_chunks(self.cache.iter_body(_entry), _is_intensive, _entry.encoding)
+        if self.snapshot:
+            self.snapshot.save(_entry.url, digest, self.stations_filter, rows)
+        return rows
+    # --- END OF _rows_from_cache() ------------------------------------------------------------------------------------
+
+
+
+    def _get_rows_from_source(self,
+                              _url:             str,
+                              *, _is_intensive: bool,
+                              _status_cb:       Optional[Callable[[str], None]] = None
+                              ) -> List[Row]:
+        """
+        Rows for _url from the local source (self.source). The page goes through the same streaming pipeline as a
+        download, so the rows are the same.
+
+        :param _url:                    The page URL; only its path is used to find the file
+        :param _is_intensive:           True for the intensive schedule pages
+        :param _status_cb:              Optional callback taking a str; called with a status message
+        :return:                        The rows parsed from the page
+        :raises SessionNotFoundError:   If the source has no page for _url, like a 404 from the server
+        """
+
+        cb = _status_cb or (lambda _msg: None)
+        try:
+            body = self.source.iter_body(_url)
+        except FileNotFoundError as e:
+            raise SessionNotFoundError(f"No data found at {e}") from e
+
+        got     = 0
+        mirror  = self.save_source.writer(_url) if self.save_source else None
+
+        def chunks() -> Iterator[bytes]:
+            """
+            The page chunks, counted and mirrored along the way.
+            """
+
+            nonlocal got
+            for chunk in body:
+                got += len(chunk)
+                if mirror:
+                    mirror.write(chunk)
+                yield chunk
+        # --- END OF chunks() ------------------------------------------------------------------------------------------
+
+        try:
+            rows = self._parse_chunks(chunks(), _is_intensive)
+            if mirror:
+                mirror.commit()
+        finally:
+            if mirror:
+                mirror.discard()
+
+        cb(f"Read {got} bytes from {self.source.path}.")
+        self._end_status(_status_cb)
+        return rows
+    # --- END OF _get_rows_from_source() -------------------------------------------------------------------------------
+
+
+
+    def _progress_text(self,
+                       _response:   requests.Response,
+                       _decoded:    int,
+                       _total:      Optional[int],
+                       _compressed: bool
+                       ) -> str:
+        """
+        Formats download progress. Uncompressed: 'got/total bytes (pct%)'. Compressed: wire bytes against
+        Content-Length, plus the number of decoded bytes so far.
+
+        :param _response:   The streaming response, asked for the number of bytes read off the wire
+        :param _decoded:    Decoded bytes received so far
+        :param _total:      Content-Length, if the server sent one
+        :param _compressed: True if the body is sent with a Content-Encoding
+        :return:            The progress text
+        """
+
+        wire = _response.raw.tell() if _compressed else _decoded
+        text = f"{wire}/{_total} bytes ({wire / _total * 100:.1f}%)" if _total else f"{wire} bytes"
+        if _compressed:
+            text += f", {_decoded} decoded"
+        return text
+    # --- END OF _progress_text() --------------------------------------------------------------------------------------
+
+
+
+    def _end_status(self, _status_cb: Optional[Callable[[str], None]]) -> None:
+        """
+        The inline status line is overwritten with '\r', so it needs a newline once a download is done. The progress
+        board handles its own lines.
+
+        :param _status_cb:  The callback used for the download
+        :return:            None
+        """
+
+        if _status_cb and not self.board:
+            print()
+    # --- END OF _end_status() -----------------------------------------------------------------------------------------
 
 
 
-    def _get_text_with_progress_retry(self,
+    def _get_rows_with_progress_retry(self,
                                       _url: str,
                                       *,
                                       _retries: int = 2,
                                       _backoff: float = 0.5,
                                       _status_cb: Optional[Callable[[str],None]] = None,
                                       **_kwargs,
-                                      ) -> str:
+                                      ) -> List[Row]:
         """
 
         :param _url:
@@ -280,7 +968,7 @@ class ReadData:
         cb = _status_cb or (lambda _msg: None)
         for attempt in range(_retries + 1):
             try:
-                return self._get_text_with_progress(_url, _status_cb=cb, **_kwargs)
+                return self._get_rows_with_progress(_url, _status_cb=_status_cb, **_kwargs)
             except SessionNotFoundError:
                 # --- Don't retry a missing resource.
                 raise
@@ -300,5 +988,5 @@ class ReadData:
                     _backoff *= 2
                     continue
                 raise
-    # --- END OF _get_text_with_progress_retry() -----------------------------------------------------------------------
+    # --- END OF _get_rows_with_progress_retry() -----------------------------------------------------------------------
 # --- END OF class ReadData --------------------------------------------------------------------------------------------
\ No newline at end of file
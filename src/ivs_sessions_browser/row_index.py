@@ -0,0 +1,239 @@
+"""
+Filename:       row_index.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Bitmap index over a SessionTable, built once after a fetch. Every station code (active, removed, either)
+                and every distinct value of the categorical columns (type, ops center, correlator, status) maps to a
+                bitset of the rows that have it, bit i standing for row i. Bitsets are plain Python ints, so '&' and
+                '|' in a filter become integer '&' and '|' over all rows at once.
+
+                Substring searches of free text and of the other columns go through a TrigramIndex per column
+                (trigram_index.py), made the first time the column is searched.
+
+Notes:          Station codes are matched exactly, by the station numbers of the table (session_table.py), and the
+                categorical columns are read as the table's value numbers, so building the index touches no text.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+from typing import Dict, Iterable, List
+
+# --- Project defined
+from .defs                  import FIELD_INDEX, HEADERS
+from .session_table         import SessionTable
+from .trigram_index         import TrigramIndex
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Columns with few distinct values, indexed by value
+CATEGORICAL_FIELDS  = ("type", "ops center", "corr", "status")
+
+
+
+def bitset(_positions: Iterable[int], _size: int) -> int:
+    """
+    Makes a bitset from row numbers in one go, through a bytearray. OR-ing the bits into an int one at a time would
+    copy the whole int for every row.
+
+    :param _positions:  Row numbers, in any order
+    :param _size:       Number of rows
+    :return:            The bitset
+    """
+
+    bits = bytearray((_size + 7) >> 3)
+    for i in _positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+# --- END OF bitset() --------------------------------------------------------------------------------------------------
+
+
+
+def rows_of(_bits: int) -> List[int]:
+    """
+    :param _bits:   A bitset
+    :return:        The numbers of the rows whose bits are set, in order
+    """
+
+    # --- The binary string, lowest bit first; find() skips over runs of zeroes in C
+    text    = bin(_bits)[:1:-1]
+    picked  = []
+    i       = text.find("1")
+    while i >= 0:
+        picked.append(i)
+        i = text.find("1", i + 1)
+    return picked
+# --- END OF rows_of() -------------------------------------------------------------------------------------------------
+
+
+
+class RowIndex:
+    """
+    The index of one table. It refers to the rows by number, so it is only valid for that exact table.
+    """
+
+    def __init__(self, _table: SessionTable) -> None:
+        self.table      = _table
+        self.all_bits   = (1 << len(_table)) - 1
+
+        # --- Station code -> rows, for each side of the stations column: 'active', 'removed' and 'all' (either)
+        self.stations: Dict[str, Dict[str, int]] = {}
+
+        # --- Column index -> distinct value -> rows
+        self.values: Dict[int, Dict[str, int]] = {}
+
+        # --- Column index -> substring index, made on first use
+        self._trigrams: Dict[int, TrigramIndex] = {}
+
+        self._build()
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def _build(self) -> None:
+        """
+        Collects the row numbers of every key first, and turns each list into a bitset once.
+
+        :return: None
+        """
+
+        table       = self.table
+        size        = len(table)
+        names       = table.stations.values
+
+        for side, ids, pos in (("active", table.active_ids, table.active_pos),
+                               ("removed", table.removed_ids, table.removed_pos)):
+            positions: List[List[int]] = [[] for _ in names]
+            for i in range(size):
+                for station in ids[pos[i]:pos[i + 1]]:
+                    positions[station].append(i)
+            self.stations[side] = {names[n]: bitset(rows, size) for n, rows in enumerate(positions) if rows}
+
+        # --- Either side: OR of the two, a few machine words per code
+        active, removed     = self.stations["active"], self.stations["removed"]
+        self.stations["all"] = {code: active.get(code, 0) | removed.get(code, 0) for code in {*active, *removed}}
+
+        for idx in sorted({FIELD_INDEX[name] for name in CATEGORICAL_FIELDS}):
+            dictionary, numbers = table.categorical[idx]
+            positions           = [[] for _ in dictionary.values]
+            for i, n in enumerate(numbers):
+                positions[n].append(i)
+            self.values[idx] = {dictionary.values[n]: bitset(rows, size) for n, rows in enumerate(positions)}
+    # --- END OF _build() ----------------------------------------------------------------------------------------------
+
+
+
+    def is_for(self, _table: SessionTable) -> bool:
+        """
+        :param _table:  A table
+        :return:        True if this index was built for that very table
+        """
+
+        return _table is self.table and len(_table) == self.all_bits.bit_length()
+    # --- END OF is_for() ----------------------------------------------------------------------------------------------
+
+
+
+    def has_field(self, _idx: int) -> bool:
+        return _idx in self.values
+    # --- END OF has_field() -------------------------------------------------------------------------------------------
+
+
+
+    def station_bits(self, _groups: Iterable[Iterable[str]], _side: str = "active") -> int:
+        """
+        Rows matching a stations expression, as the groups of a filter_query.StationsClause: any group (OR) with
+        all of its codes (AND).
+
+        :param _groups: The groups of station codes
+        :param _side:   'active', 'removed' or 'all'
+        :return:        The bitset
+        """
+
+        codes   = self.stations[_side]
+        result  = 0
+        for and_tokens in _groups:
+            bits = self.all_bits
+            for token in and_tokens:
+                bits &= codes.get(token, 0)
+                if not bits:
+                    break
+            result |= bits
+        return result
+    # --- END OF station_bits() ----------------------------------------------------------------------------------------
+
+
+
+    def field_bits(self, _idx: int, _tokens: List[str]) -> int:
+        """
+        Rows whose column _idx contains any of the tokens, case-insensitive: the same test as the row predicate, but
+        run once per distinct value instead of once per row.
+
+        :param _idx:    Column index, one of CATEGORICAL_FIELDS
+        :param _tokens: Lower case tokens
+        :return:        The bitset
+        """
+
+        result = 0
+        for value, bits in self.values[_idx].items():
+            low = value.lower()
+            if any(token in low for token in _tokens):
+                result |= bits
+        return result
+    # --- END OF field_bits() ------------------------------------------------------------------------------------------
+
+
+
+    def trigrams(self, _idx: int) -> TrigramIndex:
+        """
+        :param _idx:    Column index
+        :return:        The substring index of the column, made now if this is the first search on it
+        """
+
+        trigrams = self._trigrams.get(_idx)
+        if trigrams is None:
+            trigrams = self._trigrams[_idx] = TrigramIndex(self.table.column_text(_idx))
+        return trigrams
+    # --- END OF trigrams() --------------------------------------------------------------------------------------------
+
+
+
+    def text_bits(self, _idx: int, _tokens: Iterable[str]) -> int:
+        """
+        :param _idx:    Column index
+        :param _tokens: Lower case tokens
+        :return:        Bitset of the rows whose column _idx contains any of the tokens
+        """
+
+        return bitset(self.trigrams(_idx).matching_rows(_tokens), len(self.table))
+    # --- END OF text_bits() -------------------------------------------------------------------------------------------
+
+
+
+    def any_text_bits(self, _needle: str) -> int:
+        """
+        :param _needle: Lower case text
+        :return:        Bitset of the rows with the text in any column (free text)
+        """
+
+        bits = 0
+        for idx in range(len(HEADERS)):
+            bits |= self.text_bits(idx, (_needle,))
+            if bits == self.all_bits:
+                break
+        return bits
+    # --- END OF any_text_bits() ---------------------------------------------------------------------------------------
+
+
+
+    def rows_for(self, _bits: int) -> List[int]:
+        """
+        :param _bits:   A bitset
+        :return:        The numbers of the rows whose bits are set, in order
+        """
+
+        if _bits == self.all_bits:
+            return list(range(len(self.table)))
+        return rows_of(_bits)
+    # --- END OF rows_for() --------------------------------------------------------------------------------------------
+# --- END OF class RowIndex --------------------------------------------------------------------------------------------
@@ -0,0 +1,145 @@
+"""
+Filename:       row_snapshot.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Keeps the parsed rows of each schedule page on disk, so a warm start with an unchanged page can skip
+                BeautifulSoup and IvsSessionParser altogether.
+
+Notes:          One JSON-lines file per URL. The first line is a header with what the rows were made from (format
+                version, URL, sha256 of the page body, parser version and stations filter); each following line is
+                one row as [values, session_url, meta]. Any mismatch in the header is a miss, and the page is parsed
+                again.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import os
+import json
+import hashlib
+import threading
+
+from typing import List, Optional, Iterable
+
+# --- Project defined
+from .defs                  import Row
+from .http_cache            import default_cache_dir
+from .ivs_session_parser    import PARSER_VERSION
+from .session_record        import SessionRecord
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Layout of the rows; 2 added the station codes of each side to meta
+SNAPSHOT_FORMAT = 2
+
+
+
+def content_digest(_chunks: Iterable[bytes]) -> str:
+    """
+    :param _chunks: Page body, as received (bytes, before decoding), in one or more chunks
+    :return:        sha256 hex digest of the body, used to tell whether a page has changed since it was parsed
+    """
+
+    digest = hashlib.sha256()
+    for chunk in _chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+# --- END OF content_digest() ------------------------------------------------------------------------------------------
+
+
+
+class RowSnapshot:
+    """
+    Snapshot store for parsed rows, keyed by URL, content digest and parser version.
+    """
+
+    def __init__(self, _cache_dir: Optional[str] = None) -> None:
+        self.snapshot_dir = os.path.join(_cache_dir or default_cache_dir(), "rows")
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def load(self,
+             _url:              str,
+             _digest:           str,
+             _stations_filter:  Optional[str] = None
+             ) -> Optional[List[Row]]:
+        """
+        Loads the rows parsed from _url, if they were parsed from the same page body, with the same parser version
+        and stations filter.
+
+        :param _url:                The page URL
+        :param _digest:             content_digest() of the page body we have now
+        :param _stations_filter:    The stations filter the rows must have been parsed with
+        :return:                    The rows, or None on a miss
+        """
+
+        try:
+            with open(self._path(_url), "r", encoding="utf-8") as f:
+                if json.loads(f.readline()) != self._header(_url, _digest, _stations_filter):
+                    return None
+                return [SessionRecord.from_row(values, url, meta) for values, url, meta in map(json.loads, f)]
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+    # --- END OF load() ------------------------------------------------------------------------------------------------
+
+
+
+    def save(self,
+             _url:              str,
+             _digest:           str,
+             _stations_filter:  Optional[str],
+             _rows:             List[Row]
+             ) -> None:
+        """
+        Writes the snapshot for _url, replacing any older one. Failing to write is not an error.
+
+        :param _url:                The page URL
+        :param _digest:             content_digest() of the page body the rows were parsed from
+        :param _stations_filter:    The stations filter used when parsing
+        :param _rows:               The parsed rows
+        :return:                    None
+        """
+
+        path    = self._path(_url)
+        tmp     = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self._header(_url, _digest, _stations_filter)) + "\n")
+                for r in _rows:
+                    f.write(json.dumps([r.cells, r.url, r.meta], separators=(",", ":")) + "\n")
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    # --- END OF save() ------------------------------------------------------------------------------------------------
+
+
+
+    def _header(self, _url: str, _digest: str, _stations_filter: Optional[str]) -> dict:
+        """
+        :return:    The header line identifying what a snapshot was made from
+        """
+
+        return {"format":   SNAPSHOT_FORMAT,
+                "url":      _url,
+                "sha256":   _digest,
+                "parser":   PARSER_VERSION,
+                "stations": _stations_filter or ""}
+    # --- END OF _header() ---------------------------------------------------------------------------------------------
+
+
+
+    def _path(self, _url: str) -> str:
+        """
+        :param _url:    The page URL
+        :return:        Path of the snapshot file for _url
+        """
+
+        key = hashlib.sha1(_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.snapshot_dir, f"{key}.jsonl")
+    # --- END OF _path() -----------------------------------------------------------------------------------------------
+# --- END OF class RowSnapshot -----------------------------------------------------------------------------------------
@@ -0,0 +1,408 @@
+"""
+Filename:       session_details.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    The detail page behind each session (the session_url of a row): parsing it into a SessionDetails, and
+                DetailFetcher, which downloads them on worker threads for the TUI's detail pane, keeps the parsed
+                results in a size-bounded LRU, and prefetches the neighbours of the selected row.
+
+Notes:          The parser does not depend on the exact layout of the page. It picks up label/value pairs from
+                <th>/<td> rows and <dt>/<dd> lists, stations from table rows starting with a two-character station
+                code (or station <li>'s with a title), and file links from any <a> pointing at a file.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import re
+import time
+import threading
+import requests
+
+from collections        import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses        import dataclass, field
+from html.parser        import HTMLParser
+from typing             import Dict, List, Optional, Set, Tuple, Union
+from urllib.parse       import urljoin, urlsplit
+
+# --- Project defined
+from .local_source      import LocalSource, SourceMirror
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Labels of the fields shown as dates in the detail pane
+DATE_LABEL_WORDS    = ("date", "start", "schedul", "correlated", "correlation", "release", "submit", "processed",
+                       "updated")
+
+# --- Links to pages rather than files
+PAGE_EXTENSIONS     = {"", "html", "htm", "shtml", "php", "asp", "aspx", "jsp"}
+
+STATION_CODE        = re.compile(r"^[A-Z][A-Za-z0-9]$")
+
+
+
+@dataclass
+class SessionDetails:
+    """
+    What the detail pane shows for one session.
+    """
+
+    url:        str
+    title:      str                     = ""
+    fields:     List[Tuple[str, str]]   = field(default_factory=list)   # (label, value), in page order
+    stations:   List[Tuple[str, str]]   = field(default_factory=list)   # (code, name)
+    files:      List[Tuple[str, str]]   = field(default_factory=list)   # (name, absolute URL)
+
+    @property
+    def dates(self) -> List[Tuple[str, str]]:
+        """
+        :return:    The fields that are dates: start, schedule, correlation, release, ...
+        """
+
+        return [(label, value) for label, value in self.fields
+                if any(word in label.lower() for word in DATE_LABEL_WORDS)]
+    # --- END OF dates() -----------------------------------------------------------------------------------------------
+# --- END OF class SessionDetails --------------------------------------------------------------------------------------
+
+
+
+class SessionPageParser(HTMLParser):
+    """
+    Collects SessionDetails from a session page. Feed it the page, call close(), and read self.details.
+    """
+
+    # --- Elements whose text we collect
+    CAPTURED = {"th", "td", "dt", "dd", "a", "li", "h1", "h2"}
+
+    def __init__(self, _url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.details                                = SessionDetails(_url)
+
+        # --- Open elements we collect text for, innermost last: (tag, attributes, text pieces)
+        self.open: List[Tuple[str, Dict[str, str], List[str]]] = []
+
+        # --- Cells of the current table row: (tag, text)
+        self.cells: List[Tuple[str, str]]           = []
+        self.dt_label: Optional[str]                = None
+        self.seen_files: Set[str]                   = set()
+        self.seen_stations: Set[str]                = set()
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def handle_starttag(self, _tag: str, _attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if _tag == "tr":
+            self._end_row()
+        elif _tag in self.CAPTURED:
+            self.open.append((_tag, {k: v or "" for k, v in _attrs}, []))
+    # --- END OF handle_starttag() -------------------------------------------------------------------------------------
+
+
+
+    def handle_endtag(self, _tag: str) -> None:
+        if _tag in ("tr", "table"):
+            self._end_row()
+            return
+        if _tag not in self.CAPTURED:
+            return
+
+        # --- Close the innermost open element with this tag (and anything left open inside it)
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i][0] == _tag:
+                tag, attrs, pieces = self.open[i]
+                del self.open[i:]
+                self._end_element(tag, attrs, " ".join("".join(pieces).split()))
+                return
+    # --- END OF handle_endtag() ---------------------------------------------------------------------------------------
+
+
+
+    def handle_data(self, _data: str) -> None:
+        for _, _, pieces in self.open:
+            pieces.append(_data)
+    # --- END OF handle_data() -----------------------------------------------------------------------------------------
+
+
+
+    def close(self) -> None:
+        super().close()
+        self._end_row()
+    # --- END OF close() -----------------------------------------------------------------------------------------------
+
+
+
+    def _end_element(self, _tag: str, _attrs: Dict[str, str], _text: str) -> None:
+        """
+        Files away a finished element.
+
+        :param _tag:    The element
+        :param _attrs:  Its attributes
+        :param _text:   Its text, whitespace normalized
+        :return:        None
+        """
+
+        details = self.details
+        match _tag:
+            case "th" | "td":
+                self.cells.append((_tag, _text))
+            case "dt":
+                self.dt_label = _text.rstrip(":")
+            case "dd" if self.dt_label:
+                details.fields.append((self.dt_label, _text))
+                self.dt_label = None
+            case "a":
+                self._add_file(_attrs.get("href", ""), _text)
+            case "li" if "station-id" in _attrs.get("class", "").split():
+                self._add_station(_text, _attrs.get("title", ""))
+            case "h1" | "h2" if not details.title:
+                details.title = _text
+            case _:
+                pass
+    # --- END OF _end_element() ----------------------------------------------------------------------------------------
+
+
+
+    def _end_row(self) -> None:
+        """
+        A finished table row is either a label/value pair (<th> then <td>, or 'Label:' then value), or a station
+        (code, then name).
+
+        :return: None
+        """
+
+        cells, self.cells = [c for c in self.cells if c[1]], []
+        if len(cells) < 2:
+            return
+
+        (first_tag, first), (_, second) = cells[0], cells[1]
+        if STATION_CODE.match(first):
+            self._add_station(first, second)
+        elif len(cells) == 2 and (first_tag == "th" or first.endswith(":")):
+            self.details.fields.append((first.rstrip(":"), second))
+    # --- END OF _end_row() --------------------------------------------------------------------------------------------
+
+
+
+    def _add_station(self, _code: str, _name: str) -> None:
+        if _code and _code not in self.seen_stations:
+            self.seen_stations.add(_code)
+            self.details.stations.append((_code, _name))
+    # --- END OF _add_station() ----------------------------------------------------------------------------------------
+
+
+
+    def _add_file(self, _href: str, _text: str) -> None:
+        """
+        Keeps links to files (anything with an extension that isn't a web page), as absolute URLs.
+
+        :return: None
+        """
+
+        if not _href or _href.startswith(("#", "mailto:", "javascript:")):
+            return
+        url     = urljoin(self.details.url, _href)
+        name    = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        ext     = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+        if ext in PAGE_EXTENSIONS or url in self.seen_files:
+            return
+        self.seen_files.add(url)
+        self.details.files.append((name or _text, url))
+    # --- END OF _add_file() -------------------------------------------------------------------------------------------
+# --- END OF class SessionPageParser -----------------------------------------------------------------------------------
+
+
+
+def parse_session_page(_text: str, _url: str) -> SessionDetails:
+    """
+    :param _text:   The session page
+    :param _url:    Where it came from; relative links are resolved against it
+    :return:        The details found on the page
+    """
+
+    parser = SessionPageParser(_url)
+    parser.feed(_text)
+    parser.close()
+    return parser.details
+# --- END OF parse_session_page() --------------------------------------------------------------------------------------
+
+
+
+class DetailFetcher:
+    """
+        Fetches and parses session pages on a few worker threads, keeping the details in an LRU of at most
+    _max_entries pages. A failed fetch is not cached with them: its exception is kept for _retry_after seconds, to be
+    shown, and the page is fetched again when asked for after that.
+
+        get() never blocks: it returns what is there, and request() queues a fetch. The TUI asks poll_updates() whether
+    anything finished since it last drew the screen.
+    """
+
+    def __init__(self,
+                 _session:      requests.Session,
+                 _rate_limiter  = None,
+                 _max_entries:  int = 64,
+                 _workers:      int = 2,
+                 _timeout       = (5, 20),
+                 _retry_after:  float = 10.0,
+                 _source:       Optional[LocalSource] = None,
+                 _save_source:  Optional[SourceMirror] = None
+                 ) -> None:
+
+        self.session        = _session
+        self.rate_limiter   = _rate_limiter     # a read_data.HostRateLimiter, shared with the schedule downloads
+        self.max_entries    = max(1, _max_entries)
+        self.workers        = max(1, _workers)
+        self.timeout        = _timeout
+        self.retry_after    = _retry_after
+        self.source         = _source
+        self.save_source    = _save_source
+
+        self.lock           = threading.Lock()
+        self.cache: "OrderedDict[str, SessionDetails]" = OrderedDict()
+
+        # --- URL -> (time.monotonic() it failed at, exception), oldest first, at most _max_entries
+        self.failures: Dict[str, Tuple[float, Exception]] = {}
+        self.pending: Set[str]  = set()
+        self.updated: bool      = False
+        self.pool               = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="details")
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def get(self, _url: str) -> Union[SessionDetails, Exception, None]:
+        """
+        :param _url:    Session page URL
+        :return:        The details, the exception raised fetching them, or None if not fetched (yet)
+        """
+
+        with self.lock:
+            result = self.cache.get(_url)
+            if result is not None:
+                self.cache.move_to_end(_url)
+                return result
+            failure = self.failures.get(_url)
+            return failure[1] if failure else None
+    # --- END OF get() -------------------------------------------------------------------------------------------------
+
+
+
+    def is_pending(self, _url: str) -> bool:
+        with self.lock:
+            return _url in self.pending
+    # --- END OF is_pending() ------------------------------------------------------------------------------------------
+
+
+
+    def request(self, _url: Optional[str], _prefetch: bool = False) -> None:
+        """
+        Queues a fetch of _url, unless it is cached, already on its way, or failed less than retry_after seconds ago.
+        Prefetches are dropped while the workers are busy, so scrolling fast doesn't pile up a queue of pages nobody
+        looks at.
+
+        :param _url:        Session page URL (None is ignored, rows without a link have none)
+        :param _prefetch:   True for speculative fetches
+        :return:            None
+        """
+
+        if not _url:
+            return
+        with self.lock:
+            if _url in self.cache or _url in self.pending:
+                return
+            failure = self.failures.get(_url)
+            if failure and time.monotonic() - failure[0] < self.retry_after:
+                return
+            if _prefetch and len(self.pending) >= self.workers:
+                return
+            self.pending.add(_url)
+        self.pool.submit(self._fetch, _url)
+    # --- END OF request() ---------------------------------------------------------------------------------------------
+
+
+
+    def poll_updates(self) -> bool:
+        """
+        :return:    True if a fetch finished since the last call
+        """
+
+        with self.lock:
+            updated, self.updated = self.updated, False
+            return updated
+    # --- END OF poll_updates() ----------------------------------------------------------------------------------------
+
+
+
+    def shutdown(self) -> None:
+        """
+        Drops queued fetches. Fetches in progress finish in the background.
+
+        :return: None
+        """
+
+        self.pool.shutdown(wait=False, cancel_futures=True)
+    # --- END OF shutdown() --------------------------------------------------------------------------------------------
+
+
+
+    def _fetch(self, _url: str) -> None:
+        """
+        Worker: fetch and parse one page, and file the result.
+
+        :param _url:    Session page URL
+        :return:        None
+        """
+
+        try:
+            result: Union[SessionDetails, Exception] = self._load(_url)
+        except Exception as e:
+            result = e
+
+        with self.lock:
+            self.failures.pop(_url, None)
+            if isinstance(result, Exception):
+                self.failures[_url] = (time.monotonic(), result)
+                while len(self.failures) > self.max_entries:
+                    del self.failures[next(iter(self.failures))]
+            else:
+                self.cache[_url] = result
+                self.cache.move_to_end(_url)
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+            self.pending.discard(_url)
+            self.updated = True
+    # --- END OF _fetch() ----------------------------------------------------------------------------------------------
+
+
+
+    def _load(self, _url: str) -> SessionDetails:
+        """
+        Gets the page, from the local source if we have one, otherwise from the server. Session pages are small, so
+        unlike the schedule pages they are read whole.
+
+        :param _url:    Session page URL
+        :return:        The parsed details
+        """
+
+        if self.source:
+            body        = b"".join(self.source.iter_body(_url))
+            encoding    = "utf-8"
+        else:
+            if self.rate_limiter:
+                self.rate_limiter.wait(_url)
+            r = self.session.get(_url, timeout=self.timeout)
+            r.raise_for_status()
+            body        = r.content
+            # --- The header's charset, else utf-8: requests' r.encoding is ISO-8859-1 for any text/html without one
+            encoding    = r.encoding if "charset" in r.headers.get("content-type", "").lower() else "utf-8"
+
+        if self.save_source:
+            self.save_source.save(_url, [body])
+
+        try:
+            text = body.decode(encoding, errors="replace")
+        except LookupError:
+            text = body.decode("utf-8", errors="replace")
+        return parse_session_page(text, _url)
+    # --- END OF _load() -----------------------------------------------------------------------------------------------
+# --- END OF class DetailFetcher ---------------------------------------------------------------------------------------
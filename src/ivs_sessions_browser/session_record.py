@@ -0,0 +1,220 @@
+"""
+Filename:       session_record.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    SessionRecord, the compact form of a parsed row. A multi-year load holds tens of thousands of them, and
+                most of their text repeats: type, status, ops center, correlator, duration, station lists. So:
+
+                    - the cells are one tuple, with every repeating value interned (one str shared by all rows)
+                    - the meta dict is three slots: the station codes of each side as the parser found them, kept
+                      as one interned str with CODE_SEPARATOR between the codes (shared by all rows with the same
+                      stations, and split again exactly whatever the length of a code), and intensive
+                    - the session URL is stored around the session code, as the (shared) part before it and the part
+                      after it, and put together again when asked for
+
+Notes:          A record still unpacks and indexes like the (values, session_url, meta) tuple defs.Row describes, so
+                code written for tuples keeps working: values, url, meta = record, record[0][i], record[2]['active'].
+                Code on hot paths reads the slots directly instead (record.cells, .url, .active, ...), since the
+                tuple protocol builds the meta dict on every access.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import sys
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# --- Project defined
+from .defs import FIELD_INDEX
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Columns that are unique per session, so not worth interning: the rest repeat across rows
+UNIQUE_COLUMNS = {FIELD_INDEX["code"], FIELD_INDEX["start"]}
+
+# --- Between the station codes of one side (ASCII unit separator, not something a cell's text holds)
+CODE_SEPARATOR = "\x1f"
+
+
+class SessionRecord:
+    """
+    One session, one row of the table.
+    """
+
+    __slots__ = ("cells", "url_prefix", "url_suffix", "active_codes", "removed_codes", "intensive")
+
+    def __init__(self,
+                 _cells:        Sequence[str],
+                 _url:          Optional[str],
+                 _active_ids:   Iterable[str],
+                 _removed_ids:  Iterable[str],
+                 _intensive:    bool
+                 ) -> None:
+        """
+        :param _cells:          The text of each column
+        :param _url:            The session page URL, or None
+        :param _active_ids:     Active station codes, in page order
+        :param _removed_ids:    Removed station codes, in page order
+        :param _intensive:      True for a session of the intensive schedule
+        """
+
+        intern              = sys.intern
+        self.cells: Tuple[str, ...] = tuple(cell if i in UNIQUE_COLUMNS else intern(cell)
+                                            for i, cell in enumerate(_cells))
+        self.active_codes   = intern(CODE_SEPARATOR.join(_active_ids))
+        self.removed_codes  = intern(CODE_SEPARATOR.join(_removed_ids))
+        self.intensive      = bool(_intensive)
+
+        # --- Session URLs end in the lower case code: https://.../sessions/2025/r41200/. Keep the shared prefix and
+        # --- suffix around it; a URL without the code in it is kept whole as the prefix, with suffix None.
+        self.url_prefix: Optional[str] = None
+        self.url_suffix: Optional[str] = None
+        if _url is not None:
+            code    = self.cells[FIELD_INDEX["code"]].lower()
+            pos     = _url.rfind(code) if code else -1
+            if pos >= 0:
+                self.url_prefix = intern(_url[:pos])
+                self.url_suffix = intern(_url[pos + len(code):])
+            else:
+                self.url_prefix = _url
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    @classmethod
+    def from_row(cls, _values: Sequence[str], _url: Optional[str], _meta: Dict[str, Any]) -> "SessionRecord":
+        """
+        :return:    The record for a (values, session_url, meta) row, e.g. one read back from a snapshot
+        """
+
+        return cls(_values, _url, _meta["active_ids"], _meta["removed_ids"], _meta.get("intensive", False))
+    # --- END OF from_row() --------------------------------------------------------------------------------------------
+
+
+
+    @property
+    def url(self) -> Optional[str]:
+        """
+        :return:    The session page URL, or None if the row has no link
+        """
+
+        if self.url_suffix is None:
+            return self.url_prefix
+        return f"{self.url_prefix}{self.cells[FIELD_INDEX['code']].lower()}{self.url_suffix}"
+    # --- END OF url() -------------------------------------------------------------------------------------------------
+
+
+
+    @property
+    def active_ids(self) -> List[str]:
+        """
+        :return:    The active station codes, in page order
+        """
+
+        return self.active_codes.split(CODE_SEPARATOR) if self.active_codes else []
+    # --- END OF active_ids() ------------------------------------------------------------------------------------------
+
+
+
+    @property
+    def removed_ids(self) -> List[str]:
+        """
+        :return:    The removed station codes, in page order
+        """
+
+        return self.removed_codes.split(CODE_SEPARATOR) if self.removed_codes else []
+    # --- END OF removed_ids() -----------------------------------------------------------------------------------------
+
+
+
+    @property
+    def active(self) -> str:
+        """
+        :return:    The active station codes, joined without a separator as the stations column shows them
+        """
+
+        return self.active_codes.replace(CODE_SEPARATOR, "")
+    # --- END OF active() ----------------------------------------------------------------------------------------------
+
+
+
+    @property
+    def removed(self) -> str:
+        """
+        :return:    The removed station codes, joined
+        """
+
+        return self.removed_codes.replace(CODE_SEPARATOR, "")
+    # --- END OF removed() ---------------------------------------------------------------------------------------------
+
+
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """
+        :return:    The slots as the meta dict of a Row (a new dict every time)
+        """
+
+        return {"active":       self.active,
+                "removed":      self.removed,
+                "active_ids":   self.active_ids,
+                "removed_ids":  self.removed_ids,
+                "intensive":    self.intensive}
+    # --- END OF meta() ------------------------------------------------------------------------------------------------
+
+
+
+    def with_cell(self, _idx: int, _value: str) -> "SessionRecord":
+        """
+        :param _idx:    Column index
+        :param _value:  The new text for that column
+        :return:        A copy of this record with one cell replaced
+        """
+
+        other = SessionRecord.__new__(SessionRecord)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.cells = self.cells[:_idx] + (_value,) + self.cells[_idx + 1:]
+        return other
+    # --- END OF with_cell() -------------------------------------------------------------------------------------------
+
+
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self.cells, self.url, self.meta))
+    # --- END OF __iter__() --------------------------------------------------------------------------------------------
+
+
+
+    def __getitem__(self, _i: int) -> Any:
+        match _i:
+            case 0 | -3:
+                return self.cells
+            case 1 | -2:
+                return self.url
+            case 2 | -1:
+                return self.meta
+        raise IndexError("SessionRecord index out of range")
+    # --- END OF __getitem__() -----------------------------------------------------------------------------------------
+
+
+
+    def __len__(self) -> int:
+        return 3
+    # --- END OF __len__() ---------------------------------------------------------------------------------------------
+
+
+
+    def __eq__(self, _other: object) -> bool:
+        if not isinstance(_other, SessionRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(_other, name) for name in self.__slots__)
+    # --- END OF __eq__() ----------------------------------------------------------------------------------------------
+
+
+
+    def __repr__(self) -> str:
+        return f"SessionRecord({list(self.cells)!r}, {self.url!r}, {self.meta!r})"
+    # --- END OF __repr__() --------------------------------------------------------------------------------------------
+# --- END OF class SessionRecord ---------------------------------------------------------------------------------------
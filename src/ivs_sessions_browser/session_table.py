@@ -0,0 +1,624 @@
+"""
+Filename:       session_table.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    SessionTable, the columnar store of all sessions, and TableView, a filtered and sorted list of row
+                numbers into it. Each column is held on its own, typed:
+
+                    start, end          epoch seconds, array('q'); end is start + duration, and not a column shown
+                    doy, dur            ints, array('i') (duration in minutes)
+                    code, db            one str per row (unique per session)
+                    type, ops, corr,    dictionary encoded: the distinct values once, and an array('I') of value
+                    status, analysis    numbers per row
+                    stations            station numbers per row (active and removed), packed into one array('H')
+                                        per side with the offsets of each row in an array('I')
+
+                Rows are stored sorted by start, the order the TUI shows them in, with each start parsed once while
+                sorting. Filtering, sorting and jumping to a date are done on row numbers and these columns. Rows are
+                turned back into SessionRecords only to be drawn, a screenful at a time (TableView.__getitem__()).
+
+Notes:          The typed columns must give back the exact text of the page. A cell whose text does not come back the
+                same from its value (a start like '2025-1-1 7:00', an empty DOY) keeps its text in text_overrides, and
+                its value is still used for sorting if the text could be read at all.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+import calendar
+
+from array          import array
+from bisect         import bisect_left
+from collections    import abc
+from datetime       import datetime, timedelta
+from functools      import lru_cache
+from typing         import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# --- Project defined
+from .defs              import FIELD_INDEX, HEADERS, DATEFORMAT
+from .session_record    import SessionRecord
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+# --- Value of a DOY or duration that isn't a number; a start that isn't a date sorts first, like datetime.min did
+MISSING         = -1
+MISSING_START   = -(1 << 63)
+
+# --- Largest DOY or duration the array('i') columns hold; a bigger one is MISSING, its text kept in text_overrides
+INT_MAX         = (1 << 8 * array("i").itemsize - 1) - 1
+
+EPOCH           = datetime(1970, 1, 1)
+
+CODE, START, DOY, DUR, STATIONS, DB = (FIELD_INDEX[name] for name in ("code", "start", "doy", "dur", "stations",
+                                                                     "db"))
+
+# --- Columns held as numbers (epoch seconds, days, minutes), which filters can compare
+NUMERIC_COLUMNS     = (START, DOY, DUR)
+
+# --- Columns kept as one str per row, since every session has its own value
+TEXT_COLUMNS        = (CODE, DB)
+
+# --- Everything else is dictionary encoded
+CATEGORICAL_COLUMNS = tuple(i for i in range(len(HEADERS)) if i not in (CODE, DB, START, DOY, DUR, STATIONS))
+
+
+
+def start_epoch(_text: str) -> int:
+    """
+    :param _text:   A 'Start' cell, e.g. '2025-01-02 17:00'
+    :return:        Seconds since 1970 (the time taken as UTC), or MISSING_START if it isn't a date
+    """
+
+    try:
+        # --- fromisoformat() is C code, and reads the usual 'YYYY-MM-DD HH:MM' about ten times faster than strptime()
+        if len(_text) == 16 and _text[10] == " ":
+            return calendar.timegm(datetime.fromisoformat(_text).timetuple())
+        return calendar.timegm(datetime.strptime(_text, DATEFORMAT).timetuple())
+    except ValueError:
+        return MISSING_START
+# --- END OF start_epoch() ---------------------------------------------------------------------------------------------
+
+
+
+def epoch_of(_dt: datetime) -> int:
+    """
+    :param _dt:     A naive datetime, like datetime.now()
+    :return:        The same wall clock time as a start column value
+    """
+
+    return calendar.timegm(_dt.timetuple())
+# --- END OF epoch_of() ------------------------------------------------------------------------------------------------
+
+
+
+@lru_cache(maxsize=1 << 16)
+def _day_text(_days: int) -> str:
+    return (EPOCH + timedelta(days=_days)).strftime(DATEFORMAT.partition(" ")[0])
+# --- END OF _day_text() -----------------------------------------------------------------------------------------------
+
+
+
+def start_text(_epoch: int) -> str:
+    """
+        The start column value as DATEFORMAT text ('%Y-%m-%d %H:%M'), with the date part formatted once per day. A
+    start whose page text differs from this is kept in SessionTable.text_overrides, so this only has to be right for
+    the usual case.
+
+    :param _epoch:  Seconds since 1970
+    :return:        The text
+    """
+
+    days, seconds = divmod(_epoch, 86400)
+    return f"{_day_text(days)} {seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+# --- END OF start_text() ----------------------------------------------------------------------------------------------
+
+
+
+def _read_int(_text: str) -> int:
+    # --- isdecimal(), not isdigit(): '²' is a digit int() can't read
+    value = int(_text) if _text.isdecimal() else MISSING
+    return value if value <= INT_MAX else MISSING
+# --- END OF _read_int() -----------------------------------------------------------------------------------------------
+
+
+
+def _read_minutes(_text: str) -> int:
+    hours, sep, minutes = _text.partition(":")
+    if sep and hours.isdecimal() and minutes.isdecimal():
+        value = int(hours) * 60 + int(minutes)
+        return value if value <= INT_MAX else MISSING
+    return MISSING
+# --- END OF _read_minutes() -------------------------------------------------------------------------------------------
+
+
+
+def stations_text(_active: str, _removed: str) -> str:
+    """
+    :return:    The Stations cell, "active [removed]", as IvsSessionParser.make_row() writes it
+    """
+
+    if _active and _removed:
+        return f"{_active} [{_removed}]"
+    if _removed:
+        return f"[{_removed}]"
+    return _active
+# --- END OF stations_text() -------------------------------------------------------------------------------------------
+
+
+
+class Dictionary:
+    """
+    The distinct values of a column, numbered in order of appearance.
+    """
+
+    def __init__(self) -> None:
+        self.values: List[str]          = []
+        self.numbers: Dict[str, int]    = {}
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def encode(self, _value: str) -> int:
+        number = self.numbers.get(_value)
+        if number is None:
+            number = self.numbers[_value] = len(self.values)
+            self.values.append(_value)
+        return number
+    # --- END OF encode() ----------------------------------------------------------------------------------------------
+# --- END OF class Dictionary ------------------------------------------------------------------------------------------
+
+
+
+class SessionTable:
+    """
+    All sessions, column by column. Built once from the parsed rows, read only afterwards.
+    """
+
+    def __init__(self, _rows: Iterable[SessionRecord]) -> None:
+        self.size: int                          = 0
+
+        self.start                              = array("q")
+        self.doy                                = array("i")
+        self.dur                                = array("i")
+        self.end                                = array("q")
+
+        # --- Longest duration in seconds: sessions running at a time started at most this long before it
+        self.longest: int                       = 0
+        self.text: Dict[int, List[str]]         = {col: [] for col in TEXT_COLUMNS}
+        self.code: List[str]                    = self.text[CODE]
+
+        # --- Column index -> (dictionary, value number per row)
+        self.categorical: Dict[int, Tuple[Dictionary, array]] = {col: (Dictionary(), array("I"))
+                                                                 for col in CATEGORICAL_COLUMNS}
+
+        # --- Station numbers of each row, row i at [pos[i]:pos[i + 1]], and the station codes they stand for
+        self.stations                           = Dictionary()
+        self.active_ids, self.active_pos        = array("H"), array("I", [0])
+        self.removed_ids, self.removed_pos      = array("H"), array("I", [0])
+
+        self.intensive                          = bytearray()
+        self.url_prefix, self.url_prefix_ids    = Dictionary(), array("i")
+        self.url_suffix, self.url_suffix_ids    = Dictionary(), array("i")
+
+        # --- (row, column) -> text, for cells whose text doesn't come back from the typed value
+        self.text_overrides: Dict[Tuple[int, int], str] = {}
+
+        # --- Display length of each row's cells in the columns that aren't dictionary encoded, for the header widths
+        self.lengths: Dict[int, array] = {col: array("H") for col in (*TEXT_COLUMNS, START, DOY, DUR, STATIONS)}
+
+        # --- Built when first asked for: lower case text of a column, and sort orders
+        self._text_cache: Dict[int, List[str]]  = {}
+        self._row_text: Optional[List[str]]     = None
+        self._rank_cache: Dict[int, array]      = {}
+        self._order_cache: Dict[Tuple[int, bool], array] = {}
+
+        rows    = list(_rows)
+        starts  = [start_epoch(r.cells[START]) for r in rows]
+        for i in sorted(range(len(rows)), key=starts.__getitem__):
+            self._append(rows[i], starts[i])
+        self.longest = 60 * max(self.dur, default=0)
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def _append(self, _r: SessionRecord, _start: int) -> None:
+        """
+        Adds one row to every column.
+
+        :param _r:      The row
+        :param _start:  Its start, parsed (start_epoch())
+        :return:        None
+        """
+
+        i       = self.size
+        cells   = _r.cells
+
+        typed = ((START, self.start, _start),
+                 (DOY, self.doy, _read_int(cells[DOY])),
+                 (DUR, self.dur, _read_minutes(cells[DUR])))
+        for col, column, value in typed:
+            column.append(value)
+            if self._format(col, column[i]) != cells[col]:
+                self.text_overrides[(i, col)] = cells[col]
+
+        for col, texts in self.text.items():
+            texts.append(cells[col])
+        for col, (dictionary, numbers) in self.categorical.items():
+            numbers.append(dictionary.encode(cells[col]))
+
+        for codes, ids, pos in ((_r.active_ids, self.active_ids, self.active_pos),
+                                (_r.removed_ids, self.removed_ids, self.removed_pos)):
+            ids.extend(self.stations.encode(code) for code in codes)
+            pos.append(len(ids))
+        if stations_text(_r.active, _r.removed) != cells[STATIONS]:
+            self.text_overrides[(i, STATIONS)] = cells[STATIONS]
+
+        self.intensive.append(1 if _r.intensive else 0)
+        self.url_prefix_ids.append(MISSING if _r.url_prefix is None else self.url_prefix.encode(_r.url_prefix))
+        self.url_suffix_ids.append(MISSING if _r.url_suffix is None else self.url_suffix.encode(_r.url_suffix))
+
+        for col, lengths in self.lengths.items():
+            lengths.append(min(len(cells[col]), 0xFFFF))
+
+        # --- End of the session, or its start if it has no duration
+        minutes = self.dur[i]
+        self.end.append(_start + 60 * minutes if _start != MISSING_START and minutes > 0 else _start)
+        self.size += 1
+    # --- END OF _append() ---------------------------------------------------------------------------------------------
+
+
+
+    def __len__(self) -> int:
+        return self.size
+    # --- END OF __len__() ---------------------------------------------------------------------------------------------
+
+
+
+    def _format(self, _col: int, _value: int) -> Optional[str]:
+        """
+        :return:    The text a typed value stands for, or None for a missing value
+        """
+
+        if _col == START:
+            return None if _value == MISSING_START else start_text(_value)
+        if _value == MISSING:
+            return None
+        if _col == DOY:
+            return f"{_value:03d}"
+        return f"{_value // 60:02d}:{_value % 60:02d}"
+    # --- END OF _format() ---------------------------------------------------------------------------------------------
+
+
+
+    def cell(self, _i: int, _col: int) -> str:
+        """
+        :param _i:      Row number
+        :param _col:    Column index
+        :return:        The text of the cell, as on the page
+        """
+
+        text = self.text_overrides.get((_i, _col))
+        if text is not None:
+            return text
+        match _col:
+            case c if c in self.categorical:
+                dictionary, numbers = self.categorical[c]
+                return dictionary.values[numbers[_i]]
+            case c if c in self.text:
+                return self.text[c][_i]
+            case c if c == START:
+                return self._format(START, self.start[_i])
+            case c if c == DOY:
+                return self._format(DOY, self.doy[_i])
+            case c if c == DUR:
+                return self._format(DUR, self.dur[_i])
+            case _:
+                return stations_text(self.active_text(_i), self.removed_text(_i))
+    # --- END OF cell() ------------------------------------------------------------------------------------------------
+
+
+
+    def station_ids(self, _i: int, _side: str = "active") -> Sequence[int]:
+        """
+        :param _i:      Row number
+        :param _side:   'active', 'removed' or 'all'
+        :return:        The station numbers of the row (see self.stations)
+        """
+
+        if _side == "all":
+            return self.station_ids(_i, "active") + self.station_ids(_i, "removed")
+        ids, pos = (self.active_ids, self.active_pos) if _side == "active" else (self.removed_ids, self.removed_pos)
+        return ids[pos[_i]:pos[_i + 1]]
+    # --- END OF station_ids() -----------------------------------------------------------------------------------------
+
+
+
+    def active_text(self, _i: int) -> str:
+        return "".join(self.stations.values[j] for j in self.station_ids(_i, "active"))
+    # --- END OF active_text() -----------------------------------------------------------------------------------------
+
+
+
+    def removed_text(self, _i: int) -> str:
+        return "".join(self.stations.values[j] for j in self.station_ids(_i, "removed"))
+    # --- END OF removed_text() ----------------------------------------------------------------------------------------
+
+
+
+    def url(self, _i: int) -> Optional[str]:
+        prefix, suffix = self.url_prefix_ids[_i], self.url_suffix_ids[_i]
+        if prefix == MISSING:
+            return None
+        if suffix == MISSING:
+            return self.url_prefix.values[prefix]
+        return f"{self.url_prefix.values[prefix]}{self.code[_i].lower()}{self.url_suffix.values[suffix]}"
+    # --- END OF url() -------------------------------------------------------------------------------------------------
+
+
+
+    def record(self, _i: int) -> SessionRecord:
+        """
+        :param _i:  Row number
+        :return:    The row as a SessionRecord, e.g. to draw it
+        """
+
+        names = self.stations.values
+        return SessionRecord([self.cell(_i, col) for col in range(len(HEADERS))],
+                             self.url(_i),
+                             [names[n] for n in self.station_ids(_i, "active")],
+                             [names[n] for n in self.station_ids(_i, "removed")],
+                             bool(self.intensive[_i]))
+    # --- END OF record() ----------------------------------------------------------------------------------------------
+
+
+
+    def same_row(self, _i: int, _r: SessionRecord) -> bool:
+        """
+        :param _i:  Row number
+        :param _r:  A parsed row
+        :return:    True if row _i holds exactly _r, compared column by column without making its record
+        """
+
+        names = self.stations.values
+        return (all(self.cell(_i, col) == text for col, text in enumerate(_r.cells))
+                and bool(self.intensive[_i]) == _r.intensive
+                and [names[n] for n in self.station_ids(_i, "active")] == _r.active_ids
+                and [names[n] for n in self.station_ids(_i, "removed")] == _r.removed_ids
+                and self.url(_i) == _r.url)
+    # --- END OF same_row() --------------------------------------------------------------------------------------------
+
+
+
+    def records(self) -> List[SessionRecord]:
+        return [self.record(i) for i in range(self.size)]
+    # --- END OF records() ---------------------------------------------------------------------------------------------
+
+
+
+    def values_matching(self, _col: int, _tokens: List[str]) -> Set[int]:
+        """
+        :param _col:    A dictionary encoded column
+        :param _tokens: Lower case tokens
+        :return:        Numbers of the column's values containing any of the tokens, case-insensitive
+        """
+
+        dictionary, _ = self.categorical[_col]
+        return {n for n, value in enumerate(dictionary.values) if any(t in value.lower() for t in _tokens)}
+    # --- END OF values_matching() -------------------------------------------------------------------------------------
+
+
+
+    def column_text(self, _col: int) -> List[str]:
+        """
+        :param _col:    Column index
+        :return:        The lower case text of every row, made on first use, for substring searches
+        """
+
+        texts = self._text_cache.get(_col)
+        if texts is None:
+            # --- Column at a time, rather than through cell(): the text of every distinct value or station once
+            if _col in self.categorical:
+                dictionary, numbers = self.categorical[_col]
+                lowered             = [value.lower() for value in dictionary.values]
+                texts               = [lowered[n] for n in numbers]
+            elif _col in self.text:
+                texts = [t.lower() for t in self.text[_col]]
+            elif _col == STATIONS:
+                names   = [name.lower() for name in self.stations.values]
+                texts   = [stations_text("".join([names[n] for n in self.active_ids[a:b]]),
+                                         "".join([names[n] for n in self.removed_ids[c:d]]))
+                           for a, b, c, d in zip(self.active_pos, self.active_pos[1:],
+                                                 self.removed_pos, self.removed_pos[1:])]
+            elif _col == START:
+                texts = ["" if value == MISSING_START else start_text(value) for value in self.start]
+            else:
+                column  = self.doy if _col == DOY else self.dur
+                text_of = {value: self._format(_col, value) or "" for value in set(column)}
+                texts   = [text_of[value] for value in column]
+            for (i, col), text in self.text_overrides.items():
+                if col == _col:
+                    texts[i] = text.lower()
+            self._text_cache[_col] = texts
+        return texts
+    # --- END OF column_text() -----------------------------------------------------------------------------------------
+
+
+
+    def row_text(self) -> List[str]:
+        """
+            All cells of each row in lower case, joined by newlines, made on first use. A free text search is one
+        substring test per row on it, and can't match across two cells, since a filter has no newline.
+
+        :return:    The text of every row
+        """
+
+        if self._row_text is None:
+            columns         = [self.column_text(col) for col in range(len(HEADERS))]
+            self._row_text  = ["\n".join(cells) for cells in zip(*columns)]
+        return self._row_text
+    # --- END OF row_text() --------------------------------------------------------------------------------------------
+
+
+
+    def rank(self, _col: int) -> array:
+        """
+            The place of each row's value among the sorted distinct values of a column: the typed value for start,
+        DOY and duration, the text for the others. Rows with the same value have the same rank, so a stable sort on
+        it keeps their order either way round. Made once per column.
+
+        :param _col:    Column index
+        :return:        rank[i] is the rank of row i's value
+        """
+
+        rank = self._rank_cache.get(_col)
+        if rank is None:
+            match _col:
+                case c if c == START:
+                    key = self.start.__getitem__
+                case c if c == DOY:
+                    key = self.doy.__getitem__
+                case c if c == DUR:
+                    key = self.dur.__getitem__
+                case c if c in self.categorical:
+                    dictionary, numbers = self.categorical[c]
+                    order   = sorted(range(len(dictionary.values)), key=dictionary.values.__getitem__)
+                    place   = array("I", bytes(4 * len(order)))
+                    for p, n in enumerate(order):
+                        place[n] = p
+                    key = lambda i: place[numbers[i]]
+                case c:
+                    key = self.text[c].__getitem__ if c in self.text else self.column_text(c).__getitem__
+
+            rank        = array("I", bytes(4 * self.size))
+            p, last     = -1, None
+            for i in sorted(range(self.size), key=key):
+                value = key(i)
+                if p < 0 or value != last:
+                    p, last = p + 1, value
+                rank[i] = p
+            self._rank_cache[_col] = rank
+        return rank
+    # --- END OF rank() ------------------------------------------------------------------------------------------------
+
+
+
+    def order(self, _col: int, _ascending: bool = True) -> array:
+        """
+            All row numbers sorted on a column (see rank()), rows with the same value in table order whichever way
+        round. Made once per column and direction; sorting a subset of the rows is then picking them out of it.
+
+        :param _col:        Column index
+        :param _ascending:  Sort order
+        :return:            The permutation of the rows
+        """
+
+        key     = (_col, _ascending)
+        order   = self._order_cache.get(key)
+        if order is None:
+            order = self._order_cache[key] = array("I", sorted(range(self.size),
+                                                               key=self.rank(_col).__getitem__,
+                                                               reverse=not _ascending))
+        return order
+    # --- END OF order() -----------------------------------------------------------------------------------------------
+
+
+
+    def rows_between(self, _col: int, _low: Optional[int], _high: Optional[int]) -> Sequence[int]:
+        """
+            The rows whose start, DOY or duration is at least _low and below _high, found by bisecting the column's
+        sorted order (order()), so without looking at the other rows. Rows are stored sorted by start, so for start
+        they are a range of row numbers. Rows without a value (MISSING) are never included.
+
+        :param _col:    START, DOY or DUR
+        :param _low:    Lowest value included, or None
+        :param _high:   Lowest value above the ones included, or None
+        :return:        The row numbers, in the column's order
+        """
+
+        values  = {START: self.start, DOY: self.doy, DUR: self.dur}[_col]
+        missing = MISSING_START if _col == START else MISSING
+        low     = missing + 1 if _low is None else max(_low, missing + 1)
+        if _col == START:
+            return range(bisect_left(values, low), len(values) if _high is None else bisect_left(values, _high))
+
+        order   = self.order(_col)
+        first   = bisect_left(order, low, key=values.__getitem__)
+        after   = len(order) if _high is None else bisect_left(order, _high, first, key=values.__getitem__)
+        return order[first:after]
+    # --- END OF rows_between() ----------------------------------------------------------------------------------------
+# --- END OF class SessionTable ----------------------------------------------------------------------------------------
+
+
+
+class TableView(abc.Sequence):
+    """
+        Rows of a SessionTable, by row number: what the TUI shows after filtering and sorting. Indexing it gives a
+    SessionRecord, made when asked for, so drawing a screenful only builds the rows on screen.
+    """
+
+    def __init__(self,
+                 _table:        SessionTable,
+                 _indices:      List[int],
+                 _show_removed: bool                            = True,
+                 _sort_keys:    Sequence[Tuple[str, bool]]      = (("start", True),)
+                 ) -> None:
+
+        self.table          = _table
+        self.indices        = _indices
+        self.show_removed   = _show_removed
+
+        # --- The order of self.indices, (column name, ascending) pairs. With start ascending as the primary key, the
+        # --- start values are in order too, and can be bisected
+        self.sort_keys      = tuple(_sort_keys)
+        self.sort_key       = self.sort_keys[0][0] if self.sort_keys else ""
+        self.ascending      = self.sort_keys[0][1] if self.sort_keys else True
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def __len__(self) -> int:
+        return len(self.indices)
+    # --- END OF __len__() ---------------------------------------------------------------------------------------------
+
+
+
+    def __getitem__(self, _pos: int) -> SessionRecord:
+        r = self.table.record(self.indices[_pos])
+        if not self.show_removed and r.active:
+            # --- Hiding removed stations: the active ones only, padded to keep the column as wide
+            r = r.with_cell(STATIONS, r.active.ljust(len(r.cells[STATIONS])))
+        return r
+    # --- END OF __getitem__() -----------------------------------------------------------------------------------------
+
+
+
+    def index_of_code(self, _code: Optional[str]) -> Optional[int]:
+        """
+        :param _code:   A session code
+        :return:        Position of that session in the view, or None
+        """
+
+        codes = self.table.code
+        return next((p for p, i in enumerate(self.indices) if codes[i] == _code), None)
+    # --- END OF index_of_code() ---------------------------------------------------------------------------------------
+
+
+
+    def observed_widths(self) -> Tuple[List[int], bool]:
+        """
+        :return:    The longest text of each column over the rows in the view, and whether any of them is an intensive
+        """
+
+        table   = self.table
+        indices = self.indices
+        widths  = [0] * len(HEADERS)
+        if not indices:
+            return widths, False
+
+        for col, lengths in table.lengths.items():
+            widths[col] = max(map(lengths.__getitem__, indices))
+        for col, (dictionary, numbers) in table.categorical.items():
+            widths[col] = max(len(dictionary.values[n]) for n in set(map(numbers.__getitem__, indices)))
+        return widths, any(map(table.intensive.__getitem__, indices))
+    # --- END OF observed_widths() -------------------------------------------------------------------------------------
+# --- END OF class TableView -------------------------------------------------------------------------------------------
@@ -11,17 +11,29 @@ Notes:
 # --- Import section ---------------------------------------------------------------------------------------------------
 import sys
 import requests
+import threading
 import webbrowser
 
-from typing     import Optional, List
+from dataclasses import replace
+from datetime   import datetime
+from typing     import Callable, Dict, Optional, List, Tuple
 
 
 # --- Project defined
 from .draw_tui          import DrawTUI
-from .defs              import BASE_URL, Row, NAVIGATION_KEYS, recompute_header_widths
+from .defs              import BASE_URL, Row, NAVIGATION_KEYS, FIELD_INDEX, recompute_header_widths
 from .read_data         import ReadData, NoSessionsForYearError, DataFetchFailedError
+from .http_cache        import HttpCache
+from .row_snapshot      import RowSnapshot
+from .local_source      import LocalSource, SourceMirror
 from .tui_state         import *
-from .filter_and_sort   import FilterAndSort
+from .filter_and_sort   import FilterAndSort, parse_date
+from .filter_and_sort   import MAX_SORT_KEYS, cycle_sort_keys, format_sort_keys, parse_sort_keys
+from .session_table     import SessionTable, TableView
+from .row_index         import RowIndex
+from .auto_refresh      import AutoRefresher
+from .session_details   import DetailFetcher
+from .live_filter       import LiveFilter
 # --- END OF Import section --------------------------------------------------------------------------------------------
 
 
@@ -39,11 +51,31 @@ class SessionsBrowser:
     def __init__(self,
                  _year:             int,
                  _scope:            str,
-                 _stations_filter:  Optional[str] = None
+                 _stations_filter:  Optional[str] = None,
+                 _workers:          int = 4,
+                 _cache:            Optional[HttpCache] = None,
+                 _snapshot:         Optional[RowSnapshot] = None,
+                 _years:            Optional[List[int]] = None,
+                 _rate_limit:       float = 5.0,
+                 _refresh_interval: float = 0.0,
+                 _source:           Optional[LocalSource] = None,
+                 _save_source:      Optional[SourceMirror] = None,
+                 _parser:           str = "auto",
+                 _parse_workers:    int = 0
                  ) -> None:
         self.year               = _year
+        self.years: List[int]   = sorted(set(_years)) if _years else [_year]
+        self.rate_limit         = _rate_limit
+        self.refresh_interval   = _refresh_interval
         self.scope              = _scope
         self.stations_filter    = _stations_filter
+        self.workers            = _workers
+        self.cache              = _cache
+        self.snapshot           = _snapshot
+        self.source             = _source
+        self.save_source        = _save_source
+        self.parser             = _parser
+        self.parse_workers      = _parse_workers
         self.state              = UIState()
         self.theme: TUITheme    = None
         self.draw: DrawTUI      = DrawTUI()
@@ -51,10 +83,13 @@ class SessionsBrowser:
         # --- Create and populate the list of url's we want to download from.
         self.urls: List[str]    = self._urls_for_scope()
 
-        # --- self.rows contains all rosw read from web
-        # --- self.view_rows contains the filtered list
-        self.rows:      List[Row]   = []    # populated in run()
-        self.view_rows: List[Row]   = []
+        # --- self.table contains all rows read from web, column by column
+        # --- self.view_rows contains the filtered list, as row numbers into self.table
+        self.table:     SessionTable    = SessionTable([])      # populated in run()
+        self.view_rows: TableView       = TableView(self.table, [])
+
+        # --- Held to read or replace self.table (and its index) from the refresh and live filter threads
+        self.table_lock = threading.Lock()
 
         # --- Tokens to highlight in the stations column when filtering
         self.highlight_tokens: List[str] = []
@@ -63,6 +98,16 @@ class SessionsBrowser:
         self.current_filter: str = ""
 
         self.fs = FilterAndSort()
+
+        # --- The ReadData used to fetch self.table, created in run(). Its pooled HTTP session (self.reader.session) is
+        # --- the one to use for any further downloads.
+        self.reader: Optional[ReadData] = None
+
+        # --- Re-fetches the data in the background while the TUI runs, if a refresh interval is given
+        self.refresher: Optional[AutoRefresher] = None
+
+        # --- Fetches the session pages shown in the detail pane, created in run()
+        self.details: Optional[DetailFetcher] = None
     # --- END OF __init__() --------------------------------------------------------------------------------------------
 
 
@@ -74,11 +119,10 @@ class SessionsBrowser:
         :return: None
         """
         self.current_filter = ""
-        self.view_rows      = self.fs.apply(self.rows,
+        self.view_rows      = self.fs.apply(self.table,
                                             _query=self.current_filter,
                                             _show_removed=self.state.show_removed,
-                                            _sort_key="start",
-                                            _ascending=True,
+                                            _sort_keys=self.state.sort_keys,
                                             )
         self.highlight_tokens = []
         idx = self.fs.index_on_or_after_today(self.view_rows)
@@ -87,13 +131,21 @@ class SessionsBrowser:
 
 
 
-    def _get_input(self, _stdscr, _theme: TUITheme, _prompt: str, _initial: str = "") -> str:
+    def _get_input(self,
+                   _stdscr,
+                   _theme:      TUITheme,
+                   _prompt:     str,
+                   _initial:    str                     = "",
+                   _live:       Optional[LiveFilter]    = None
+                   ) -> str:
         """
         Get editable input from the user with an initial value pre-filled.
 
         :param _stdscr:  Where to print
         :param _prompt:  Prompt shown before the text
         :param _initial: Initial text to prefill (e.g., current filter)
+        :param _live:    Evaluates the text as it is typed (a TableView of the matches); the number of matches is
+                         shown at the end of the prompt line and the first of them above it
 
         :return:        The entered text
         """
@@ -116,6 +168,13 @@ class SessionsBrowser:
         # --- Horizontal scroll of the *text* (not including prompt)
         scroll: int = 0
 
+        # --- With _live: the number of matches, at the end of the prompt line. Keys are read with a timeout, so
+        # --- evaluations that finish show up while the user stops typing.
+        status: str = ""
+        if _live:
+            _live.submit("".join(buffer))
+            _stdscr.timeout(50)
+
         def _recalc_scroll():
             """
             Keep the cursor visible by adjusting horizontal scroll.
@@ -127,7 +186,7 @@ class SessionsBrowser:
             visible_width = max_x - 1
 
             # --- Space available for the text after the prompt:
-            text_space = visible_width - len(_prompt)
+            text_space = visible_width - len(_prompt) - len(status)
             if text_space < 5:
                 # --- If the prompt is huge, fallback to at least a few chars of input area
                 text_space = 5
@@ -148,13 +207,15 @@ class SessionsBrowser:
             # --- Compose visible line
             text = "".join(buffer)
             visible_width = max_x - 1
-            text_space = visible_width - len(_prompt)
+            text_space = visible_width - len(_prompt) - len(status)
             if text_space < 5:
                 text_space = 5
 
             # --- Take the slice of text that should be visible
             visible_text = text[scroll:scroll + text_space]
             line = (_prompt + visible_text)[:visible_width]
+            if status:
+                line = f"{line:<{visible_width - len(status)}}{status}"[:visible_width]
 
             # --- Clear last line and draw prompt + visible text inverted
             _stdscr.move(max_y - 1, 0)
@@ -169,6 +230,13 @@ class SessionsBrowser:
             _stdscr.move(max_y - 1, cursor_col)
 
             ch = _stdscr.getch()
+            if _live:
+                if ch == -1:
+                    status = self._draw_preview(_stdscr, text, _live.poll()) or status
+                    continue
+                if ch not in (10, 13, 27, curses.KEY_ENTER):
+                    status = status if status.startswith(" ...") else f" ...{status}"
+
             match ch:
                 case 10 | 13 | curses.KEY_ENTER:
                     break
@@ -207,13 +275,69 @@ class SessionsBrowser:
                 case _:
                     pass
 
+            if _live and "".join(buffer) != text:
+                _live.submit("".join(buffer))
+
         curses.curs_set(0)
         curses.echo()
+        if _live:
+            _stdscr.timeout(-1)
         return "".join(buffer).strip()
     # --- END OF _get_input() ------------------------------------------------------------------------------------------
 
 
 
+    def _preview_filter(self, _query: str, _check: Callable[[], None]) -> TableView:
+        """
+        LiveFilter's evaluate callable, run on its thread while the filter is typed: the rows _query matches, sorted,
+        as apply() gives them. _check() raises live_filter.Cancelled between the steps once the query is stale.
+
+        :param _query:  The filter typed so far
+        :param _check:  Raises Cancelled if _query has been replaced
+        :return:        The matching rows
+        """
+
+        with self.table_lock:
+            table = self.table
+        filtered = self.fs.filter(table, _query)
+        _check()
+        return TableView(table,
+                         self.fs.sort_indices(table, filtered, _sort_keys = self.state.sort_keys),
+                         self.state.show_removed,
+                         self.state.sort_keys)
+    # --- END OF _preview_filter() -------------------------------------------------------------------------------------
+
+
+
+    def _draw_preview(self, _stdscr, _text: str, _result) -> Optional[str]:
+        """
+        Draws the first screenful of a finished preview evaluation in place of the rows.
+
+        :param _stdscr: Where to draw
+        :param _text:   The text in the prompt now
+        :param _result: LiveFilter.poll(): (query, TableView or exception), or None
+        :return:        The status for the prompt line (the number of matches), or None if nothing came in
+        """
+
+        if _result is None:
+            return None
+        query, view = _result
+        stale = " ..." if query != _text else ""
+        if isinstance(view, Exception):
+            return f"{stale} {type(view).__name__} "
+
+        _stdscr.move(2, 0)
+        _stdscr.clrtobot()
+        self.draw.draw_rows(_stdscr,
+                            view,
+                            self.fs.extract_station_tokens(query),
+                            self.theme,
+                            replace(self.state, selected=0, offset=0))
+        return f"{stale} {len(view)} of {self.table.size} "
+    # --- END OF _draw_preview() ---------------------------------------------------------------------------------------
+
+
+
     def _navigate(self, _key: int, _stdscr) -> None:
         """
         Wrapper for main loop, _curses_main, to handle navigation in the session list.
@@ -245,16 +369,47 @@ class SessionsBrowser:
             case curses.KEY_END:
                 self.state.selected = max(0, len(self.view_rows) - 1)
             case 10 | 13 | curses.KEY_ENTER:
-                if self.view_rows:
-                    _, url, _ = self.view_rows[self.state.selected]
-                    if url:
-                        webbrowser.open(url)
+                self.state.show_details = not self.state.show_details
             case _:
                 pass
     # --- END OF _navigate() -------------------------------------------------------------------------------------------
 
 
 
+    def _open_in_browser(self) -> None:
+        """
+        Opens the page of the selected session in the web browser.
+
+        :return: None
+        """
+
+        if self.view_rows:
+            _, url, _ = self.view_rows[self.state.selected]
+            if url:
+                webbrowser.open(url)
+    # --- END OF _open_in_browser() ------------------------------------------------------------------------------------
+
+
+
+    def _request_details(self) -> None:
+        """
+        Asks for the session page of the selected row, and prefetches the rows just above and below it, so the detail
+        pane is ready when the selection moves there.
+
+        :return: None
+        """
+
+        if not self.details or not self.view_rows:
+            return
+        selected = self.state.selected
+        self.details.request(self.view_rows[selected][1])
+        for i in (selected + 1, selected - 1):
+            if 0 <= i < len(self.view_rows):
+                self.details.request(self.view_rows[i][1], _prefetch=True)
+    # --- END OF _request_details() ------------------------------------------------------------------------------------
+
+
+
     def _curses_main(self, _stdscr) -> None:
         """
         This constitutes the main loop of the application.
@@ -266,24 +421,51 @@ class SessionsBrowser:
         self.state.has_colors   = curses.has_colors()
 
         # --- Start the main loop
-        quit: bool = False
+        quit: bool      = False
+        redraw: bool    = True
         while not quit:
-            # --- Determine the view height of the current terminal screen
-            max_y, _ = _stdscr.getmaxyx()
-            self.state.view_height = max(1, max_y - 3)
-
-            self.draw.clear_screen(_stdscr)
-            self.draw.draw_header(_stdscr, self.theme, self.state)
-
-            # --- We pass a filtered list to draw_rows. draw_rows stays "dumb", meaning it just prints whatever
-            # --- we send it.
-            self.draw.draw_rows(_stdscr, self.view_rows, self.highlight_tokens, self.theme, self.state)
+            if redraw:
+                # --- Determine the view height of the current terminal screen. The detail pane takes half of it.
+                max_y, _ = _stdscr.getmaxyx()
+                pane_height = (max_y - 3) // 2 if self.state.show_details else 0
+                self.state.view_height = max(1, max_y - 3 - pane_height)
+
+                self.draw.clear_screen(_stdscr)
+                self.draw.draw_header(_stdscr, self.theme, self.state)
+
+                # --- We pass a filtered list to draw_rows. draw_rows stays "dumb", meaning it just prints whatever
+                # --- we send it.
+                self.draw.draw_rows(_stdscr, self.view_rows, self.highlight_tokens, self.theme, self.state)
+
+                # --- Detail pane for the selected session, between the rows and the help bar
+                if self.state.show_details:
+                    row = self.view_rows[self.state.selected] if self.view_rows else None
+                    url = row[1] if row else None
+                    self.draw.draw_details(_stdscr,
+                                           2 + self.state.view_height,
+                                           pane_height,
+                                           row,
+                                           self.details.get(url) if self.details and url else None,
+                                           bool(self.details and url and self.details.is_pending(url)),
+                                           self.theme)
+
+                # --- Draw a help-bar at thw bottom of the screen
+                self.draw.draw_helpbar(_stdscr, self.view_rows, self.current_filter, self.theme, self.state)
+
+            # --- Parse user input. With a background refresh or the detail pane, don't block on getch() forever, so
+            # --- new data shows up without a key press.
+            _stdscr.timeout(500 if self.refresher or self.state.show_details else -1)
+            key = _stdscr.getch()
 
-            # --- Draw a help-bar at thw bottom of the screen
-            self.draw.draw_helpbar(_stdscr, self.view_rows, self.current_filter, self.theme, self.state)
+            # --- No key within the timeout: only redraw if a background refresh or a session page came in
+            if key == -1:
+                refreshed   = self._apply_refresh()
+                fetched     = bool(self.details and self.details.poll_updates())
+                redraw      = refreshed or fetched
+                continue
+            redraw = True
+            self._apply_refresh()
 
-            # --- Parse user input
-            key = _stdscr.getch()
             match key:
                 case curses.KEY_LEFT:
                     pass
@@ -296,10 +478,21 @@ class SessionsBrowser:
                 case key if key in NAVIGATION_KEYS:
                     self._navigate(key, _stdscr)
 
-                # --- Jump to today's date (or the next if today is not in list)
+                # --- Open the selected session in the web browser
+                case c if c == ord('o'):
+                    self._open_in_browser()
+
+                # --- Jump to the session running now (or the next if none is)
                 case c if c == ord('T'):
                     idx = self.fs.index_on_or_after_today(self.view_rows)
                     self.state.selected = self.state.offset = idx
+
+                # --- Jump to a date (or the next session after it); ignored if it can't be read as one
+                case c if c == ord('J'):
+                    when = parse_date(self._get_input(_stdscr, self.theme, "Date (YYYY-MM-DD [HH:MM]) "))
+                    if when is not None:
+                        idx = self.fs.index_on_or_after(self.view_rows, when)
+                        self.state.selected = self.state.offset = idx
                 #
                 # --- Apply user filter
                 case c if c == ord('/'):
@@ -307,15 +500,19 @@ class SessionsBrowser:
                     # --- If we have a filter already, prefill prompt with it as a convenience to the user
                     prefill = self.current_filter or ""
 
-                    # --- Get new filter from user
-                    new_filter = self._get_input(_stdscr, self.theme, "/ ", _initial = prefill)
+                    # --- Get new filter from user, with the matches shown while it is typed. The preview thread uses
+                    # --- self.fs, so it is stopped before the filter is applied.
+                    live = LiveFilter(self._preview_filter)
+                    try:
+                        new_filter = self._get_input(_stdscr, self.theme, "/ ", _initial = prefill, _live = live)
+                    finally:
+                        live.close()
 
                     self.current_filter = new_filter
-                    self.view_rows      = self.fs.apply(self.rows,
+                    self.view_rows      = self.fs.apply(self.table,
                                                         _query           = self.current_filter,
                                                         _show_removed    = self.state.show_removed,
-                                                        _sort_key        = "start",
-                                                        _ascending       = True,
+                                                        _sort_keys       = self.state.sort_keys,
                                                         )
 
                     # --- Jump to today
@@ -332,11 +529,27 @@ class SessionsBrowser:
                 # --- Hide/show removed stations
                 case c if c == (ord('R')):
                     self.state.show_removed = not self.state.show_removed
-                    self.view_rows = self.fs.apply(self.rows,
+                    self.view_rows = self.fs.apply(self.table,
                                                    _query           = self.current_filter,
                                                    _show_removed    = self.state.show_removed,
-                                                   _sort_key        = "start",
-                                                   _ascending       = True)
+                                                   _sort_keys       = self.state.sort_keys)
+
+                # --- Sort on the next column (the keys after the first are kept), or reverse the first key
+                case c if c in (ord('s'), ord('S')):
+                    keys = self.state.sort_keys
+                    if c == ord('s'):
+                        self.state.sort_keys = cycle_sort_keys(keys)
+                    else:
+                        self.state.sort_keys = ((keys[0][0], not keys[0][1]),) + keys[1:]
+                    self._reapply_filter_anchored()
+
+                # --- Sort on columns typed at a prompt, e.g. 'status, -start'; ignored if a name isn't a column
+                case c if c == ord('O'):
+                    keys = parse_sort_keys(self._get_input(_stdscr, self.theme, "Sort by ",
+                                                           _initial = format_sort_keys(self.state.sort_keys)))
+                    if keys is not None:
+                        self.state.sort_keys = keys[:MAX_SORT_KEYS]
+                        self._reapply_filter_anchored()
 
 
                 # --- Show help
@@ -351,6 +564,10 @@ class SessionsBrowser:
                 case _:
                     pass
             # --- END OF match key -------------------------------------------------------------------------------------
+
+            # --- Keep the detail pane's session page (and its neighbours) on the way
+            if self.state.show_details:
+                self._request_details()
         # --- END OF while not quit ------------------------------------------------------------------------------------
     # --- END OF _curses_main() ----------------------------------------------------------------------------------------
 
@@ -362,20 +579,185 @@ class SessionsBrowser:
         This is being called from the SessionsBrowser __init__() function.
 
         :return List[str]:  List of url's from which we read our data. This will be 'master', and 'intensive' for
-                            a given year. It defaults to the current year and both master and intensives
+                            each year in self.years. It defaults to the current year and both master and intensives
         """
 
         base_url    = BASE_URL
-        year        = str(self.year)
+        urls        = []
 
-        if self.scope == "master":      return [f"{base_url}/{year}/"]
-        if self.scope == "intensive":   return [f"{base_url}/intensive/{year}/"]
+        # --- One or two pages per year, in year order, so the progress lines for a year stay together
+        for year in self.years:
+            if self.scope in ("master", "both"):        urls.append(f"{base_url}/{year}/")
+            if self.scope in ("intensive", "both"):     urls.append(f"{base_url}/intensive/{year}/")
 
-        return [f"{base_url}/{year}/", f"{base_url}/intensive/{year}/"]
+        return urls
     # this is the end of _urls_for_scope() -----------------------------------------------------------------------------
 
 
 
+    def _make_reader(self, _feedback: bool, _cache: Optional[HttpCache]) -> ReadData:
+        """
+        Sets up a ReadData for self.urls. Once we have a reader, its HTTP session is shared with the new one.
+
+        :param _feedback:   Print download progress (must be False while curses owns the terminal)
+        :param _cache:      The page cache to use, or None
+        :return:            The ReadData
+        """
+
+        return ReadData(self.urls,
+                        self._year_label(),
+                        self.scope,
+                        _feedback,
+                        self.stations_filter,
+                        _workers    = self.workers,
+                        _cache      = _cache,
+                        _session    = self.reader.session if self.reader else None,
+                        _snapshot   = self.snapshot,
+                        _rate_limit = self.rate_limit,
+                        _source     = self.source,
+                        _save_source = self.save_source,
+                        _parser     = self.parser,
+                        _parse_workers = self.parse_workers)
+    # --- END OF _make_reader() ----------------------------------------------------------------------------------------
+
+
+
+    def _fetch_quietly(self) -> List[Row]:
+        """
+        Fetch everything again without printing. The cache is always revalidated with the server, so unchanged pages
+        cost a 304 and come straight from the row snapshots.
+
+        :return:    The fetched rows
+        """
+
+        return self._make_reader(False, self.cache.revalidating() if self.cache else None).fetch_all_urls()
+    # --- END OF _fetch_quietly() --------------------------------------------------------------------------------------
+
+
+
+    def _refresh_table(self) -> Optional[Tuple[SessionTable, RowIndex]]:
+        """
+        Background refresh, run on the AutoRefresher thread: fetches, merges the rows into the current table and
+        indexes the result there, so the key loop only has to swap them in (_apply_refresh()).
+
+        :return:    (new table, its index), or None if no session changed
+        """
+
+        rows = self._fetch_quietly()
+        with self.table_lock:
+            table = self.table
+        merged = self._merge_rows(table, rows)
+        return None if merged is None else (merged, RowIndex(merged))
+    # --- END OF _refresh_table() --------------------------------------------------------------------------------------
+
+
+
+    def _apply_refresh(self) -> bool:
+        """
+        Picks up a finished background refresh, if there is one: swaps in the new table and index, re-applies the
+        current filter and keeps the selection on the same session.
+
+        :return:    True if the screen needs redrawing
+        """
+
+        if not self.refresher:
+            return False
+        result = self.refresher.poll()
+        if result is None:
+            return False
+
+        finished_at, refreshed = result
+        if isinstance(refreshed, Exception):
+            self.state.last_updated = f"{self.state.last_updated.split(' ')[0]} (refresh failed)"
+            return True
+
+        self.state.last_updated = finished_at.strftime("%H:%M:%S")
+        if refreshed is not None:
+            with self.table_lock:
+                self.table, index = refreshed
+                self.fs.use_index(index)
+            self._reapply_filter_anchored()
+        return True
+    # --- END OF _apply_refresh() --------------------------------------------------------------------------------------
+
+
+
+    @staticmethod
+    def _merge_rows(_table: SessionTable, _rows: List[Row]) -> Optional[SessionTable]:
+        """
+        Merges refreshed rows into _table by session code: changed sessions are replaced, new ones added. Sessions
+        missing from _rows are kept, since a page that failed to refresh would otherwise empty the list. Each refreshed
+        row is compared with the columns of its row in _table, so nothing is rebuilt when nothing changed.
+
+        :param _table:  The current table
+        :param _rows:   The refreshed rows
+        :return:        The merged table, or None if no session changed or was added
+        """
+
+        code_idx    = FIELD_INDEX["code"]
+        fresh       = {r[0][code_idx]: r for r in _rows}
+        row_of: Dict[str, int] = {}
+        for i, code in enumerate(_table.code):
+            row_of.setdefault(code, i)
+
+        changed: Dict[int, Row] = {}
+        added: List[Row]        = []
+        for code, new in fresh.items():
+            i = row_of.get(code)
+            if i is None:
+                added.append(new)
+            elif not _table.same_row(i, new):
+                changed[i] = new
+
+        if not changed and not added:
+            return None
+        return SessionTable([changed[i] if i in changed else _table.record(i) for i in range(_table.size)] + added)
+    # --- END OF _merge_rows() -----------------------------------------------------------------------------------------
+
+
+
+    def _reapply_filter_anchored(self) -> None:
+        """
+        Re-applies the current filter to self.table, keeping the selection on the same session, at the same place on
+        screen. If that session is filtered out, the selection stays at the same index.
+
+        :return: None
+        """
+
+        view        = self.view_rows
+        anchor      = view.table.code[view.indices[self.state.selected]] if view else None
+        screen_pos  = self.state.selected - self.state.offset
+
+        self.view_rows = self.fs.apply(self.table,
+                                       _query           = self.current_filter,
+                                       _show_removed    = self.state.show_removed,
+                                       _sort_keys       = self.state.sort_keys)
+        recompute_header_widths(self.view_rows)
+
+        idx = self.view_rows.index_of_code(anchor)
+        if idx is None:
+            idx = min(self.state.selected, max(0, len(self.view_rows) - 1))
+        self.state.selected = idx
+        self.state.offset   = max(0, idx - screen_pos)
+    # --- END OF _reapply_filter_anchored() ----------------------------------------------------------------------------
+
+
+
+    def _year_label(self) -> str:
+        """
+        :return:    The year(s) we browse, for messages: '2025', '2010-2025' for a contiguous range, else '2010,2015'
+        """
+
+        first, last = self.years[0], self.years[-1]
+        if len(self.years) == 1:
+            return str(first)
+        if self.years == list(range(first, last + 1)):
+            return f"{first}-{last}"
+        return ",".join(str(y) for y in self.years)
+    # --- END OF _year_label() -----------------------------------------------------------------------------------------
+
+
+
     def run(self) -> None:
         """
         Starting point for the application.
@@ -385,7 +767,11 @@ class SessionsBrowser:
 
         try:
             # --- The return value from ReadData.fetch_all_urls is a List[Row], containing all the html from web.
-            self.rows = ReadData(self.urls, self.year, self.scope, True, self.stations_filter).fetch_all_urls()
+            self.reader = self._make_reader(True, self.cache)
+
+            # --- Pages come back in URL order; the table stores the rows sorted by start
+            self.table = SessionTable(self.reader.fetch_all_urls())
+            self.fs.build_index(self.table)
         except NoSessionsForYearError as e:
             print(f"No sessions found for year {e.year} (scope: {e.scope}).", file=sys.stderr)
             # Option A: return to shell without starting TUI
@@ -410,22 +796,38 @@ class SessionsBrowser:
         # --- This is the place to recompute HEADER widths
         # --- Compute dynamic column widths once, based on ALL fetched rows
         # --- Set final column widths based on all rows (adds 3 for '[I]' if present)
-        # recompute_header_widths(self.rows)
+        # recompute_header_widths(self.table)
 
         # --- Applying filter and sort to the list
-        self.view_rows = self.fs.apply(self.rows,
+        self.view_rows = self.fs.apply(self.table,
                                        _query           = self.current_filter,
                                        _show_removed    = self.state.show_removed,
-                                       _sort_key        = "start",
-                                       _ascending       = True)
+                                       _sort_keys       = self.state.sort_keys)
         recompute_header_widths(self.view_rows)
         # compute_headers(self.view_rows)
 
         # --- Update self.state, and jump to today
         self.state.selected = self.state.offset = self.fs.index_on_or_after_today(self.view_rows)
+        self.state.last_updated = datetime.now().strftime("%H:%M:%S")
+
+        # --- Session pages for the detail pane, over the same HTTP session and rate limit as the schedule pages
+        self.details = DetailFetcher(self.reader.session,
+                                     self.reader.rate_limiter,
+                                     _source        = self.source,
+                                     _save_source   = self.save_source)
+
+        # --- Keep the data up to date in the background, if asked to
+        if self.refresh_interval > 0:
+            self.refresher = AutoRefresher(self.refresh_interval, self._refresh_table)
+            self.refresher.start()
 
         # --- Using curses to call on the main loop, self._curses.main()
-        curses.wrapper(self._curses_main)
+        try:
+            curses.wrapper(self._curses_main)
+        finally:
+            if self.refresher:
+                self.refresher.stop()
+            self.details.shutdown()
 
         exit(1)
     # --- END OF run() -------------------------------------------------------------------------------------------------
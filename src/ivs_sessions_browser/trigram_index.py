@@ -0,0 +1,103 @@
+"""
+Filename:       trigram_index.py
+Author:         jole
+Created:        17.10.2026
+
+Description:    Substring search over one column of a SessionTable without looking at every row. The column's distinct
+                texts (lower case) are kept once, with the rows that have each, and every three-character piece of a
+                text (trigram) maps to the distinct texts it occurs in. A needle of three or more characters then only
+                has to be checked against the texts that have all of its trigrams; a shorter one is checked against
+                the distinct texts, which for most columns are far fewer than the rows.
+
+Notes:          Built when a column is first searched (RowIndex.trigrams()), since free text searches are rarer than
+                the station and value filters the bitmap index answers.
+"""
+
+# --- Import section ---------------------------------------------------------------------------------------------------
+from array          import array
+from collections    import Counter
+from itertools      import accumulate
+from typing         import Dict, Iterable, Iterator, List
+# --- END OF Import section --------------------------------------------------------------------------------------------
+
+
+
+GRAM_LENGTH = 3
+
+
+
+class TrigramIndex:
+    """
+    The index of one column.
+    """
+
+    def __init__(self, _texts: List[str]) -> None:
+        """
+        :param _texts:  Lower case text of the column, one per row
+        """
+
+        self.size = len(_texts)
+
+        # --- Distinct texts numbered in order of appearance (setdefault() hands out the next number to a new text)
+        numbers: Dict[str, int]     = {}
+        value_of                    = [numbers.setdefault(text, len(numbers)) for text in _texts]
+        self.values: List[str]      = list(numbers)
+
+        # --- Rows of each distinct text: rows[pos[n]:pos[n + 1]], in row order (the sort is stable)
+        counts      = Counter(value_of)
+        self.rows   = array("I", sorted(range(self.size), key=value_of.__getitem__))
+        self.pos    = array("I", accumulate((counts[n] for n in range(len(self.values))), initial=0))
+
+        # --- Trigram -> numbers of the distinct texts it occurs in, ascending
+        self.grams: Dict[str, array] = {}
+        grams = self.grams
+        for n, text in enumerate(self.values):
+            for gram in {text[j:j + GRAM_LENGTH] for j in range(len(text) - GRAM_LENGTH + 1)}:
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array("I")
+                postings.append(n)
+    # --- END OF __init__() --------------------------------------------------------------------------------------------
+
+
+
+    def search(self, _needle: str) -> List[int]:
+        """
+        :param _needle: Lower case text to look for
+        :return:        Numbers of the distinct texts containing it
+        """
+
+        values = self.values
+        if len(_needle) < GRAM_LENGTH:
+            return [n for n, text in enumerate(values) if _needle in text]
+
+        postings = []
+        for gram in {_needle[j:j + GRAM_LENGTH] for j in range(len(_needle) - GRAM_LENGTH + 1)}:
+            found = self.grams.get(gram)
+            if found is None:
+                return []
+            postings.append(found)
+        postings.sort(key=len)
+
+        # --- Intersect, smallest list first, then check the texts left: the trigrams can be in another order
+        candidates = set(postings[0])
+        for found in postings[1:]:
+            candidates.intersection_update(found)
+            if not candidates:
+                return []
+        return [n for n in candidates if _needle in values[n]]
+    # --- END OF search() ----------------------------------------------------------------------------------------------
+
+
+
+    def matching_rows(self, _needles: Iterable[str]) -> Iterator[int]:
+        """
+        :param _needles:    Lower case texts to look for
+        :return:            The rows containing any of them, grouped by text
+        """
+
+        rows, pos = self.rows, self.pos
+        for n in {n for needle in _needles for n in self.search(needle)}:
+            yield from rows[pos[n]:pos[n + 1]]
+    # --- END OF matching_rows() ---------------------------------------------------------------------------------------
+# --- END OF class TrigramIndex ----------------------------------------------------------------------------------------
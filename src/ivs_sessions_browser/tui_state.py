@@ -31,6 +31,9 @@ class UIState:
     view_height:    int     = 0
     show_removed:   bool    = True
     has_colors:     bool    = False
+    last_updated:   str     = ""    # when the data was last fetched/refreshed, shown in the help bar
+    show_details:   bool    = False # detail pane for the selected session, below the rows
+    sort_keys:      tuple   = (("start", True),)    # (column name, ascending) pairs, primary first
 # --- END OF class UIState ----------------------------------------------------------------------------------------
 
 